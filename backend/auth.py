@@ -1,25 +1,107 @@
 """ResolveX Backend - JWT and password utilities."""
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from config import settings
 
-# Password hashing context
+# Password hashing context. Pinning min/max to the default cost makes hashes made
+# with any other cost "need update", so they are rehashed on the next login.
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
 )
 
+
+class PasswordHasherBusy(Exception):
+    """No hashing slot freed up within PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with a cap on in-flight hashes.
+
+    Callers await a slot for at most `queue_timeout`. Waiting holds no request thread
+    and no DB connection, so a login burst is shed with 503s instead of starving the
+    threadpool every other endpoint runs on. With workers=0 hashing falls back to the
+    request threadpool (the old behaviour), still behind the cap.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    async def run(self, fn, *args):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHasherBusy()
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
+
+
 # -------- Password utils --------
+# Sync helpers hash in the calling thread (scripts, seeding). Request handlers
+# use the *_async variants, which go through `password_hasher`.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Return (valid, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return await password_hasher.run(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
 # -------- JWT utils --------
 def create_access_token(
     data: dict,
@@ -43,7 +125,19 @@ def create_access_token(
     )
 
 
-def decode_token(token: str) -> Optional[dict]:
+# -------- Verified-token cache --------
+# digest -> (exp, payload). The digest covers the signing key and algorithm, so
+# rotating SECRET_KEY makes every cached entry unreachable without a flush.
+_token_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_digest(token: str) -> str:
+    material = f"{settings.ALGORITHM}:{settings.SECRET_KEY}:{token}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(
             token,
@@ -53,3 +147,32 @@ def decode_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT; repeat presentations are served from a bounded LRU until `exp`."""
+    if settings.TOKEN_CACHE_SIZE <= 0:
+        return _verify_token(token)
+    digest = _token_digest(token)
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(digest)
+        if entry:
+            if entry[0] > now:
+                _token_cache.move_to_end(digest)
+                return dict(entry[1])
+            del _token_cache[digest]
+
+    payload = _verify_token(token)
+    if payload is None or "exp" not in payload:
+        return payload
+    with _token_cache_lock:
+        _token_cache[digest] = (float(payload["exp"]), payload)
+        while len(_token_cache) > settings.TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return dict(payload)
+
+
+def clear_token_cache() -> None:
+    with _token_cache_lock:
+        _token_cache.clear()
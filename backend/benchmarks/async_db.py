@@ -0,0 +1,201 @@
+"""ResolveX Backend - Benchmark: sync sessions on the threadpool vs async sessions on the event loop.
+
+Serves the same complaint lookup twice, as a `def` route on `get_db`-style
+sessions and as an `async def` route on `get_async_db`-style sessions, with an
+artificial per-query latency standing in for the network round trip to MySQL
+(SLEEP() on MySQL, a registered sleep() function on SQLite). While the lookups
+are fired in bursts, a DB-free `def` endpoint is probed to show threadpool starvation.
+
+    python -m benchmarks.async_db                      # throwaway SQLite (needs aiosqlite)
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.async_db --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# -------- Server side (imported by uvicorn in the child process) --------
+def _build_app():
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine, event, select, text
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from config import settings
+    from database import async_database_url
+    from models import Base, Complaint, User
+    from services.tenancy import DEFAULT_TENANT_ID
+
+    pool_size = int(os.environ["BENCH_POOL_SIZE"])
+    latency = float(os.environ["BENCH_DB_LATENCY_MS"]) / 1000
+    sync_engine = create_engine(settings.DATABASE_URL, pool_size=pool_size, max_overflow=0, pool_timeout=60)
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        poolclass=AsyncAdaptedQueuePool,  # aiosqlite would otherwise get a NullPool
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=60,
+    )
+    is_sqlite = sync_engine.dialect.name == "sqlite"
+    if is_sqlite:
+        for target in (sync_engine, async_engine.sync_engine):
+            @event.listens_for(target, "connect")
+            def _register_sleep(dbapi_conn, _):
+                dbapi_conn.create_function("sleep", 1, lambda s: time.sleep(s) or 0)
+    sleep_sql = text("SELECT sleep(:s)" if is_sqlite else "SELECT SLEEP(:s)")
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionFactory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    Base.metadata.create_all(bind=sync_engine)
+    with SyncSession() as db:
+        if not db.query(Complaint).first():
+            user = User(tenant_id=DEFAULT_TENANT_ID, email="bench@example.com", hashed_password="x", full_name="Bench")
+            db.add(user)
+            db.flush()
+            db.add(
+                Complaint(tenant_id=DEFAULT_TENANT_ID, user_id=user.id, title="Bench", description="Benchmark complaint")
+            )
+            db.commit()
+
+    def get_sync_db():
+        with SyncSession() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.on_event("shutdown")
+    async def _dispose():
+        await async_engine.dispose()  # aiosqlite connection threads would keep the process alive
+
+    @app.get("/sync/complaints/{complaint_id}")
+    def sync_lookup(complaint_id: int, db: Session = Depends(get_sync_db)):
+        db.execute(sleep_sql, {"s": latency})
+        c = db.execute(select(Complaint).where(Complaint.id == complaint_id)).scalars().first()
+        return {"id": c.id, "title": c.title}
+
+    @app.get("/async/complaints/{complaint_id}")
+    async def async_lookup(complaint_id: int, db: AsyncSession = Depends(get_async_db)):
+        await db.execute(sleep_sql, {"s": latency})
+        c = (await db.execute(select(Complaint).where(Complaint.id == complaint_id))).scalars().first()
+        return {"id": c.id, "title": c.title}
+
+    @app.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    return app
+
+
+if os.environ.get("BENCH_POOL_SIZE"):
+    app = _build_app()
+
+
+# -------- Load generator --------
+async def _bursts(base_url: str, path: str, concurrency: int, rounds: int) -> dict:
+    """Fire `concurrency` lookups at once, `rounds` times, probing /ping inside each burst."""
+    latencies: list[float] = []
+    probe_ms: list[float] = []
+    errors = 0
+
+    async def timed(client: httpx.AsyncClient, url: str, into: list[float]) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = (await client.get(url)).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if not ok and into is latencies:
+            errors += 1
+        into.append((time.perf_counter() - started) * 1000)
+
+    async def probe_later(client: httpx.AsyncClient) -> None:
+        await asyncio.sleep(0.05)  # once the burst is queued
+        await timed(client, "/ping", probe_ms)
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(probe_later(client), *(timed(client, path, latencies) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "probe_p50": statistics.median(probe_ms),
+    }
+
+
+def _wait_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ping", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("benchmark server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--concurrency", type=int, default=100, help="in-flight requests")
+    parser.add_argument("--db-latency-ms", type=float, default=100.0, help="simulated time per query round trip")
+    parser.add_argument("--rounds", type=int, default=10, help="bursts per mode")
+    args = parser.parse_args()
+
+    env = dict(
+        os.environ,
+        BENCH_POOL_SIZE=str(args.concurrency),
+        BENCH_DB_LATENCY_MS=str(args.db_latency_ms),
+        ESCALATION_ENABLED="false",
+        ARCHIVE_ENABLED="false",
+    )
+    if "DATABASE_URL" not in os.environ:
+        db_file = os.path.join(tempfile.mkdtemp(prefix="resolvex-bench-"), "bench.db")
+        env["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.async_db:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        _wait_ready(base_url)
+        print(f"concurrency={args.concurrency} db_latency={args.db_latency_ms}ms rounds={args.rounds}")
+        for mode in ("sync", "async"):
+            result = asyncio.run(_bursts(base_url, f"/{mode}/complaints/1", args.concurrency, args.rounds))
+            print(
+                f"  {mode:5}: {result['rps']:7.0f} req/s  p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms"
+                f"  p99 {result['p99']:7.1f} ms  errors {result['errors']}  /ping {result['probe_p50']:7.1f} ms"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""ResolveX Backend - Microbenchmark: per-request JWT decode cost with and without the token cache.
+
+Run from backend/:  python -m benchmarks.auth_decode [--tokens 50] [--requests 20000]
+"""
+import argparse
+import random
+import time
+
+import auth
+from config import settings
+
+
+def _run(tokens: list[str], requests: int) -> float:
+    """Decode `requests` randomly chosen tokens; return mean microseconds per decode."""
+    picks = [random.choice(tokens) for _ in range(requests)]
+    started = time.perf_counter()
+    for token in picks:
+        if auth.decode_token(token) is None:
+            raise RuntimeError("token failed to verify")
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=50, help="distinct live tokens (users)")
+    parser.add_argument("--requests", type=int, default=20000, help="decodes per run")
+    args = parser.parse_args()
+
+    random.seed(42)
+    tokens = [
+        auth.create_access_token({"sub": str(i), "role": "user", "name": f"User {i}"})
+        for i in range(args.tokens)
+    ]
+
+    cache_size = settings.TOKEN_CACHE_SIZE
+    settings.TOKEN_CACHE_SIZE = 0
+    uncached = _run(tokens, args.requests)
+
+    settings.TOKEN_CACHE_SIZE = max(cache_size, args.tokens)
+    auth.clear_token_cache()
+    cached = _run(tokens, args.requests)
+    settings.TOKEN_CACHE_SIZE = cache_size
+
+    print(f"tokens={args.tokens} requests={args.requests} algorithm={settings.ALGORITHM}")
+    print(f"  full verification : {uncached:8.1f} us/request")
+    print(f"  verified cache    : {cached:8.1f} us/request")
+    print(f"  speedup           : {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""ResolveX Backend - Load test: realistic role mixes against a locally started API.
+
+Starts the app with uvicorn, plus local stand-ins for Ollama and Groq with a
+fixed latency, creates accounts and drives three kinds of virtual users for
+a fixed duration. Each follows what its frontend pages request:
+
+- users file complaints (sometimes with a photo), list them and open them
+- staff list their work, poll ComplaintDetail and move complaints along
+- admins open the dashboard / analytics page, list everything and assign
+
+Throughput, errors and p50/p95/p99 latency per endpoint are printed and can be
+saved as JSON; `--compare` prints the change against an earlier result file.
+
+    python -m benchmarks.load_test --duration 60 --output before.json
+    python -m benchmarks.load_test --duration 60 --compare before.json
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.load_test --workers 4
+
+The database given by DATABASE_URL gets its tables created and load-test
+accounts added, so point it at a scratch database. Without DATABASE_URL a
+temporary SQLite file is used. The analytics summary uses MySQL-only SQL, so
+admins skip the analytics pages on other databases.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "load-test-password"
+TITLES = [
+    ("Water leakage in washroom", "There is a pipe leak and the floor keeps flooding"),
+    ("Fan not working", "The ceiling fan in room 204 stopped working, there is no power"),
+    ("Wifi down", "Internet is not working on the second floor since morning"),
+    ("Broken window", "Window glass in the corridor is broken and unsafe"),
+    ("Garbage not collected", "Dustbins near the canteen have not been cleaned for days"),
+]
+STATUS_FLOW = {"assigned": "in_progress", "in_progress": "resolved"}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# -------- Stand-ins for the AI providers --------
+def _start_ai_stub(port: int, latency_ms: float) -> ThreadingHTTPServer:
+    """Ollama /api/generate and Groq /openai/v1/chat/completions, answering after `latency_ms`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+            time.sleep(latency_ms / 1000)
+            if self.path.endswith("/api/generate"):
+                category = random.choice(["Electrical", "Plumbing", "IT", "Cleaning", "General"])
+                priority = random.choice(["low", "medium", "high", "critical"])
+                payload = {"response": json.dumps({"category": category, "priority": priority}), "done": True}
+            elif self.path.endswith("/chat/completions"):
+                payload = {
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "### Executive summary\nAll good."},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -------- Recording --------
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.recording = False
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        if self.recording:
+            self.samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return response if ok else None
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": self.errors.get(name, 0),
+                "rps": len(samples) / elapsed,
+                "mean_ms": statistics.fmean(samples),
+                "p50_ms": _percentile(samples, 50),
+                "p95_ms": _percentile(samples, 95),
+                "p99_ms": _percentile(samples, 99),
+            }
+        everything = [s for samples in self.samples.values() for s in samples]
+        total = {
+            "requests": len(everything),
+            "errors": sum(self.errors.values()),
+            "rps": len(everything) / elapsed,
+            "p50_ms": _percentile(everything, 50) if everything else 0.0,
+            "p95_ms": _percentile(everything, 95) if everything else 0.0,
+            "p99_ms": _percentile(everything, 99) if everything else 0.0,
+        }
+        return {"total": total, "endpoints": endpoints}
+
+
+# -------- Virtual users --------
+class Scenario:
+    def __init__(self, rec: Recorder, photo: bytes, think_ms: float, upload_ratio: float, analytics: bool):
+        self.rec = rec
+        self.photo = photo
+        self.think_ms = think_ms
+        self.upload_ratio = upload_ratio
+        self.analytics = analytics
+
+    async def think(self) -> None:
+        await asyncio.sleep(random.expovariate(1000 / self.think_ms) if self.think_ms else 0)
+
+    async def open_detail(self, client: httpx.AsyncClient, complaint_id: int) -> dict | None:
+        """What ComplaintDetail loads (and re-loads on every poll)."""
+        r, *_ = await asyncio.gather(
+            self.rec.call(client, "GET /complaints/{id}", "GET", f"/api/complaints/{complaint_id}"),
+            self.rec.call(client, "GET /complaints/{id}/logs", "GET", f"/api/complaints/{complaint_id}/logs"),
+            self.rec.call(client, "GET /evidence/{id}", "GET", f"/api/evidence/{complaint_id}"),
+            self.rec.call(client, "GET /feedback/{id}", "GET", f"/api/feedback/{complaint_id}"),
+        )
+        return r.json() if r is not None else None
+
+    async def user(self, client: httpx.AsyncClient, deadline: float) -> None:
+        mine: list[int] = []
+        while time.monotonic() < deadline:
+            roll = random.random()
+            if roll < 0.3 or not mine:
+                title, description = random.choice(TITLES)
+                r = await self.rec.call(
+                    client, "POST /complaints", "POST", "/api/complaints",
+                    json={"title": title, "description": description, "location": "Block A"},
+                )
+                if r is not None:
+                    mine.append(r.json()["id"])
+                    if random.random() < self.upload_ratio:
+                        await self.rec.call(
+                            client, "POST /evidence/{id}", "POST", f"/api/evidence/{mine[-1]}",
+                            files={"file": ("photo.jpg", self.photo, "image/jpeg")},
+                        )
+            elif roll < 0.6:
+                await self.rec.call(client, "GET /complaints", "GET", "/api/complaints", params={"limit": 50})
+            else:
+                await self.open_detail(client, random.choice(mine))
+            await self.think()
+
+    async def staff(self, client: httpx.AsyncClient, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            r = await self.rec.call(client, "GET /complaints", "GET", "/api/complaints", params={"limit": 50})
+            work = [c for c in (r.json() if r is not None else []) if c["status"] in STATUS_FLOW]
+            if not work:
+                await self.think()
+                continue
+            complaint = random.choice(work)
+            for _ in range(3):  # the detail page stays open and polls
+                if time.monotonic() >= deadline:
+                    return
+                await self.open_detail(client, complaint["id"])
+                await self.think()
+            await self.rec.call(
+                client, "PATCH /complaints/{id}", "PATCH", f"/api/complaints/{complaint['id']}",
+                json={"status": STATUS_FLOW[complaint["status"]]},
+            )
+            await self.think()
+
+    async def admin(self, client: httpx.AsyncClient, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            roll = random.random()
+            if self.analytics and roll < 0.3:
+                await asyncio.gather(
+                    self.rec.call(client, "GET /analytics/summary", "GET", "/api/analytics/summary"),
+                    self.rec.call(client, "GET /analytics/insights", "GET", "/api/analytics/insights"),
+                )
+            elif roll < 0.6:
+                await self.rec.call(client, "GET /complaints/all", "GET", "/api/complaints/all", params={"limit": 100})
+            else:
+                r = await self.rec.call(
+                    client, "GET /complaints/all", "GET", "/api/complaints/all",
+                    params={"status": "categorized", "limit": 20},
+                )
+                staff = await self.rec.call(client, "GET /users/staff", "GET", "/api/users/staff")
+                pending = r.json() if r is not None else []
+                staff_ids = [s["id"] for s in (staff.json() if staff is not None else []) if s["role"] == "staff"]
+                if pending and staff_ids:
+                    await self.rec.call(
+                        client, "POST /complaints/{id}/assign", "POST", f"/api/complaints/{pending[0]['id']}/assign",
+                        json={"staff_id": random.choice(staff_ids)},
+                    )
+            await self.think()
+
+
+# -------- Setup --------
+def _photo(kb: int) -> bytes:
+    from PIL import Image
+
+    side = max(64, int((kb * 1024 / 1.5) ** 0.5))  # noise JPEGs come out ~1.5 bytes per pixel
+    buf = io.BytesIO()
+    Image.effect_noise((side, side), 64).convert("RGB").save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+def _create_accounts(base_url: str, database_url: str, counts: dict[str, int], run_id: str) -> dict[str, list[str]]:
+    """Register accounts through the API, then promote staff/admins directly in the database."""
+    from sqlalchemy import create_engine, text
+
+    emails = {role: [f"load-{run_id}-{role}-{i}@example.com" for i in range(n)] for role, n in counts.items()}
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for role_emails in emails.values():
+            for email in role_emails:
+                client.post("/api/auth/register", json={"email": email, "password": PASSWORD, "full_name": email})
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        for role in ("staff", "admin"):
+            for email in emails.get(role, []):
+                conn.execute(text("UPDATE users SET role = :role WHERE email = :email"), {"role": role, "email": email})
+    engine.dispose()
+    tokens = {}
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for role, role_emails in emails.items():
+            tokens[role] = [
+                client.post("/api/auth/login", data={"username": e, "password": PASSWORD}).json()["access_token"]
+                for e in role_emails
+            ]
+    return tokens
+
+
+async def _drive(base_url: str, tokens: dict[str, list[str]], scenario: Scenario, warmup: float, duration: float) -> float:
+    deadline = time.monotonic() + warmup + duration
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    clients = []
+    tasks = []
+    for role, role_tokens in tokens.items():
+        for token in role_tokens:
+            client = httpx.AsyncClient(
+                base_url=base_url, timeout=60, limits=limits, headers={"Authorization": f"Bearer {token}"}
+            )
+            clients.append(client)
+            tasks.append(asyncio.create_task(getattr(scenario, role)(client, deadline)))
+    await asyncio.sleep(warmup)
+    scenario.rec.recording = True
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.aclose()
+    return elapsed
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_results(results: dict, baseline: dict | None) -> None:
+    def delta(name: str, key: str, value: float) -> str:
+        if baseline is None:
+            return ""
+        old = (baseline["endpoints"].get(name) if name != "TOTAL" else baseline["total"]) or {}
+        if not old.get(key):
+            return "        "
+        return f" {100 * (value - old[key]) / old[key]:+6.1f}%"
+
+    print(f"{'endpoint':32} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [*results["endpoints"].items(), ("TOTAL", results["total"])]
+    for name, r in rows:
+        print(
+            f"{name:32} {r['requests']:7d} {r['errors']:5d} {r['rps']:8.1f}{delta(name, 'rps', r['rps'])}"
+            f" {r['p50_ms']:9.1f} {r['p95_ms']:9.1f}{delta(name, 'p95_ms', r['p95_ms'])} {r['p99_ms']:9.1f}"
+        )
+    if baseline is not None:
+        print(f"(changes vs {baseline['meta']['commit']} in req/s and p95)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=30, help="virtual complaint filers")
+    parser.add_argument("--staff", type=int, default=10)
+    parser.add_argument("--admins", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before that")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean pause between a virtual user's actions")
+    parser.add_argument("--upload-ratio", type=float, default=0.3, help="share of new complaints with a photo")
+    parser.add_argument("--upload-kb", type=int, default=200)
+    parser.add_argument("--ai-latency-ms", type=float, default=300.0, help="stand-in Ollama/Groq response time")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--ai-port", type=int, default=8771)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    workdir = tempfile.mkdtemp(prefix="resolvex-load-")
+    database_url = os.environ.get("DATABASE_URL") or f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        UPLOAD_DIR=os.path.join(workdir, "uploads"),
+        OLLAMA_URL=f"http://127.0.0.1:{args.ai_port}/api/generate",
+        GROQ_API_KEY="stand-in",
+        GROQ_BASE_URL=f"http://127.0.0.1:{args.ai_port}",
+        BCRYPT_ROUNDS="4",  # account setup is not what is measured
+        ESCALATION_ENABLED="false",
+        ARCHIVE_ENABLED="false",
+        # Every virtual user signs in from 127.0.0.1 and files far above RATE_LIMITS; measure capacity, not 429s
+        ADMISSION_ENABLED=os.environ.get("ADMISSION_ENABLED", "false"),
+    )
+    dialect = database_url.split(":", 1)[0].split("+", 1)[0]
+    subprocess.run([sys.executable, "manage.py", "init"], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    subprocess.run([sys.executable, "manage.py", "seed"], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    ai_stub = _start_ai_stub(args.ai_port, args.ai_latency_ms)
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        _wait_ready(base_url)
+        counts = {"user": args.users, "staff": args.staff, "admin": args.admins}
+        tokens = _create_accounts(base_url, database_url, counts, f"{int(time.time())}")
+        scenario = Scenario(Recorder(), _photo(args.upload_kb), args.think_ms, args.upload_ratio, dialect == "mysql")
+        if dialect != "mysql":
+            print(f"note: analytics pages skipped on {dialect} (MySQL-only SQL)")
+        elapsed = asyncio.run(_drive(base_url, tokens, scenario, args.warmup, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+        ai_stub.shutdown()
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": started_at,
+            "database": dialect,
+            "elapsed_seconds": elapsed,
+            "args": vars(args),
+        },
+        **scenario.rec.summary(elapsed),
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
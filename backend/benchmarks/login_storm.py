@@ -0,0 +1,117 @@
+"""ResolveX Backend - Benchmark: latency of other endpoints during a login storm.
+
+Starts the API with uvicorn against a throwaway SQLite database, floods
+/api/auth/login from many threads and meanwhile probes a cheap endpoint,
+reporting its p50/p99. Compare hashing in the request thread with the pool:
+
+    python -m benchmarks.login_storm --mode inline
+    python -m benchmarks.login_storm --mode pool
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _wait_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inline", "pool"], default="pool")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--login-threads", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    db_file = os.path.join(tempfile.mkdtemp(prefix="resolvex-bench-"), "bench.db")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_file}",
+        ESCALATION_ENABLED="false",
+        ARCHIVE_ENABLED="false",
+        # Every login comes from one address and account; measure hashing, not rate limiting
+        ADMISSION_ENABLED=os.environ.get("ADMISSION_ENABLED", "false"),
+    )
+    if args.mode == "inline":
+        env.update(PASSWORD_HASH_WORKERS="0", PASSWORD_HASH_MAX_CONCURRENCY="10000")
+    subprocess.run([sys.executable, "manage.py", "init"], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        _wait_ready(base_url)
+        httpx.post(
+            f"{base_url}/api/auth/register",
+            json={"email": "storm@example.com", "password": "storm-password", "full_name": "Storm"},
+        )
+
+        stop = threading.Event()
+        login_status: dict[int, int] = {}
+        probe_ms: list[float] = []
+        lock = threading.Lock()
+
+        def login_worker():
+            with httpx.Client(base_url=base_url, timeout=30) as client:
+                while not stop.is_set():
+                    r = client.post(
+                        "/api/auth/login",
+                        data={"username": "storm@example.com", "password": "storm-password"},
+                    )
+                    with lock:
+                        login_status[r.status_code] = login_status.get(r.status_code, 0) + 1
+
+        def probe_worker():
+            with httpx.Client(base_url=base_url, timeout=30) as client:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    client.get("/health")
+                    probe_ms.append((time.perf_counter() - started) * 1000)
+                    time.sleep(0.01)
+
+        threads = [threading.Thread(target=login_worker) for _ in range(args.login_threads)]
+        threads.append(threading.Thread(target=probe_worker))
+        for t in threads:
+            t.start()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        print(f"mode={args.mode} login_threads={args.login_threads} duration={args.duration}s")
+        print(f"  login responses   : {dict(sorted(login_status.items()))}")
+        print(f"  /health samples   : {len(probe_ms)}")
+        print(f"  /health p50       : {statistics.median(probe_ms):8.1f} ms")
+        print(f"  /health p99       : {_percentile(probe_ms, 99):8.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""ResolveX Backend - Benchmark: cold import time and time until /health answers.
+
+Each run starts a fresh interpreter, so nothing is cached in-process. Exits
+non-zero when the median import or ready time exceeds the budget, which makes
+it usable as a deploy check:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --budget-ms 800 --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_ms(env: dict) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+
+def _ready_ms(env: dict, port: int) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("API did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _top_imports(env: dict, count: int) -> list[tuple[int, str]]:
+    """Largest cumulative entries from `python -X importtime` (microseconds, module)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match and len(match.group(2)) <= 3:  # top-level imports only
+            rows.append((int(match.group(1)), match.group(3)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="limit for the median import time")
+    parser.add_argument("--ready-budget-ms", type=float, default=3000.0, help="limit for the median time to /health")
+    parser.add_argument("--top", type=int, default=10, help="show the slowest top-level imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ, ESCALATION_ENABLED="false", ARCHIVE_ENABLED="false")
+    if "DATABASE_URL" not in os.environ:
+        # An empty database is fine: startup must not touch it
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='resolvex-bench-'), 'bench.db')}"
+
+    imports = [_import_ms(env) for _ in range(args.runs)]
+    ready = [_ready_ms(env, args.port) for _ in range(args.runs)]
+    import_p50, ready_p50 = statistics.median(imports), statistics.median(ready)
+    print(f"import main : p50 {import_p50:7.1f} ms  max {max(imports):7.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"/health up  : p50 {ready_p50:7.1f} ms  max {max(ready):7.1f} ms  (budget {args.ready_budget_ms:.0f} ms)")
+    if args.top:
+        print("slowest top-level imports:")
+        for micros, module in _top_imports(env, args.top):
+            print(f"  {micros / 1000:7.1f} ms  {module}")
+
+    if import_p50 > args.budget_ms or ready_p50 > args.ready_budget_ms:
+        print("startup budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
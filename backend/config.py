@@ -9,13 +9,95 @@ class Settings:
     DATABASE_URL: str = os.getenv(
         "DATABASE_URL", "mysql+pymysql://root@localhost:3306/resolvex"
     )
+    # Defaults to DATABASE_URL with its async driver (aiomysql for MySQL)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Per worker process; the async engine gets its own pool (see ASYNC_DB_POOL_*)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "300"))
+    DB_POOL_SLOW_CHECKOUT_MS: float = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", str(DB_POOL_SIZE)))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+    # Optional read replica for read-only endpoints; empty = everything on DATABASE_URL
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    ASYNC_READ_DATABASE_URL: str = os.getenv("ASYNC_READ_DATABASE_URL", "")
+    READ_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "5"))
+    READ_REPLICA_CHECK_SECONDS: float = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "5"))
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "15"))
+    DB_ISOLATION_LEVEL: str = os.getenv("DB_ISOLATION_LEVEL", "")  # e.g. "READ COMMITTED"; driver default if empty
+    # Extra databases for tenants, "name=url;name2=url2"; DATABASE_URL is shard "default" and holds the tenant directory
+    TENANT_SHARDS: str = os.getenv("TENANT_SHARDS", "")
+    TENANT_HEADER: str = os.getenv("TENANT_HEADER", "X-Tenant")
+    TENANT_BASE_DOMAIN: str = os.getenv("TENANT_BASE_DOMAIN", "")  # e.g. "resolvex.app": <slug>.resolvex.app
+    DEFAULT_TENANT: str = os.getenv("DEFAULT_TENANT", "default")
+    TENANT_CACHE_SECONDS: float = float(os.getenv("TENANT_CACHE_SECONDS", "60"))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "8"))
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "2"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+    # User changes only invalidate the cache of the worker that made them; other workers
+    # see a role change or deactivation once their entry expires, so keep this short
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    # Take role, department and name from the token instead of the users row (is_active is
+    # still read). A role or department change then only applies to tokens issued after it
+    AUTH_TRUST_TOKEN_CLAIMS: bool = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
     MAX_UPLOAD_SIZE_MB: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10"))
+    BLOB_BACKEND: str = os.getenv("BLOB_BACKEND", "local")
+    BLOB_DIR: str = os.getenv("BLOB_DIR", os.path.join(UPLOAD_DIR, "blobs"))
+    BLOB_FANOUT_LEVELS: int = int(os.getenv("BLOB_FANOUT_LEVELS", "2"))
+    BLOB_GC_GRACE_HOURS: int = int(os.getenv("BLOB_GC_GRACE_HOURS", "24"))
+    DERIVATIVES_ENABLED: bool = os.getenv("DERIVATIVES_ENABLED", "true").lower() == "true"
+    DERIVATIVE_DIR: str = os.getenv("DERIVATIVE_DIR", os.path.join(UPLOAD_DIR, "derivatives"))
+    DERIVATIVE_WORKERS: int = int(os.getenv("DERIVATIVE_WORKERS", "1"))
+    DERIVATIVE_FAILURE_TTL_SECONDS: float = float(os.getenv("DERIVATIVE_FAILURE_TTL_SECONDS", "3600"))
+    THUMBNAIL_SIZE_PX: int = int(os.getenv("THUMBNAIL_SIZE_PX", "320"))
+    PREVIEW_SIZE_PX: int = int(os.getenv("PREVIEW_SIZE_PX", "1600"))
+    EVIDENCE_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("EVIDENCE_CACHE_MAX_AGE_SECONDS", "31536000"))
+    SENDFILE_MODE: str = os.getenv("SENDFILE_MODE", "")  # "", "x-accel-redirect" or "x-sendfile"
+    SENDFILE_ACCEL_PREFIX: str = os.getenv("SENDFILE_ACCEL_PREFIX", "/protected-uploads")
+    SQL_PROFILER_ENABLED: bool = os.getenv("SQL_PROFILER_ENABLED", "true").lower() == "true"
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+    SLOW_REQUEST_MS: float = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+    # Rate and concurrency limits for expensive endpoint classes (ai, analytics, uploads, auth)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_BACKEND: str = os.getenv("ADMISSION_BACKEND", "local")  # "redis" shares limits across workers
+    ADMISSION_REDIS_URL: str = os.getenv("ADMISSION_REDIS_URL", "redis://localhost:6379/0")
+    # "[role:]class=requests/seconds", per user (auth: per client address); 0 requests = unlimited
+    RATE_LIMITS: str = os.getenv("RATE_LIMITS", "ai=20/60,analytics=30/60,uploads=30/60,auth=10/60,address:auth=600/60,admin:ai=60/60")
+    # "class=requests in flight", per worker with the local backend
+    CONCURRENCY_LIMITS: str = os.getenv("CONCURRENCY_LIMITS", "ai=8,analytics=4,uploads=8,auth=16")
+    ADMISSION_SLOT_TTL_SECONDS: float = float(os.getenv("ADMISSION_SLOT_TTL_SECONDS", "120"))
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Server push of complaint changes (GET /api/events); "redis" fans out across workers
+    EVENTS_ENABLED: bool = os.getenv("EVENTS_ENABLED", "true").lower() == "true"
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "local")
+    EVENTS_REDIS_URL: str = os.getenv("EVENTS_REDIS_URL", "redis://localhost:6379/0")
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_STREAM_MAX_SECONDS: float = float(os.getenv("EVENTS_STREAM_MAX_SECONDS", "300"))
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+    # Assign categorized complaints to the least loaded staff of the category's department.
+    # Off by default: when on, new complaints never reach the claim-next queue (staff pull work themselves)
+    AUTO_ASSIGN_ENABLED: bool = os.getenv("AUTO_ASSIGN_ENABLED", "false").lower() == "true"
+    AUTO_ASSIGN_PRIORITY_WEIGHTS: str = os.getenv("AUTO_ASSIGN_PRIORITY_WEIGHTS", "low=1,medium=2,high=4,critical=8")
+    AUTO_ASSIGN_RESYNC_SECONDS: float = float(os.getenv("AUTO_ASSIGN_RESYNC_SECONDS", "60"))
+    AUTO_ASSIGN_SWEEP_MINUTES: int = int(os.getenv("AUTO_ASSIGN_SWEEP_MINUTES", "5"))
+    AUTO_ASSIGN_BATCH_SIZE: int = int(os.getenv("AUTO_ASSIGN_BATCH_SIZE", "200"))
     SLA_DAYS: int = int(os.getenv("SLA_DAYS", "3"))
     ESCALATION_ENABLED: bool = os.getenv("ESCALATION_ENABLED", "true").lower() == "true"
+    ESCALATION_BATCH_SIZE: int = int(os.getenv("ESCALATION_BATCH_SIZE", "1000"))
+    ESCALATION_RESYNC_MINUTES: int = int(os.getenv("ESCALATION_RESYNC_MINUTES", "15"))
+    LEADER_ELECTION_ENABLED: bool = os.getenv("LEADER_ELECTION_ENABLED", "true").lower() == "true"
+    LEADER_POLL_SECONDS: int = int(os.getenv("LEADER_POLL_SECONDS", "15"))
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
 
 
 settings = Settings()
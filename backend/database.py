@@ -1,27 +1,253 @@
-"""ResolveX Backend - Database connection and session."""
+"""ResolveX Backend - Database connection and session.
+
+DATABASE_URL is shard "default": it holds the tenant directory and every tenant
+whose `tenants.shard` is "default". TENANT_SHARDS adds more databases with the
+same schema; each tenant's rows live on exactly one of them, and request
+sessions are opened on the tenant's shard with its id in `session.info`
+(services/tenancy.py scopes their queries).
+"""
+import threading
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from config import settings
+from services.pool_metrics import PoolMetrics, instrumented_pool_class
+from services.read_replica import ReplicaMonitor, wants_primary
+from services.tenancy import DEFAULT_SHARD, TenantInfo, get_tenant
+
+# Async driver for each sync URL backend (DATABASE_URL keeps using the sync one)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def _engine_options(url: str, base_pool: type[Pool], pool_size: int, max_overflow: int, metrics: PoolMetrics) -> dict:
+    options = {"pool_pre_ping": True, "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS, "echo": False}
+    if settings.DB_ISOLATION_LEVEL:
+        options["isolation_level"] = settings.DB_ISOLATION_LEVEL
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options  # in-memory SQLite keeps its single-connection pool
+    options.update(
+        poolclass=instrumented_pool_class(base_pool, metrics),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    return options
+
+
+sync_pool_metrics = PoolMetrics("sync", settings.DB_POOL_SLOW_CHECKOUT_MS)
+async_pool_metrics = PoolMetrics("async", settings.DB_POOL_SLOW_CHECKOUT_MS)
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False,
+    **_engine_options(
+        settings.DATABASE_URL, QueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, sync_pool_metrics
+    ),
 )
+sync_pool_metrics.attach(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+_async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    **_engine_options(
+        _async_url,
+        AsyncAdaptedQueuePool,  # also replaces aiosqlite's default NullPool
+        settings.ASYNC_DB_POOL_SIZE,
+        settings.ASYNC_DB_MAX_OVERFLOW,
+        async_pool_metrics,
+    ),
+)
+async_pool_metrics.attach(async_engine.sync_engine)
+# Objects stay usable after commit: reloading an expired attribute would need an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replica (services/read_replica.py decides per request whether to use it)
+read_engine = read_async_engine = ReadSessionLocal = AsyncReadSessionLocal = None
+read_pool_metrics = PoolMetrics("read", settings.DB_POOL_SLOW_CHECKOUT_MS)
+async_read_pool_metrics = PoolMetrics("async-read", settings.DB_POOL_SLOW_CHECKOUT_MS)
+replica_monitor = ReplicaMonitor("read", settings.READ_REPLICA_MAX_LAG_SECONDS, settings.READ_REPLICA_CHECK_SECONDS)
+async_replica_monitor = ReplicaMonitor(
+    "async-read", settings.READ_REPLICA_MAX_LAG_SECONDS, settings.READ_REPLICA_CHECK_SECONDS
+)
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(
+        settings.READ_DATABASE_URL,
+        **_engine_options(
+            settings.READ_DATABASE_URL, QueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, read_pool_metrics
+        ),
+    )
+    read_pool_metrics.attach(read_engine)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    _async_read_url = settings.ASYNC_READ_DATABASE_URL or async_database_url(settings.READ_DATABASE_URL)
+    read_async_engine = create_async_engine(
+        _async_read_url,
+        **_engine_options(
+            _async_read_url,
+            AsyncAdaptedQueuePool,
+            settings.ASYNC_DB_POOL_SIZE,
+            settings.ASYNC_DB_MAX_OVERFLOW,
+            async_read_pool_metrics,
+        ),
+    )
+    async_read_pool_metrics.attach(read_async_engine.sync_engine)
+    AsyncReadSessionLocal = async_sessionmaker(read_async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
+# -------- tenant shards --------
+class Shard:
+    """Engines and session factories of one tenant database."""
+
+    def __init__(self, name, engine, SessionLocal, async_engine, AsyncSessionLocal, sync_metrics, async_metrics):
+        self.name = name
+        self.engine = engine
+        self.SessionLocal = SessionLocal
+        self.async_engine = async_engine
+        self.AsyncSessionLocal = AsyncSessionLocal
+        self.sync_metrics = sync_metrics
+        self.async_metrics = async_metrics
+
+
+def parse_shard_urls(spec: str) -> dict[str, str]:
+    """TENANT_SHARDS ("eu=mysql+pymysql://...;us=...") as {name: url}."""
+    urls = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        name, _, url = item.partition("=")
+        if not url or name.strip() == DEFAULT_SHARD:
+            raise ValueError(f"Bad TENANT_SHARDS entry {item!r}: expected name=url, name not {DEFAULT_SHARD!r}")
+        urls[name.strip()] = url.strip()
+    return urls
+
+
+def _create_shard(name: str, url: str) -> Shard:
+    sync_metrics = PoolMetrics(f"sync:{name}", settings.DB_POOL_SLOW_CHECKOUT_MS)
+    async_metrics = PoolMetrics(f"async:{name}", settings.DB_POOL_SLOW_CHECKOUT_MS)
+    shard_engine = create_engine(
+        url, **_engine_options(url, QueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, sync_metrics)
+    )
+    sync_metrics.attach(shard_engine)
+    async_url = async_database_url(url)
+    shard_async_engine = create_async_engine(
+        async_url,
+        **_engine_options(
+            async_url, AsyncAdaptedQueuePool, settings.ASYNC_DB_POOL_SIZE, settings.ASYNC_DB_MAX_OVERFLOW, async_metrics
+        ),
+    )
+    async_metrics.attach(shard_async_engine.sync_engine)
+    return Shard(
+        name,
+        shard_engine,
+        sessionmaker(autocommit=False, autoflush=False, bind=shard_engine),
+        shard_async_engine,
+        async_sessionmaker(shard_async_engine, autoflush=False, expire_on_commit=False),
+        sync_metrics,
+        async_metrics,
+    )
+
+
+SHARD_URLS = parse_shard_urls(settings.TENANT_SHARDS)
+_shards = {
+    DEFAULT_SHARD: Shard(
+        DEFAULT_SHARD, engine, SessionLocal, async_engine, AsyncSessionLocal, sync_pool_metrics, async_pool_metrics
+    )
+}
+_shards_lock = threading.Lock()
+
+
+def get_shard(name: str) -> Shard:
+    """The shard called `name`, creating its engines (no connections yet) on first use."""
+    shard = _shards.get(name)
+    if shard is None:
+        with _shards_lock:
+            shard = _shards.get(name)
+            if shard is None:
+                if name not in SHARD_URLS:
+                    raise KeyError(f"Unknown shard {name!r}; add it to TENANT_SHARDS")
+                shard = _shards[name] = _create_shard(name, SHARD_URLS[name])
+    return shard
+
+
+def all_shards() -> list[Shard]:
+    return [get_shard(name) for name in (DEFAULT_SHARD, *SHARD_URLS)]
+
+
+def created_shards() -> list[Shard]:
+    """Shards whose engines exist in this process (for stats and shutdown)."""
+    return list(_shards.values())
+
+
+def tenant_session(tenant: TenantInfo):
+    """Sync session scoped to `tenant` (for scripts; endpoints use get_db)."""
+    return get_shard(tenant.shard).SessionLocal(info={"tenant_id": tenant.id, "shard": tenant.shard})
+
+
+# -------- request sessions --------
+def get_db(tenant: TenantInfo = Depends(get_tenant)):
+    db = tenant_session(tenant)
     try:
         yield db
     finally:
         db.close()
 
 
-# 👇 THIS CREATES TABLES
-from models import Base
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def get_async_db(tenant: TenantInfo = Depends(get_tenant)):
+    async with get_shard(tenant.shard).AsyncSessionLocal(info={"tenant_id": tenant.id, "shard": tenant.shard}) as db:
+        yield db
+
+
+def get_read_db(request: Request, tenant: TenantInfo = Depends(get_tenant)):
+    """Session for read-only endpoints: the replica when healthy and the caller has no recent write.
+
+    READ_DATABASE_URL replicates the default shard only; other shards always read their primary.
+    """
+    use_replica = (
+        tenant.shard == DEFAULT_SHARD
+        and ReadSessionLocal is not None
+        and not wants_primary(request)
+        and replica_monitor.check(read_engine)
+    )
+    factory = ReadSessionLocal if use_replica else get_shard(tenant.shard).SessionLocal
+    db = factory(info={"tenant_id": tenant.id, "shard": tenant.shard})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request, tenant: TenantInfo = Depends(get_tenant)):
+    use_replica = (
+        tenant.shard == DEFAULT_SHARD
+        and AsyncReadSessionLocal is not None
+        and not wants_primary(request)
+        and await async_replica_monitor.check_async(read_async_engine)
+    )
+    factory = AsyncReadSessionLocal if use_replica else get_shard(tenant.shard).AsyncSessionLocal
+    async with factory(info={"tenant_id": tenant.id, "shard": tenant.shard}) as db:
+        yield db
+
+
+def pool_stats() -> dict:
+    stats = {"sync": sync_pool_metrics.stats(), "async": async_pool_metrics.stats()}
+    if read_engine is not None:
+        stats["read"] = {**read_pool_metrics.stats(), "replica": replica_monitor.stats()}
+        stats["async-read"] = {**async_read_pool_metrics.stats(), "replica": async_replica_monitor.stats()}
+    for shard in created_shards():
+        if shard.name != DEFAULT_SHARD:
+            stats[shard.sync_metrics.name] = shard.sync_metrics.stats()
+            stats[shard.async_metrics.name] = shard.async_metrics.stats()
+    return stats
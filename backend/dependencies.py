@@ -1,35 +1,76 @@
 """ResolveX Backend - FastAPI dependencies for auth and DB."""
-from typing import Generator, List
-from fastapi import Depends, HTTPException, status
+import hashlib
+from typing import AsyncIterator, Generator, List
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from auth import decode_token
+from config import settings
 from models import User
+from services.admission import admission
+from services.principal_cache import Principal, principal_cache
+from services.tenancy import DEFAULT_TENANT_ID, TenantInfo, get_tenant
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
-def get_current_user_optional(
-    db: Session = Depends(get_db),
+def _token_tenant(payload: dict) -> int:
+    # Tokens issued before tenants existed carry no "tid" and belong to the default tenant
+    return int(payload.get("tid", DEFAULT_TENANT_ID))
+
+
+async def _load_principal(db: AsyncSession, tenant_id: int, payload: dict) -> Principal | None:
+    """Cached principal for the token subject; the DB is only hit on a cache miss."""
+    user_id = int(payload["sub"])
+    principal = principal_cache.get(tenant_id, user_id)
+    if principal:
+        return principal
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and "role" in payload and "name" in payload:
+        # Role, department and name come from the token (as at login); whether the user
+        # may still sign in does not, so deactivation applies within one cache TTL
+        is_active = (await db.execute(select(User.is_active).where(User.id == user_id))).scalar()
+        if is_active is None:
+            return None
+        principal = Principal(
+            id=user_id,
+            tenant_id=tenant_id,
+            role=payload["role"],
+            is_active=bool(is_active),
+            department_id=payload.get("dept"),
+            full_name=payload["name"],
+        )
+    else:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        if not user:
+            return None
+        principal = Principal.from_user(user)
+    principal_cache.put(principal)
+    return principal
+
+
+async def get_current_user_optional(
+    db: AsyncSession = Depends(get_async_db),
+    tenant: TenantInfo = Depends(get_tenant),
     token: str = Depends(oauth2_scheme),
-) -> User | None:
+) -> Principal | None:
     if not token:
         return None
     payload = decode_token(token)
-    if not payload or "sub" not in payload:
+    if not payload or "sub" not in payload or _token_tenant(payload) != tenant.id:
         return None
-    user_id = int(payload["sub"])
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _load_principal(db, tenant.id, payload)
     if not user or not user.is_active:
         return None
     return user
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    tenant: TenantInfo = Depends(get_tenant),
     token: str = Depends(oauth2_scheme),
-) -> User:
+) -> Principal:
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,8 +84,13 @@ def get_current_user(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user_id = int(payload["sub"])
-    user = db.query(User).filter(User.id == user_id).first()
+    if _token_tenant(payload) != tenant.id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token was issued for another tenant",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await _load_principal(db, tenant.id, payload)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -53,7 +99,7 @@ def get_current_user(
 
 
 def require_roles(allowed_roles: List[str]):
-    def role_check(current_user: User = Depends(get_current_user)) -> User:
+    async def role_check(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -68,3 +114,55 @@ RequireUser = require_roles(["user", "staff", "admin", "super_admin"])
 RequireStaff = require_roles(["staff", "admin", "super_admin"])
 RequireAdmin = require_roles(["admin", "super_admin"])
 RequireSuperAdmin = require_roles(["super_admin"])
+
+
+def admit(endpoint_class: str):
+    """Route dependency: the caller's rate limit and a concurrency slot for `endpoint_class`.
+
+    Use as `dependencies=[Depends(admit("ai"))]` so it runs before the endpoint's
+    own dependencies; refusals become 429 with Retry-After (main.py).
+    """
+    async def admission_check(current_user: Principal = Depends(get_current_user)) -> AsyncIterator[None]:
+        caller = f"t{current_user.tenant_id}:u{current_user.id}"
+        await admission.check_rate(endpoint_class, caller, current_user.role)
+        slot = await admission.acquire(endpoint_class)
+        try:
+            yield
+        finally:
+            await admission.release(endpoint_class, slot)
+
+    return admission_check
+
+
+async def _submitted_account(request: Request) -> str:
+    """Account a login (form `username`) or registration (JSON `email`) is for, hashed to
+    bound key size; "" if none. Starlette caches the parsed body for the endpoint."""
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            account = (await request.json()).get("email")
+        else:
+            account = (await request.form()).get("username")
+    except Exception:
+        return ""
+    if not isinstance(account, str) or not account.strip():
+        return ""
+    return hashlib.sha256(account.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def admit_anonymous(endpoint_class: str):
+    """`admit` for endpoints without a user (login, register). Two buckets: per client address
+    and account (the class's rate), and per address alone (the "address:" rate, sized for
+    everyone behind one NAT or proxy). Behind a proxy, run Uvicorn with --proxy-headers so the
+    address is the client's, not the proxy's.
+    """
+    async def admission_check(request: Request) -> AsyncIterator[None]:
+        address = f"ip:{request.client.host if request.client else 'unknown'}"
+        await admission.check_rate(endpoint_class, f"{address}:a{await _submitted_account(request)}", None)
+        await admission.check_rate(endpoint_class, address, "address")
+        slot = await admission.acquire(endpoint_class)
+        try:
+            yield
+        finally:
+            await admission.release(endpoint_class, slot)
+
+    return admission_check
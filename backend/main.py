@@ -1,26 +1,82 @@
+import asyncio
+import math
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from datetime import datetime
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from anyio.to_thread import current_default_thread_limiter
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from auth import PasswordHasherBusy, password_hasher
 from config import settings
-from database import engine, Base
-from routers import auth, complaints, evidence, feedback, analytics, users
-from services.escalation import run_escalation_job
+from database import created_shards, read_async_engine
+from routers import auth, complaints, events, evidence, feedback, analytics, users
+from services.deadline_scheduler import deadline_scheduler
+from services.admission import Rejected
+from services.archival import run_archival_job
+from services.auto_assign import assign_backlog
+from services.blob_store import collect_garbage
+from services.derivatives import derivative_generator
+from services.events import event_broker
+from services.leader import job_leader, leader_only
+from services import metrics
+from services.read_replica import ReadYourWritesMiddleware
+from services.sql_profiler import SqlProfilerMiddleware
 
-# Create tables from models (optional; use MySQL schema.sql for fresh DB)
-# Base.metadata.create_all(bind=engine)
+# No DDL or DB round trips at import or startup: tables come from schema.sql or
+# `python manage.py init|migrate`, and leadership is first claimed on the scheduler thread.
 
 scheduler = BackgroundScheduler()
 
 
+def sync_leadership() -> None:
+    """Run the deadline scheduler only while this instance holds the job leader lock."""
+    if job_leader.acquire():
+        deadline_scheduler.start()
+    else:
+        deadline_scheduler.stop()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if settings.EVENTS_ENABLED:
+        event_broker.start(asyncio.get_running_loop())
     if settings.ESCALATION_ENABLED:
-        scheduler.add_job(run_escalation_job, "interval", hours=1, id="escalation")
+        scheduler.add_job(
+            sync_leadership,
+            "interval",
+            seconds=settings.LEADER_POLL_SECONDS,
+            next_run_time=datetime.now(),
+            id="leader",
+        )
+        scheduler.add_job(
+            leader_only(deadline_scheduler.resync),
+            "interval",
+            minutes=settings.ESCALATION_RESYNC_MINUTES,
+            id="escalation_resync",
+        )
+    if settings.ARCHIVE_ENABLED:
+        scheduler.add_job(leader_only(run_archival_job), "cron", hour=3, id="archival")
+    if settings.AUTO_ASSIGN_ENABLED:
+        scheduler.add_job(
+            leader_only(assign_backlog), "interval", minutes=settings.AUTO_ASSIGN_SWEEP_MINUTES, id="auto_assign"
+        )
+    scheduler.add_job(leader_only(collect_garbage), "cron", hour=4, id="blob_gc")
+    if scheduler.get_jobs():
         scheduler.start()
     yield
-    scheduler.shutdown(wait=False)
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    deadline_scheduler.stop()
+    event_broker.stop()
+    job_leader.release()
+    password_hasher.shutdown()
+    derivative_generator.shutdown()
+    for shard in created_shards():
+        await shard.async_engine.dispose()
+    if read_async_engine is not None:
+        await read_async_engine.dispose()
 
 
 app = FastAPI(
@@ -39,6 +95,30 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SqlProfilerMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)  # outermost: times everything below
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(Rejected)
+async def admission_rejected_handler(request: Request, exc: Rejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, please retry later"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(complaints.router, prefix="/api")
@@ -46,6 +126,7 @@ app.include_router(evidence.router, prefix="/api")
 app.include_router(feedback.router, prefix="/api")
 app.include_router(analytics.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 
 @app.get("/")
@@ -56,3 +137,15 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    limiter = current_default_thread_limiter()
+    stats = limiter.statistics()
+    body, content_type = metrics.render(
+        {"busy": stats.borrowed_tokens, "size": limiter.total_tokens, "waiting": stats.tasks_waiting}
+    )
+    return Response(body, headers={"Content-Type": content_type})
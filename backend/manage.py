@@ -0,0 +1,150 @@
+"""ResolveX Backend - Database bootstrap and migrations.
+
+Schema changes are never applied on import or app startup; run these explicitly
+(from backend/) when deploying:
+
+    python manage.py init               # new database: create every table, mark migrations applied
+    python manage.py migrate            # apply pending database/migrations/*.sql in order
+    python manage.py migrate --baseline # record all migrations as applied without running them
+    python manage.py seed               # default departments and categories
+    python manage.py tenant add acme "Acme Corp" [--shard eu]  # register a tenant
+    python manage.py seed --tenant acme
+    python manage.py tenant list
+
+init and migrate run on every database in TENANT_SHARDS as well as DATABASE_URL.
+"""
+import argparse
+import os
+import re
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, insert, select
+from config import settings
+from database import SHARD_URLS, all_shards, engine, tenant_session
+from models import Base, Tenant
+from seed_data import seed_categories, seed_departments
+from services.tenancy import DEFAULT_SHARD, DEFAULT_TENANT_ID, tenant_directory
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "migrations")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(255), primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def _migration_files() -> list[str]:
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if re.match(r"^\d+_.*\.sql$", f))
+
+
+def _statements(sql: str) -> list[str]:
+    """Split a migration script on `;`, dropping `--` comment lines (scripts hold plain DDL only)."""
+    body = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    return [stmt.strip() for stmt in body.split(";") if stmt.strip()]
+
+
+def _applied(conn) -> set[str]:
+    schema_migrations.create(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def init_db() -> None:
+    """Create all tables from the models on every shard; they already include every migration."""
+    for shard in all_shards():
+        # The tenant directory only lives on the default shard
+        tables = [t for t in Base.metadata.sorted_tables if shard.name == DEFAULT_SHARD or t.name != "tenants"]
+        with shard.engine.begin() as conn:
+            Base.metadata.create_all(bind=conn, tables=tables)
+            applied = _applied(conn)
+            for name in _migration_files():
+                if name not in applied:
+                    conn.execute(insert(schema_migrations).values(version=name))
+            if shard.name == DEFAULT_SHARD and conn.execute(select(Tenant.id).limit(1)).first() is None:
+                conn.execute(
+                    insert(Tenant).values(
+                        id=DEFAULT_TENANT_ID, slug=settings.DEFAULT_TENANT, name="Default", shard=DEFAULT_SHARD
+                    )
+                )
+        print(f"Schema ready on {shard.engine.url.render_as_string(hide_password=True)} (shard {shard.name})")
+
+
+def migrate(baseline: bool = False) -> None:
+    for shard in all_shards():
+        with shard.engine.begin() as conn:
+            applied = _applied(conn)
+        pending = [name for name in _migration_files() if name not in applied]
+        if not pending:
+            print(f"No pending migrations (shard {shard.name})")
+            continue
+        for name in pending:
+            with shard.engine.begin() as conn:
+                if not baseline:
+                    with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+                        for stmt in _statements(f.read()):
+                            conn.exec_driver_sql(stmt)
+                conn.execute(insert(schema_migrations).values(version=name))
+            print(f"{'Recorded' if baseline else 'Applied'} {name} (shard {shard.name})")
+
+
+def _tenant(slug: str):
+    tenant = tenant_directory.find(slug)
+    if tenant is None:
+        raise SystemExit(f"Unknown tenant {slug!r}; see `python manage.py tenant list`")
+    return tenant
+
+
+def seed(slug: str) -> None:
+    db = tenant_session(_tenant(slug))
+    try:
+        seed_departments(db)
+        seed_categories(db)
+        print(f"Seed data inserted for tenant {slug}")
+    finally:
+        db.close()
+
+
+def add_tenant(slug: str, name: str, shard: str) -> None:
+    if shard != DEFAULT_SHARD and shard not in SHARD_URLS:
+        raise SystemExit(f"Unknown shard {shard!r}; add it to TENANT_SHARDS first")
+    with engine.begin() as conn:
+        if conn.execute(select(Tenant.id).where(Tenant.slug == slug)).first() is not None:
+            raise SystemExit(f"Tenant {slug!r} already exists")
+        tenant_id = conn.execute(insert(Tenant).values(slug=slug, name=name, shard=shard)).inserted_primary_key[0]
+    print(f"Tenant {slug} created (id {tenant_id}, shard {shard}); seed it with `python manage.py seed --tenant {slug}`")
+
+
+def list_tenants() -> None:
+    with engine.connect() as conn:
+        for row in conn.execute(select(Tenant).order_by(Tenant.id)):
+            print(f"{row.id:>5}  {row.slug:<20} {row.shard:<12} {'active' if row.is_active else 'disabled':<9} {row.name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ResolveX database bootstrap")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("init", help="create all tables on a new database")
+    migrate_cmd = sub.add_parser("migrate", help="apply pending SQL migrations")
+    migrate_cmd.add_argument("--baseline", action="store_true", help="mark pending migrations applied without running them")
+    seed_cmd = sub.add_parser("seed", help="insert default departments and categories")
+    seed_cmd.add_argument("--tenant", default=settings.DEFAULT_TENANT, help="tenant slug (default: DEFAULT_TENANT)")
+    tenant_cmd = sub.add_parser("tenant", help="manage the tenant directory")
+    tenant_sub = tenant_cmd.add_subparsers(dest="action", required=True)
+    tenant_add = tenant_sub.add_parser("add", help="register a tenant")
+    tenant_add.add_argument("slug", help="lowercase name used in the tenant header / subdomain")
+    tenant_add.add_argument("name")
+    tenant_add.add_argument("--shard", default=DEFAULT_SHARD, help="database holding its rows (see TENANT_SHARDS)")
+    tenant_sub.add_parser("list", help="list tenants")
+    args = parser.parse_args()
+    if args.command == "init":
+        init_db()
+    elif args.command == "migrate":
+        migrate(baseline=args.baseline)
+    elif args.command == "tenant":
+        if args.action == "add":
+            add_tenant(args.slug.strip().lower(), args.name, args.shard)
+        else:
+            list_tenants()
+    else:
+        seed(args.tenant)
@@ -1,11 +1,25 @@
 """ResolveX Backend - SQLAlchemy ORM models."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, Enum, ForeignKey, DateTime, TIMESTAMP
+from sqlalchemy import (
+    Column, Integer, String, Text, Boolean, Enum, ForeignKey, DateTime, TIMESTAMP, LargeBinary, Index, UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from database import Base
+from services.tenancy import TenantScoped
 
 
-class Department(Base):
+class Tenant(Base):
+    """An organisation hosted on this deployment (directory: default shard only)."""
+    __tablename__ = "tenants"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    slug = Column(String(63), nullable=False, unique=True)
+    name = Column(String(150), nullable=False)
+    shard = Column(String(63), nullable=False, default="default")
+    is_active = Column(Boolean, default=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class Department(TenantScoped, Base):
     __tablename__ = "departments"
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
@@ -15,10 +29,14 @@ class Department(Base):
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
-class User(Base):
+class User(TenantScoped, Base):
     __tablename__ = "users"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "email", name="unique_tenant_email"),
+        Index("idx_users_tenant_role", "tenant_id", "role"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    email = Column(String(255), nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(150), nullable=False)
     role = Column(Enum("user", "staff", "admin", "super_admin"), default="user", nullable=False)
@@ -32,7 +50,7 @@ class User(Base):
     assignments = relationship("Assignment", back_populates="staff", foreign_keys="Assignment.staff_id")
 
 
-class Category(Base):
+class Category(TenantScoped, Base):
     __tablename__ = "categories"
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
@@ -42,8 +60,14 @@ class Category(Base):
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
 
-class Complaint(Base):
+class Complaint(TenantScoped, Base):
     __tablename__ = "complaints"
+    __table_args__ = (
+        Index("idx_complaints_tenant_created", "tenant_id", "created_at"),
+        Index("idx_complaints_tenant_status", "tenant_id", "status", "created_at"),
+        Index("idx_complaints_claim", "tenant_id", "status", "priority", "created_at", "category_id"),
+        Index("idx_complaints_status_closed", "status", "closed_at"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
@@ -74,7 +98,7 @@ class Complaint(Base):
     feedback_rel = relationship("Feedback", back_populates="complaint", uselist=False)
 
 
-class ComplaintLog(Base):
+class ComplaintLog(TenantScoped, Base):
     __tablename__ = "complaint_logs"
     id = Column(Integer, primary_key=True, autoincrement=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False)
@@ -89,7 +113,7 @@ class ComplaintLog(Base):
     user = relationship("User")
 
 
-class Assignment(Base):
+class Assignment(TenantScoped, Base):
     __tablename__ = "assignments"
     id = Column(Integer, primary_key=True, autoincrement=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False, unique=True)
@@ -102,7 +126,7 @@ class Assignment(Base):
     staff = relationship("User", back_populates="assignments", foreign_keys=[staff_id])
 
 
-class EvidenceUpload(Base):
+class EvidenceUpload(TenantScoped, Base):
     __tablename__ = "evidence_uploads"
     id = Column(Integer, primary_key=True, autoincrement=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False)
@@ -110,13 +134,26 @@ class EvidenceUpload(Base):
     file_path = Column(String(512), nullable=False)
     file_type = Column(String(50), nullable=False)
     file_size = Column(Integer)
+    sha256 = Column(String(64), index=True)
     uploaded_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
     complaint = relationship("Complaint", back_populates="evidence")
 
 
-class Feedback(Base):
+class EvidenceBlob(Base):
+    """One stored evidence file, shared by every upload with the same content."""
+    __tablename__ = "evidence_blobs"
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String(50), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    archived_refs = Column(Integer, nullable=False, default=0)  # evidence rows in complaint_archive payloads
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Feedback(TenantScoped, Base):
     __tablename__ = "feedback"
     id = Column(Integer, primary_key=True, autoincrement=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False, unique=True)
@@ -128,7 +165,7 @@ class Feedback(Base):
     complaint = relationship("Complaint", back_populates="feedback_rel")
 
 
-class EscalationLog(Base):
+class EscalationLog(TenantScoped, Base):
     __tablename__ = "escalation_log"
     id = Column(Integer, primary_key=True, autoincrement=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False)
@@ -136,3 +173,23 @@ class EscalationLog(Base):
     new_priority = Column(String(20), nullable=False)
     reason = Column(Text)
     triggered_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class ComplaintArchive(TenantScoped, Base):
+    """Closed complaint moved out of the hot tables, with its child rows, as one compressed snapshot.
+
+    The columns besides the payload are what lookups, analytics and exports filter and group on.
+    """
+    __tablename__ = "complaint_archive"
+    __table_args__ = (Index("idx_complaint_archive_tenant_created", "tenant_id", "created_at"),)
+    complaint_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False, index=True)
+    staff_id = Column(Integer)
+    category_id = Column(Integer)
+    priority = Column(Enum("low", "medium", "high", "critical"))
+    is_escalated = Column(Boolean, default=False, nullable=False)
+    created_at = Column(TIMESTAMP)  # NULL until backfilled for rows archived before these columns
+    resolved_at = Column(TIMESTAMP)
+    closed_at = Column(TIMESTAMP)
+    archived_at = Column(TIMESTAMP, default=datetime.utcnow)
+    payload = Column(LargeBinary(length=16777215), nullable=False)  # zlib-compressed JSON
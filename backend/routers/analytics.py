@@ -2,46 +2,72 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
-from database import get_db
-from dependencies import get_current_user, RequireAdmin
-from models import User, Complaint, Assignment, Category, Feedback
+from database import get_read_db, pool_stats
+from dependencies import admit, get_current_user, RequireAdmin
+from models import Complaint, ComplaintArchive, Assignment, Category, Feedback
 from schemas import AnalyticsSummary
 from services.ai_service import AIService
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
-@router.get("/summary", response_model=AnalyticsSummary)
+@router.get("/summary", response_model=AnalyticsSummary, dependencies=[Depends(admit("analytics"))])
 def get_analytics_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
+    # Raw SQL below is not tenant-scoped by the session (services/tenancy.py); filter explicitly
+    tenant = {"tid": db.info["tenant_id"]}
+    # Every figure also counts archived complaints (all closed), from complaint_archive's
+    # summary columns. Rows archived before those existed are left out of the breakdowns
+    # until the archival job has backfilled them (created_at IS NULL).
+
     # Total / open / resolved / escalated
-    total = db.query(func.count(Complaint.id)).scalar() or 0
+    archived = db.query(func.count(ComplaintArchive.complaint_id)).scalar() or 0
+    total = (db.query(func.count(Complaint.id)).scalar() or 0) + archived
     open_statuses = ["submitted", "categorized", "assigned", "in_progress"]
     open_count = db.query(func.count(Complaint.id)).filter(Complaint.status.in_(open_statuses)).scalar() or 0
-    resolved_count = db.query(func.count(Complaint.id)).filter(Complaint.status.in_(["resolved", "closed"])).scalar() or 0
-    escalated_count = db.query(func.count(Complaint.id)).filter(Complaint.is_escalated == True).scalar() or 0
+    resolved_count = (
+        db.query(func.count(Complaint.id)).filter(Complaint.status.in_(["resolved", "closed"])).scalar() or 0
+    ) + archived
+    escalated_count = (
+        (db.query(func.count(Complaint.id)).filter(Complaint.is_escalated == True).scalar() or 0)
+        + (db.query(func.count(ComplaintArchive.complaint_id)).filter(ComplaintArchive.is_escalated == True).scalar() or 0)
+    )
 
     # Avg resolution time (hours) - SQL
     avg_hours = db.execute(
         text("""
-            SELECT AVG(TIMESTAMPDIFF(HOUR, created_at, resolved_at)) AS avg_hours
-            FROM complaints
-            WHERE resolved_at IS NOT NULL
-        """)
+            SELECT AVG(hours) AS avg_hours
+            FROM (
+                SELECT TIMESTAMPDIFF(HOUR, created_at, resolved_at) AS hours
+                FROM complaints
+                WHERE tenant_id = :tid AND resolved_at IS NOT NULL
+                UNION ALL
+                SELECT TIMESTAMPDIFF(HOUR, created_at, resolved_at)
+                FROM complaint_archive
+                WHERE tenant_id = :tid AND resolved_at IS NOT NULL AND created_at IS NOT NULL
+            ) resolved
+        """),
+        tenant,
     ).scalar()
     avg_resolution_hours = float(avg_hours) if avg_hours is not None else None
 
     # By category - SQL
     by_category = db.execute(
         text("""
-            SELECT COALESCE(c.name, 'Uncategorized') AS name, COUNT(co.id) AS count
-            FROM complaints co
+            SELECT COALESCE(c.name, 'Uncategorized') AS name, COUNT(*) AS count
+            FROM (
+                SELECT category_id FROM complaints WHERE tenant_id = :tid
+                UNION ALL
+                SELECT category_id FROM complaint_archive WHERE tenant_id = :tid AND created_at IS NOT NULL
+            ) co
             LEFT JOIN categories c ON co.category_id = c.id
             GROUP BY co.category_id, c.name
             ORDER BY count DESC
-        """)
+        """),
+        tenant,
     ).fetchall()
     complaints_by_category = [{"name": r[0], "count": r[1]} for r in by_category]
 
@@ -49,10 +75,15 @@ def get_analytics_summary(
     by_priority = db.execute(
         text("""
             SELECT priority AS name, COUNT(*) AS count
-            FROM complaints
+            FROM (
+                SELECT priority FROM complaints WHERE tenant_id = :tid
+                UNION ALL
+                SELECT priority FROM complaint_archive WHERE tenant_id = :tid AND created_at IS NOT NULL
+            ) co
             GROUP BY priority
             ORDER BY FIELD(priority, 'critical', 'high', 'medium', 'low')
-        """)
+        """),
+        tenant,
     ).fetchall()
     complaints_by_priority = [{"name": r[0], "count": r[1]} for r in by_priority]
 
@@ -60,25 +91,38 @@ def get_analytics_summary(
     by_month = db.execute(
         text("""
             SELECT DATE_FORMAT(created_at, '%Y-%m') AS month, COUNT(*) AS count
-            FROM complaints
-            WHERE created_at >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+            FROM (
+                SELECT created_at FROM complaints
+                WHERE tenant_id = :tid AND created_at >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+                UNION ALL
+                SELECT created_at FROM complaint_archive
+                WHERE tenant_id = :tid AND created_at >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+            ) co
             GROUP BY DATE_FORMAT(created_at, '%Y-%m')
             ORDER BY month
-        """)
+        """),
+        tenant,
     ).fetchall()
     complaints_by_month = [{"month": r[0], "count": r[1]} for r in by_month]
 
     # Staff performance - resolved count per staff
     staff_perf = db.execute(
         text("""
-            SELECT u.id, u.full_name, COUNT(c.id) AS resolved_count
+            SELECT u.id, u.full_name, COUNT(c.id) + COALESCE(MAX(ar.archived_count), 0) AS resolved_count
             FROM users u
             LEFT JOIN assignments a ON a.staff_id = u.id
             LEFT JOIN complaints c ON c.id = a.complaint_id AND c.status IN ('resolved', 'closed')
-            WHERE u.role IN ('staff', 'admin')
+            LEFT JOIN (
+                SELECT staff_id, COUNT(*) AS archived_count
+                FROM complaint_archive
+                WHERE tenant_id = :tid AND staff_id IS NOT NULL
+                GROUP BY staff_id
+            ) ar ON ar.staff_id = u.id
+            WHERE u.tenant_id = :tid AND u.role IN ('staff', 'admin')
             GROUP BY u.id, u.full_name
             ORDER BY resolved_count DESC
-        """)
+        """),
+        tenant,
     ).fetchall()
     staff_performance = [{"staff_id": r[0], "staff_name": r[1], "resolved_count": r[2] or 0} for r in staff_perf]
 
@@ -95,10 +139,10 @@ def get_analytics_summary(
     )
 
 
-@router.get("/insights", response_model=str)
+@router.get("/insights", response_model=str, dependencies=[Depends(admit("ai"))])
 def get_dashboard_insights(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
     # Reuse the summary logic
     summary = get_analytics_summary(db, current_user)
@@ -109,3 +153,9 @@ def get_dashboard_insights(
     # Generate insights
     ai_service = AIService()
     return ai_service.generate_dashboard_insights(summary_dict)
+
+
+@router.get("/db-pool")
+def get_db_pool_stats(current_user: Principal = Depends(RequireAdmin)):
+    """Connection pool usage of this worker process (sync and async engines)."""
+    return pool_stats()
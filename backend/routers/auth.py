@@ -3,31 +3,47 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
 from config import settings
-from auth import verify_password, get_password_hash, create_access_token
-from dependencies import get_current_user
+from auth import verify_and_update_password_async, get_password_hash_async, create_access_token
+from dependencies import admit_anonymous, get_current_user
 from models import User
 from schemas import Token, UserCreate, UserResponse
+from services.principal_cache import Principal
+from services.accounts import find_user_by_email, email_registered, department_exists, create_user, store_password_hash
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/login", response_model=Token)
-def login(
+@router.post("/login", response_model=Token, dependencies=[Depends(admit_anonymous("auth"))])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(find_user_by_email, db, form_data.username)
+    valid, new_hash = (
+        await verify_and_update_password_async(form_data.password, user.hashed_password) if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="User is inactive")
+    if new_hash:
+        # Cost parameters changed since this hash was made
+        await run_in_threadpool(store_password_hash, db, user.id, new_hash)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": user.role},
+        data={
+            "sub": str(user.id),
+            "tid": user.tenant_id,
+            "email": user.email,
+            "role": user.role,
+            "name": user.full_name,
+            "dept": user.department_id,
+        },
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
     return Token(
@@ -44,20 +60,14 @@ def login(
     )
 
 
-@router.post("/register", response_model=UserResponse)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == data.email).first():
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(admit_anonymous("auth"))])
+async def register(data: UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(email_registered, db, data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(
-        email=data.email,
-        hashed_password=get_password_hash(data.password),
-        full_name=data.full_name,
-        role=data.role,
-        department_id=data.department_id,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    if data.department_id is not None and not await run_in_threadpool(department_exists, db, data.department_id):
+        raise HTTPException(status_code=400, detail="Invalid department")
+    hashed_password = await get_password_hash_async(data.password)
+    user = await run_in_threadpool(create_user, db, data, hashed_password)
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -70,13 +80,19 @@ def register(data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def me(current_user: User = Depends(get_current_user)):
+def me(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        department_id=current_user.department_id,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        department_id=user.department_id,
+        is_active=user.is_active,
+        created_at=user.created_at,
     )
@@ -2,11 +2,13 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, case, select, update
+from sqlalchemy.exc import IntegrityError
+from database import get_async_db, get_async_read_db
 from config import settings
-from dependencies import get_current_user, RequireUser, RequireStaff, RequireAdmin
+from dependencies import admit, get_current_user, RequireUser, RequireStaff, RequireAdmin
 from models import User, Complaint, ComplaintLog, Assignment, Category
 from schemas import (
     ComplaintCreate,
@@ -17,11 +19,35 @@ from schemas import (
 )
 from services.categorization import categorize_complaint
 from services.complaint_log import add_log
+from services.archival import get_archived_complaint, can_view_archived
+from services.auto_assign import auto_assigner, claimable_categories, workload
+from services.deadline_scheduler import deadline_scheduler
+from services.events import audience_of, stage
+from services.metrics import observe_assignment_wait
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/complaints", tags=["complaints"])
 
+# claim-next takes the first of these that has work; one index range scan each
+CLAIM_PRIORITIES = ("critical", "high", "medium", "low")
+CLAIM_ATTEMPTS = 3
 
-def _complaint_to_response(db: Session, c: Complaint) -> ComplaintResponse:
+# Everything _complaint_to_response touches; async sessions cannot lazy-load
+COMPLAINT_LOADS = (
+    joinedload(Complaint.user),
+    joinedload(Complaint.category),
+    joinedload(Complaint.assignment).joinedload(Assignment.staff),
+)
+
+
+async def _get_complaint(db: AsyncSession, complaint_id: int, refresh: bool = False) -> Complaint | None:
+    stmt = select(Complaint).options(*COMPLAINT_LOADS).where(Complaint.id == complaint_id)
+    if refresh:
+        stmt = stmt.execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalars().first()
+
+
+def _complaint_to_response(c: Complaint) -> ComplaintResponse:
     user_name = c.user.full_name if c.user else None
     category_name = c.category.name if c.category else None
     assigned_staff_name = None
@@ -49,12 +75,29 @@ def _complaint_to_response(db: Session, c: Complaint) -> ComplaintResponse:
     )
 
 
-@router.post("", response_model=ComplaintResponse)
-def create_complaint(
+async def _check_category(db: AsyncSession, category_id: int | None) -> None:
+    """Reject unknown categories, including another tenant's (the foreign key alone would accept those)."""
+    if category_id is not None and (await db.execute(select(Category.id).where(Category.id == category_id))).first() is None:
+        raise HTTPException(400, "Invalid category")
+
+
+async def _get_archived_or_404(db: AsyncSession, complaint_id: int, current_user: Principal) -> dict:
+    """Resolve a complaint no longer in the hot tables against the archive, with the same access rules."""
+    archived = await db.run_sync(get_archived_complaint, complaint_id)
+    if not archived:
+        raise HTTPException(404, "Complaint not found")
+    if not can_view_archived(archived, current_user):
+        raise HTTPException(403, "Access denied")
+    return archived
+
+
+@router.post("", response_model=ComplaintResponse, dependencies=[Depends(admit("ai"))])
+async def create_complaint(
     data: ComplaintCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireUser),
 ):
+    await _check_category(db, data.category_id)
     complaint = Complaint(
         user_id=current_user.id,
         title=data.title,
@@ -66,82 +109,160 @@ def create_complaint(
         due_date=datetime.utcnow() + timedelta(days=settings.SLA_DAYS),
     )
     db.add(complaint)
-    db.commit()
-    db.refresh(complaint)
-    categorize_complaint(db, complaint)
+    await db.commit()
+    await categorize_complaint(db, complaint)
     add_log(db, complaint.id, current_user.id, "created", None, "submitted", "Complaint submitted")
-    db.commit()
-    db.refresh(complaint)
-    return _complaint_to_response(db, complaint)
+    stage(db, complaint.id, "complaint", audience=[current_user.id])
+    await db.commit()
+    await db.run_sync(auto_assigner.assign, complaint)
+    complaint = await _get_complaint(db, complaint.id, refresh=True)
+    deadline_scheduler.track(complaint, db.info["shard"])
+    return _complaint_to_response(complaint)
+
+
+async def _next_unclaimed(db: AsyncSession, category_ids: list[int]):
+    """Lock the most urgent, oldest unassigned complaint in `category_ids`, skipping rows
+    another transaction has locked. Each query is a range of idx_complaints_claim
+    (tenant, status, priority) read in created_at order, filtered on the index's category_id;
+    only the row found is read from the table.
+    """
+    for priority in CLAIM_PRIORITIES:
+        row = (
+            await db.execute(
+                select(Complaint.id, Complaint.user_id, Complaint.priority, Complaint.created_at)
+                .where(
+                    Complaint.status == "categorized",
+                    Complaint.priority == priority,
+                    Complaint.category_id.in_(category_ids),
+                )
+                .order_by(Complaint.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+        ).first()
+        if row:
+            return row
+    return None
+
+
+@router.post("/claim-next", response_model=ComplaintResponse)
+async def claim_next_complaint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireStaff),
+):
+    """Assign the caller the next complaint they are eligible for: categories of their
+    department and categories without one, as auto-assignment would.
+
+    Concurrent callers never wait on each other's row locks and never get the same complaint.
+    """
+    # Read before locking: a subquery would lock the category rows too
+    category_ids = (
+        await db.execute(select(Category.id).where(claimable_categories(current_user.department_id)))
+    ).scalars().all()
+    claimed = None
+    for _ in range(CLAIM_ATTEMPTS if category_ids else 0):
+        row = await _next_unclaimed(db, category_ids)
+        if row is None:
+            break
+        try:
+            updated = (
+                await db.execute(
+                    update(Complaint)
+                    .where(Complaint.id == row.id, Complaint.status == "categorized")
+                    .values(status="assigned")
+                    .execution_options(synchronize_session=False)
+                )
+            ).rowcount
+            if updated:
+                db.add(Assignment(complaint_id=row.id, staff_id=current_user.id, assigned_by=current_user.id))
+                add_log(db, row.id, current_user.id, "assigned", None, current_user.full_name, "Claimed from the queue")
+                stage(db, row.id, "complaint", audience=[row.user_id, current_user.id])
+                await db.commit()
+                claimed = row
+                break
+            await db.rollback()  # assigned since it was read (databases without SKIP LOCKED)
+        except IntegrityError:
+            await db.rollback()
+    if claimed is None:
+        raise HTTPException(404, "No unassigned complaints to claim")
+    observe_assignment_wait("claim", (datetime.utcnow() - claimed.created_at).total_seconds())
+    # Nothing was assigned before; the claimer now carries it (in their department's queue too)
+    auto_assigner.retrack(db.info["shard"], db.info["tenant_id"], before=None, after=(current_user.id, claimed.priority))
+    c = await _get_complaint(db, claimed.id, refresh=True)
+    return _complaint_to_response(c)
 
 
 @router.get("", response_model=list[ComplaintResponse])
-def list_complaints(
+async def list_complaints(
     status_filter: Optional[str] = Query(None, alias="status"),
     priority_filter: Optional[str] = Query(None, alias="priority"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    q = db.query(Complaint).join(User)
+    q = select(Complaint).join(User, User.id == Complaint.user_id).options(*COMPLAINT_LOADS)
     if current_user.role == "user":
-        q = q.filter(Complaint.user_id == current_user.id)
+        q = q.where(Complaint.user_id == current_user.id)
     elif current_user.role == "staff":
-        q = q.outerjoin(Assignment, Assignment.complaint_id == Complaint.id).filter(
+        q = q.outerjoin(Assignment, Assignment.complaint_id == Complaint.id).where(
             (Assignment.staff_id == current_user.id) | (Complaint.user_id == current_user.id)
         )
     if status_filter:
-        q = q.filter(Complaint.status == status_filter)
+        q = q.where(Complaint.status == status_filter)
     if priority_filter:
-        q = q.filter(Complaint.priority == priority_filter)
-    complaints = q.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
-    return [_complaint_to_response(db, c) for c in complaints]
+        q = q.where(Complaint.priority == priority_filter)
+    complaints = (await db.execute(q.order_by(Complaint.created_at.desc()).offset(skip).limit(limit))).scalars().all()
+    return [_complaint_to_response(c) for c in complaints]
 
 
 @router.get("/all", response_model=list[ComplaintResponse])
-def list_all_complaints(
+async def list_all_complaints(
     status_filter: Optional[str] = Query(None, alias="status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
-    q = db.query(Complaint)
+    q = select(Complaint).options(*COMPLAINT_LOADS)
     if status_filter:
-        q = q.filter(Complaint.status == status_filter)
-    complaints = q.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
-    return [_complaint_to_response(db, c) for c in complaints]
+        q = q.where(Complaint.status == status_filter)
+    complaints = (await db.execute(q.order_by(Complaint.created_at.desc()).offset(skip).limit(limit))).scalars().all()
+    return [_complaint_to_response(c) for c in complaints]
 
 
 @router.get("/{complaint_id}", response_model=ComplaintResponse)
-def get_complaint(
+async def get_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = await _get_complaint(db, complaint_id)
     if not c:
-        raise HTTPException(404, "Complaint not found")
+        archived = await _get_archived_or_404(db, complaint_id, current_user)
+        return ComplaintResponse(**archived["complaint"])
     if current_user.role == "user" and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
     if current_user.role == "staff" and c.assignment and c.assignment.staff_id != current_user.id and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
-    return _complaint_to_response(db, c)
+    return _complaint_to_response(c)
 
 
 @router.patch("/{complaint_id}", response_model=ComplaintResponse)
-def update_complaint(
+async def update_complaint(
     complaint_id: int,
     data: ComplaintUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireStaff),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireStaff),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = await _get_complaint(db, complaint_id)
     if not c:
         raise HTTPException(404, "Complaint not found")
     if current_user.role == "staff" and (not c.assignment or c.assignment.staff_id != current_user.id):
         raise HTTPException(403, "Not assigned to this complaint")
+    await _check_category(db, data.category_id)
+    stage(db, complaint_id, "complaint", audience=audience_of(c))
+    load_before = workload(c)
     if data.status is not None:
         add_log(db, complaint_id, current_user.id, "status_change", c.status, data.status, None)
         c.status = data.status
@@ -160,25 +281,32 @@ def update_complaint(
         c.category_id = data.category_id
     if data.location is not None:
         c.location = data.location
-    db.commit()
-    db.refresh(c)
-    return _complaint_to_response(db, c)
+    await db.commit()
+    c = await _get_complaint(db, complaint_id, refresh=True)
+    deadline_scheduler.track(c, db.info["shard"])
+    auto_assigner.retrack(db.info["shard"], db.info["tenant_id"], load_before, workload(c))
+    return _complaint_to_response(c)
 
 
 @router.post("/{complaint_id}/assign", response_model=ComplaintResponse)
-def assign_complaint(
+async def assign_complaint(
     complaint_id: int,
     data: ComplaintAssign,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = await _get_complaint(db, complaint_id)
     if not c:
         raise HTTPException(404, "Complaint not found")
-    staff = db.query(User).filter(User.id == data.staff_id, User.role.in_(["staff", "admin"])).first()
+    staff = (
+        await db.execute(select(User).where(User.id == data.staff_id, User.role.in_(["staff", "admin"])))
+    ).scalars().first()
     if not staff:
         raise HTTPException(400, "Invalid staff")
-    existing = db.query(Assignment).filter(Assignment.complaint_id == complaint_id).first()
+    # The previous assignee (if any) hears about it too
+    stage(db, complaint_id, "complaint", audience=[*audience_of(c), staff.id])
+    load_before = workload(c)
+    existing = c.assignment
     if existing:
         existing.staff_id = data.staff_id
         existing.assigned_by = current_user.id
@@ -188,23 +316,35 @@ def assign_complaint(
         db.add(a)
     add_log(db, complaint_id, current_user.id, "assigned", None, staff.full_name, data.notes)
     c.status = "assigned"
-    db.commit()
-    db.refresh(c)
-    return _complaint_to_response(db, c)
+    waited = (datetime.utcnow() - c.created_at).total_seconds()
+    await db.commit()
+    if not existing:
+        observe_assignment_wait("manual", waited)
+    c = await _get_complaint(db, complaint_id, refresh=True)
+    auto_assigner.retrack(db.info["shard"], db.info["tenant_id"], load_before, workload(c))
+    return _complaint_to_response(c)
 
 
 @router.get("/{complaint_id}/logs", response_model=list[ComplaintLogResponse])
-def get_complaint_logs(
+async def get_complaint_logs(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = (await db.execute(select(Complaint).where(Complaint.id == complaint_id))).scalars().first()
     if not c:
-        raise HTTPException(404, "Complaint not found")
+        archived = await _get_archived_or_404(db, complaint_id, current_user)
+        return [ComplaintLogResponse(**l) for l in archived["logs"]]
     if current_user.role == "user" and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
-    logs = db.query(ComplaintLog).filter(ComplaintLog.complaint_id == complaint_id).order_by(ComplaintLog.created_at).all()
+    logs = (
+        await db.execute(
+            select(ComplaintLog)
+            .options(joinedload(ComplaintLog.user))
+            .where(ComplaintLog.complaint_id == complaint_id)
+            .order_by(ComplaintLog.created_at)
+        )
+    ).scalars().all()
     return [
         ComplaintLogResponse(
             id=l.id,
@@ -0,0 +1,97 @@
+"""ResolveX Backend - Server-sent events: push complaint changes to open pages."""
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from config import settings
+from dependencies import RequireUser
+from models import Assignment, Complaint
+from services.archival import can_view_archived, get_archived_complaint
+from services.events import event_broker
+from services.principal_cache import Principal
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+MAX_COMPLAINTS_PER_STREAM = 50
+RETRY_MS = 3000
+
+
+def _can_watch(user: Principal, owner_id: int, staff_id: int | None) -> bool:
+    """Same rule as GET /complaints/{id}."""
+    if user.role == "user":
+        return owner_id == user.id
+    if user.role == "staff":
+        return staff_id is None or staff_id == user.id or owner_id == user.id
+    return True
+
+
+async def _frames(user: Principal, watched: set[int], inbox: bool):
+    # Subscribed here rather than in the endpoint, so the `finally` below always pairs with it
+    subscription = event_broker.subscribe(user.tenant_id, user.id, user.role, watched, inbox)
+    deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                frame = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.EVENTS_HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is None:
+                return
+            yield frame
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_events(
+    complaint_id: list[int] = Query([], description="Complaints to watch (repeat the parameter)"),
+    inbox: bool = Query(False, description="Also every complaint you created or are assigned (admins: all)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireUser),
+):
+    """`text/event-stream` of `complaint` events ({complaint_id, changes, at}) plus `resync` when
+    events may have been missed. Streams end after EVENTS_STREAM_MAX_SECONDS (so tokens are
+    re-checked and workers can shut down); clients reconnect and re-fetch once.
+    """
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(404, "Server push is disabled")
+    watched = set(complaint_id)
+    if not watched and not inbox:
+        raise HTTPException(400, "Watch at least one complaint or the inbox")
+    if len(watched) > MAX_COMPLAINTS_PER_STREAM:
+        raise HTTPException(400, f"At most {MAX_COMPLAINTS_PER_STREAM} complaints per stream")
+    if watched:
+        rows = (
+            await db.execute(
+                select(Complaint.id, Complaint.user_id, Assignment.staff_id)
+                .outerjoin(Assignment, Assignment.complaint_id == Complaint.id)
+                .where(Complaint.id.in_(watched))
+            )
+        ).all()
+        if any(not _can_watch(current_user, owner_id, staff_id) for _, owner_id, staff_id in rows):
+            raise HTTPException(403, "Access denied")
+        # Events are not re-checked when they are sent, so an id without a complaint (yet)
+        # must not be watched: it would receive the events of whoever files it next
+        for missing in watched - {row.id for row in rows}:
+            archived = await db.run_sync(get_archived_complaint, missing)
+            if not archived:
+                raise HTTPException(404, f"Complaint {missing} not found")
+            if not can_view_archived(archived, current_user):
+                raise HTTPException(403, "Access denied")
+            watched.discard(missing)  # archived complaints never change
+        if not watched and not inbox:
+            raise HTTPException(400, "Watch at least one complaint or the inbox")
+    # The stream stays open for minutes; it must not keep a pooled connection checked out
+    await db.close()
+    return StreamingResponse(
+        _frames(current_user, watched, inbox),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,14 +1,26 @@
 """ResolveX Backend - Evidence upload API."""
 import os
-import uuid
-import aiofiles
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from database import get_db
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from starlette.concurrency import run_in_threadpool
+from database import get_async_db, get_async_read_db
 from config import settings
-from dependencies import get_current_user, RequireUser
-from models import User, Complaint, EvidenceUpload
+from dependencies import admit, get_current_user, RequireUser, RequireAdmin
+from models import Complaint, ComplaintArchive, EvidenceUpload
+from services.archival import get_archived_complaint, can_view_archived, decode_snapshot
+from services.uploads import EXTENSIONS, MULTIPART_OVERHEAD_BYTES, BadUpload, UploadTooLarge, discard, stage_upload
+from services.blob_store import acquire_blob, blob_store, open_evidence, resolve_local_path
+from services.derivatives import MEDIA_TYPE, derivative_generator
+from services.file_delivery import send_file
+from services.zip_stream import ZipEntry, safe_name, stream_zip
+from services.principal_cache import Principal
+from services.events import audience_of, stage
 
 router = APIRouter(prefix="/evidence", tags=["evidence"])
 
@@ -16,79 +28,327 @@ ALLOWED_IMAGE = {"image/jpeg", "image/png", "image/gif", "image/webp"}
 ALLOWED_DOC = {"application/pdf"}
 ALLOWED = ALLOWED_IMAGE | ALLOWED_DOC
 MAX_BYTES = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+# Evidence and its derivatives never change once uploaded, so a given URL always returns the same bytes
+EVIDENCE_CACHE_CONTROL = f"private, max-age={settings.EVIDENCE_CACHE_MAX_AGE_SECONDS}, immutable"
+ARCHIVE_EXPORT_BATCH = 200  # archived snapshots read (and decompressed) per query in bulk exports
 
 
-@router.post("/{complaint_id}")
+async def _get_complaint(db: AsyncSession, complaint_id: int) -> Complaint | None:
+    stmt = select(Complaint).options(joinedload(Complaint.assignment)).where(Complaint.id == complaint_id)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def _list_rows(db: AsyncSession, complaint_id: int) -> list[EvidenceUpload]:
+    stmt = select(EvidenceUpload).where(EvidenceUpload.complaint_id == complaint_id).order_by(EvidenceUpload.id)
+    return (await db.execute(stmt)).scalars().all()
+
+
+def _evidence_out(r, archived: bool = False) -> dict:
+    has_previews = derivative_generator.supports(r.file_type)
+    # Archived rows are only found through their complaint's snapshot (see download_evidence)
+    query = f"&complaint_id={r.complaint_id}" if archived else ""
+    return {
+        "id": r.id,
+        "file_name": r.file_name,
+        "file_type": r.file_type,
+        "file_size": r.file_size,
+        "created_at": str(r.created_at),
+        "thumbnail_url": f"/api/evidence/file/{r.id}?size=thumb{query}" if has_previews else None,
+        "preview_url": f"/api/evidence/file/{r.id}?size=preview{query}" if has_previews else None,
+    }
+
+
+def _archived_row(r: dict) -> SimpleNamespace:
+    """An evidence row of an archived snapshot, shaped like EvidenceUpload."""
+    created_at = r["created_at"]
+    return SimpleNamespace(**{**r, "created_at": datetime.fromisoformat(created_at) if created_at else None})
+
+
+async def _get_archived_evidence(
+    db: AsyncSession, complaint_id: int, evidence_id: int, current_user: Principal
+) -> SimpleNamespace | None:
+    archived = await db.run_sync(get_archived_complaint, complaint_id)
+    row = next((r for r in archived["evidence"] if r["id"] == evidence_id), None) if archived else None
+    if row is None:
+        return None
+    if not can_view_archived(archived, current_user):
+        raise HTTPException(403, "Access denied")
+    return _archived_row(row)
+
+
+def _zip_entry(r) -> ZipEntry:
+    created_at = r.created_at if isinstance(r.created_at, datetime) else datetime.fromisoformat(r.created_at)
+    return ZipEntry(
+        name=f"complaint-{r.complaint_id}/{r.id}-{safe_name(r.file_name)}",
+        mime_type=r.file_type,
+        size=r.file_size or 0,
+        modified=created_at,
+        open=lambda: open_evidence(r),
+    )
+
+
+def _declared_size_within_limit(request: Request) -> None:
+    """Refuse a body whose Content-Length is already over the limit, before any of it is read."""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(413, f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB} MB")
+
+
+# The body is parsed by stage_upload rather than declared as a File parameter; describe it for /docs
+UPLOAD_REQUEST_BODY = {
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }
+        }
+    },
+    "required": True,
+}
+
+
+def _zip_response(entries: list[ZipEntry], filename: str) -> StreamingResponse:
+    # Entries carry only metadata, so the DB session can close before streaming starts
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/{complaint_id}",
+    dependencies=[Depends(_declared_size_within_limit), Depends(admit("uploads"))],
+    openapi_extra={"requestBody": UPLOAD_REQUEST_BODY},
+)
 async def upload_evidence(
     complaint_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = await _get_complaint(db, complaint_id)
     if not c:
         raise HTTPException(404, "Complaint not found")
     if current_user.role == "user" and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
-    if not file.content_type or file.content_type not in ALLOWED:
+    audience = audience_of(c)  # read before the rollback expires `c`
+    # Hand the connection back while the body streams in; a slow client must not hold it
+    await db.rollback()
+    try:
+        staged = await stage_upload(request, "file", settings.UPLOAD_DIR, MAX_BYTES)
+    except UploadTooLarge:
+        raise HTTPException(413, f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB} MB")
+    except BadUpload as e:
+        raise HTTPException(400, str(e))
+    if staged.mime_type not in ALLOWED:
+        # The declared content type is client-controlled; trust the bytes instead
+        discard(staged.path)
         raise HTTPException(400, "Only JPG, PNG, GIF, WebP and PDF allowed")
-    content = await file.read()
-    if len(content) > MAX_BYTES:
-        raise HTTPException(400, f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB} MB")
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    ext = os.path.splitext(file.filename or "bin")[1] or ".bin"
-    safe_name = f"{uuid.uuid4().hex}{ext}"
-    path = os.path.join(settings.UPLOAD_DIR, safe_name)
-    async with aiofiles.open(path, "wb") as f:
-        await f.write(content)
+    try:
+        key = await db.run_sync(acquire_blob, staged.sha256, staged.size, staged.mime_type, staged.path)
+    except Exception:
+        discard(staged.path)
+        raise
     rec = EvidenceUpload(
         complaint_id=complaint_id,
-        file_name=file.filename or safe_name,
-        file_path=path,
-        file_type=file.content_type,
-        file_size=len(content),
+        file_name=staged.filename or f"{staged.sha256[:16]}{EXTENSIONS[staged.mime_type]}",
+        file_path=key,
+        file_type=staged.mime_type,
+        file_size=staged.size,
+        sha256=staged.sha256,
         uploaded_by=current_user.id,
     )
     db.add(rec)
-    db.commit()
-    db.refresh(rec)
+    stage(db, complaint_id, "evidence", audience=audience)
+    await db.commit()
+    await db.refresh(rec)
+    derivative_generator.schedule(rec.sha256, rec.file_type, resolve_local_path(rec))
     return {"id": rec.id, "file_name": rec.file_name, "file_type": rec.file_type, "created_at": str(rec.created_at)}
 
 
+@router.get("/archive")
+async def export_evidence_archive(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority_filter: Optional[str] = Query(None, alias="priority"),
+    category_id: Optional[int] = Query(None),
+    created_from: Optional[date] = Query(None),
+    created_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireAdmin),
+):
+    """ZIP of the evidence of every complaint matching the filters, live or archived, one folder per complaint."""
+    q = select(
+        EvidenceUpload.id,
+        EvidenceUpload.complaint_id,
+        EvidenceUpload.file_name,
+        EvidenceUpload.file_type,
+        EvidenceUpload.file_size,
+        EvidenceUpload.file_path,
+        EvidenceUpload.sha256,
+        EvidenceUpload.created_at,
+    ).join(Complaint, Complaint.id == EvidenceUpload.complaint_id)
+    if status_filter:
+        q = q.where(Complaint.status == status_filter)
+    if priority_filter:
+        q = q.where(Complaint.priority == priority_filter)
+    if category_id:
+        q = q.where(Complaint.category_id == category_id)
+    if created_from:
+        q = q.where(Complaint.created_at >= created_from)
+    if created_to:
+        q = q.where(Complaint.created_at < created_to + timedelta(days=1))
+    rows = (await db.execute(q.order_by(EvidenceUpload.complaint_id, EvidenceUpload.id))).all()
+    archived = await _archived_export_rows(db, status_filter, priority_filter, category_id, created_from, created_to)
+    rows = sorted([*rows, *archived], key=lambda r: (r.complaint_id, r.id))
+    return _zip_response([_zip_entry(r) for r in rows], f"evidence-export-{datetime.utcnow():%Y%m%d-%H%M%S}.zip")
+
+
+async def _archived_export_rows(
+    db: AsyncSession,
+    status_filter: str | None,
+    priority_filter: str | None,
+    category_id: int | None,
+    created_from: date | None,
+    created_to: date | None,
+) -> list[SimpleNamespace]:
+    """Evidence of archived complaints matching export_evidence_archive's filters.
+
+    The filters run on complaint_archive's columns; only matching payloads are read, a batch
+    at a time, and decompressed in the threadpool so the event loop stays free.
+    """
+    if status_filter and status_filter != "closed":
+        return []  # only closed complaints are archived
+    q = select(ComplaintArchive.complaint_id, ComplaintArchive.payload)
+    if priority_filter:
+        q = q.where(ComplaintArchive.priority == priority_filter)
+    if category_id:
+        q = q.where(ComplaintArchive.category_id == category_id)
+    if created_from:
+        q = q.where(ComplaintArchive.created_at >= created_from)
+    if created_to:
+        q = q.where(ComplaintArchive.created_at < created_to + timedelta(days=1))
+    q = q.order_by(ComplaintArchive.complaint_id).limit(ARCHIVE_EXPORT_BATCH)
+    rows, after = [], 0
+    while batch := (await db.execute(q.where(ComplaintArchive.complaint_id > after))).all():
+        rows += await run_in_threadpool(_archived_evidence, [payload for _, payload in batch])
+        after = batch[-1].complaint_id
+    return rows
+
+
+def _archived_evidence(payloads: list[bytes]) -> list[SimpleNamespace]:
+    return [_archived_row(r) for payload in payloads for r in decode_snapshot(payload)["evidence"]]
+
+
 @router.get("/{complaint_id}")
-def list_evidence(
+async def list_evidence(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = await _get_complaint(db, complaint_id)
     if not c:
-        raise HTTPException(404, "Complaint not found")
+        archived = await db.run_sync(get_archived_complaint, complaint_id)
+        if not archived:
+            raise HTTPException(404, "Complaint not found")
+        if not can_view_archived(archived, current_user):
+            raise HTTPException(403, "Access denied")
+        return [_evidence_out(_archived_row(r), archived=True) for r in archived["evidence"]]
     if current_user.role == "user" and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
     if current_user.role == "staff" and c.assignment and c.assignment.staff_id != current_user.id:
         raise HTTPException(403, "Access denied")
-    rows = db.query(EvidenceUpload).filter(EvidenceUpload.complaint_id == complaint_id).all()
-    return [
-        {"id": r.id, "file_name": r.file_name, "file_type": r.file_type, "file_size": r.file_size, "created_at": str(r.created_at)}
-        for r in rows
-    ]
+    return [_evidence_out(r) for r in await _list_rows(db, complaint_id)]
+
+
+@router.get("/{complaint_id}/archive")
+async def download_evidence_archive(
+    complaint_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireUser),
+):
+    c = await _get_complaint(db, complaint_id)
+    if not c:
+        archived = await db.run_sync(get_archived_complaint, complaint_id)
+        if not archived:
+            raise HTTPException(404, "Complaint not found")
+        if not can_view_archived(archived, current_user):
+            raise HTTPException(403, "Access denied")
+        rows = [_archived_row(r) for r in archived["evidence"]]
+    else:
+        if current_user.role == "user" and c.user_id != current_user.id:
+            raise HTTPException(403, "Access denied")
+        if current_user.role == "staff" and c.assignment and c.assignment.staff_id != current_user.id:
+            raise HTTPException(403, "Access denied")
+        rows = await _list_rows(db, complaint_id)
+    return _zip_response([_zip_entry(r) for r in rows], f"complaint-{complaint_id}-evidence.zip")
 
 
 @router.get("/file/{evidence_id}")
-def download_evidence(
+async def download_evidence(
     evidence_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    request: Request,
+    size: str | None = Query(None, pattern="^(thumb|preview)$"),
+    complaint_id: Optional[int] = Query(None, description="the evidence's complaint; needed once it is archived"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(RequireUser),
 ):
-    rec = db.query(EvidenceUpload).filter(EvidenceUpload.id == evidence_id).first()
+    stmt = (
+        select(EvidenceUpload)
+        .options(joinedload(EvidenceUpload.complaint).joinedload(Complaint.assignment))
+        .where(EvidenceUpload.id == evidence_id)
+    )
+    rec = (await db.execute(stmt)).scalars().first()
+    if rec:
+        c = rec.complaint
+        if current_user.role == "user" and c.user_id != current_user.id:
+            raise HTTPException(403, "Access denied")
+        if current_user.role == "staff" and c.assignment and c.assignment.staff_id != current_user.id:
+            raise HTTPException(403, "Access denied")
+    elif complaint_id is not None:
+        rec = await _get_archived_evidence(db, complaint_id, evidence_id, current_user)
     if not rec:
         raise HTTPException(404, "Evidence not found")
-    c = rec.complaint
-    if current_user.role == "user" and c.user_id != current_user.id:
-        raise HTTPException(403, "Access denied")
-    if current_user.role == "staff" and c.assignment and c.assignment.staff_id != current_user.id:
-        raise HTTPException(403, "Access denied")
-    if not os.path.isfile(rec.file_path):
+    path = resolve_local_path(rec)
+    if size:
+        # Legacy uploads (no hash yet) have no derivatives until migrated into the blob store
+        preview, pending = None, False
+        if rec.sha256:
+            preview, pending = derivative_generator.get(rec.sha256, rec.file_type, path, size)
+        if pending:
+            # Still rendering; the client retries rather than holding a worker while it waits
+            return Response(status_code=202, headers={"Retry-After": "1", "Cache-Control": "no-store"})
+        if preview is None:
+            raise HTTPException(404, "Preview not available")
+        stat = os.stat(preview)
+        return send_file(
+            request,
+            path=preview,
+            size=stat.st_size,
+            etag=f'"{rec.sha256}-{size}"',
+            last_modified=datetime.utcfromtimestamp(stat.st_mtime),
+            media_type=MEDIA_TYPE,
+            cache_control=EVIDENCE_CACHE_CONTROL,
+        )
+    if path is None:
+        # Backend without a filesystem path (object store): stream through the worker
+        if not blob_store.exists(rec.sha256):
+            raise HTTPException(404, "File not found on server")
+        opener, file_size = (lambda: blob_store.open(rec.sha256)), rec.file_size
+    elif not os.path.isfile(path):
         raise HTTPException(404, "File not found on server")
-    return FileResponse(rec.file_path, filename=rec.file_name, media_type=rec.file_type)
+    else:
+        opener, file_size = None, os.path.getsize(path)
+    return send_file(
+        request,
+        path=path,
+        opener=opener,
+        size=file_size,
+        etag=f'"{rec.sha256}"' if rec.sha256 else f'"evidence-{rec.id}-{file_size}"',
+        last_modified=rec.created_at,
+        media_type=rec.file_type,
+        cache_control=EVIDENCE_CACHE_CONTROL,
+        filename=rec.file_name,
+    )
@@ -1,10 +1,13 @@
 """ResolveX Backend - Feedback API (after resolution)."""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.orm import Session, joinedload
+from database import get_db, get_read_db
 from dependencies import get_current_user, RequireUser
-from models import User, Complaint, Feedback
+from models import Complaint, Feedback
 from schemas import FeedbackCreate, FeedbackResponse
+from services.archival import get_archived_complaint, can_view_archived
+from services.principal_cache import Principal
+from services.events import audience_of, stage
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
@@ -14,9 +17,9 @@ def submit_feedback(
     complaint_id: int,
     data: FeedbackCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    current_user: Principal = Depends(RequireUser),
 ):
-    c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    c = db.query(Complaint).options(joinedload(Complaint.assignment)).filter(Complaint.id == complaint_id).first()
     if not c:
         raise HTTPException(404, "Complaint not found")
     if c.user_id != current_user.id:
@@ -28,6 +31,7 @@ def submit_feedback(
         raise HTTPException(400, "Feedback already submitted")
     f = Feedback(complaint_id=complaint_id, user_id=current_user.id, rating=data.rating, comment=data.comment)
     db.add(f)
+    stage(db, complaint_id, "feedback", audience=audience_of(c))
     db.commit()
     db.refresh(f)
     return FeedbackResponse(
@@ -43,12 +47,17 @@ def submit_feedback(
 @router.get("/{complaint_id}", response_model=FeedbackResponse | None)
 def get_feedback(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireUser),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(RequireUser),
 ):
     c = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if not c:
-        raise HTTPException(404, "Complaint not found")
+        archived = get_archived_complaint(db, complaint_id)
+        if not archived:
+            raise HTTPException(404, "Complaint not found")
+        if not can_view_archived(archived, current_user):
+            raise HTTPException(403, "Access denied")
+        return FeedbackResponse(**archived["feedback"]) if archived["feedback"] else None
     if current_user.role == "user" and c.user_id != current_user.id:
         raise HTTPException(403, "Access denied")
     f = db.query(Feedback).filter(Feedback.complaint_id == complaint_id).first()
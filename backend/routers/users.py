@@ -1,11 +1,14 @@
 """ResolveX Backend - Users API (admin: list staff/admins)."""
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from database import get_db
+from starlette.concurrency import run_in_threadpool
+from database import get_db, get_read_db
 from dependencies import get_current_user, RequireAdmin, RequireSuperAdmin
 from models import User
 from schemas import UserResponse, UserCreate
-from auth import get_password_hash
+from auth import get_password_hash_async
+from services.accounts import email_registered, department_exists, create_user as insert_user
+from services.principal_cache import Principal
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -13,8 +16,8 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("", response_model=list[UserResponse])
 def list_users(
     role: str | None = Query(None, description="Filter by role"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
     q = db.query(User).filter(User.is_active == True)
     if current_user.role == "admin":
@@ -38,8 +41,8 @@ def list_users(
 
 @router.get("/staff", response_model=list[UserResponse])
 def list_staff(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(RequireAdmin),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(RequireAdmin),
 ):
     users = db.query(User).filter(User.role.in_(["staff", "admin"]), User.is_active == True).order_by(User.full_name).all()
     return [
@@ -57,24 +60,19 @@ def list_staff(
 
 
 @router.post("", response_model=UserResponse)
-def create_user(
+async def create_user(
     data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(RequireSuperAdmin),
+    current_user: Principal = Depends(RequireSuperAdmin),
 ):
-    if db.query(User).filter(User.email == data.email).first():
+    if await run_in_threadpool(email_registered, db, data.email):
         from fastapi import HTTPException
         raise HTTPException(400, "Email already registered")
-    user = User(
-        email=data.email,
-        hashed_password=get_password_hash(data.password),
-        full_name=data.full_name,
-        role=data.role,
-        department_id=data.department_id,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    if data.department_id is not None and not await run_in_threadpool(department_exists, db, data.department_id):
+        from fastapi import HTTPException
+        raise HTTPException(400, "Invalid department")
+    hashed_password = await get_password_hash_async(data.password)
+    user = await run_in_threadpool(insert_user, db, data, hashed_password)
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -142,6 +142,7 @@ class EvidenceUploadResponse(BaseModel):
     file_path: str
     file_type: str
     file_size: Optional[int] = None
+    sha256: Optional[str] = None
     uploaded_by: int
     created_at: datetime
 
@@ -1,5 +1,7 @@
 import json
-from database import SessionLocal
+from config import settings
+from database import tenant_session
+from services.tenancy import tenant_directory
 from models import Department, Category
 
 
@@ -109,7 +111,7 @@ def seed_categories(db):
 
 
 if __name__ == "__main__":
-    db = SessionLocal()
+    db = tenant_session(tenant_directory.find(settings.DEFAULT_TENANT))
     try:
         seed_departments(db)
         seed_categories(db)
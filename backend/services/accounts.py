@@ -0,0 +1,50 @@
+"""ResolveX Backend - User account persistence used around (slow) password hashing.
+
+The auth handlers are async so they can await the hashing pool without holding a
+threadpool thread; these helpers run in the threadpool and hand the DB connection
+back before hashing starts.
+"""
+from sqlalchemy.orm import Session
+from models import Department, User
+from schemas import UserCreate
+
+
+def find_user_by_email(db: Session, email: str) -> User | None:
+    """Return the user detached from the session, with the connection released."""
+    user = db.query(User).filter(User.email == email).first()
+    if user:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+
+def email_registered(db: Session, email: str) -> bool:
+    exists = db.query(User.id).filter(User.email == email).first() is not None
+    db.rollback()
+    return exists
+
+
+def department_exists(db: Session, department_id: int) -> bool:
+    """False for unknown ids, including another tenant's departments."""
+    exists = db.query(Department.id).filter(Department.id == department_id).first() is not None
+    db.rollback()
+    return exists
+
+
+def create_user(db: Session, data: UserCreate, hashed_password: str) -> User:
+    user = User(
+        email=data.email,
+        hashed_password=hashed_password,
+        full_name=data.full_name,
+        role=data.role,
+        department_id=data.department_id,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def store_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+    db.commit()
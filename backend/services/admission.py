@@ -0,0 +1,248 @@
+"""ResolveX Backend - Admission control for expensive endpoints.
+
+Endpoints are grouped into classes ("ai", "analytics", "uploads", "auth"). A
+request in a class must pass two checks before it runs:
+
+- a token bucket per caller and class (users by tenant + id, anonymous auth
+  requests by client address + account). RATE_LIMITS sets capacity and refill
+  per class, optionally per role: "ai=10/60,admin:ai=30/60" = bursts of 10
+  refilled over 60 s, 30 for admins. Anonymous requests also take a token from
+  a bucket per client address alone, whose rate is the "address:" entry.
+- a concurrency limit per class (CONCURRENCY_LIMITS, "ai=8,analytics=4"), so one
+  class cannot take every threadpool thread and connection from cheap endpoints.
+
+Refusals are 429 with Retry-After (dependencies.py). State lives in a backend:
+
+- "local": per worker process. Limits apply per worker.
+- "redis": shared by every worker (needs the `redis` package). Buckets and slots
+  are updated by Lua scripts. Slots expire after ADMISSION_SLOT_TTL_SECONDS, in
+  case a worker dies holding them. If Redis is unreachable, requests are admitted.
+"""
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from config import settings
+from services.metrics import observe_admission_rejected
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT_CLASSES = ("ai", "analytics", "uploads", "auth")
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    per_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+def parse_rate_limits(spec: str) -> dict[tuple[str | None, str], Rate]:
+    """RATE_LIMITS as {(role or None, class): Rate}; a capacity of 0 turns the limit off."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        role, _, endpoint_class = key.strip().rpartition(":")
+        capacity, _, seconds = value.partition("/")
+        if endpoint_class not in ENDPOINT_CLASSES or not capacity.strip().isdigit():
+            raise ValueError(f"Bad RATE_LIMITS entry {item!r}: expected [role:]class=requests/seconds")
+        rates[(role or None, endpoint_class)] = Rate(int(capacity), float(seconds or 60))
+    return rates
+
+
+def parse_concurrency_limits(spec: str) -> dict[str, int]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        endpoint_class, _, value = item.partition("=")
+        if endpoint_class.strip() not in ENDPOINT_CLASSES or not value.strip().isdigit():
+            raise ValueError(f"Bad CONCURRENCY_LIMITS entry {item!r}: expected class=slots")
+        limits[endpoint_class.strip()] = int(value)
+    return limits
+
+
+# -------- backends --------
+class AdmissionBackend(ABC):
+    @abstractmethod
+    async def take(self, key: str, rate: Rate) -> float:
+        """Take one token from bucket `key`: 0 if admitted, else seconds until one is available."""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: int) -> str | None:
+        """Claim one of `limit` slots; returns a handle for `release`, None if all are taken."""
+
+    @abstractmethod
+    async def release(self, key: str, handle: str) -> None: ...
+
+
+class LocalBackend(AdmissionBackend):
+    """Per-process buckets (bounded LRU, so idle callers are forgotten) and slot counters."""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated)
+        self._slots: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.refill_per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate.refill_per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def acquire(self, key: str, limit: int) -> str | None:
+        with self._lock:
+            if self._slots.get(key, 0) >= limit:
+                return None
+            self._slots[key] = self._slots.get(key, 0) + 1
+        return key
+
+    async def release(self, key: str, handle: str) -> None:
+        with self._lock:
+            self._slots[key] = max(0, self._slots.get(key, 0) - 1)
+
+
+_TAKE_SCRIPT = """
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+_ACQUIRE_SCRIPT = """
+local limit, now, expires, handle = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4]
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= limit then return 0 end
+redis.call('ZADD', KEYS[1], expires, handle)
+redis.call('EXPIRE', KEYS[1], math.ceil(expires - now) + 1)
+return 1
+"""
+
+
+class RedisBackend(AdmissionBackend):
+    """Shared by all workers. Buckets are hashes and slots are sorted sets of expiring handles."""
+
+    def __init__(self, url: str, slot_ttl_seconds: float, prefix: str = "resolvex:admission:"):
+        import redis.asyncio  # optional dependency, only needed with ADMISSION_BACKEND=redis
+
+        self._client = redis.asyncio.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._acquire = self._client.register_script(_ACQUIRE_SCRIPT)
+        self.slot_ttl_seconds = slot_ttl_seconds
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: Rate) -> float:
+        try:
+            wait = await self._take(
+                keys=[self.prefix + key], args=[rate.capacity, rate.refill_per_second, time.time()]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit check failed, admitting: {e}")
+            return 0.0
+        return float(wait)
+
+    async def acquire(self, key: str, limit: int) -> str | None:
+        handle = uuid.uuid4().hex
+        now = time.time()
+        try:
+            ok = await self._acquire(
+                keys=[self.prefix + key], args=[limit, now, now + self.slot_ttl_seconds, handle]
+            )
+        except Exception as e:
+            logger.warning(f"Concurrency check failed, admitting: {e}")
+            return ""  # nothing to release
+        return handle if ok else None
+
+    async def release(self, key: str, handle: str) -> None:
+        if not handle:
+            return
+        try:
+            await self._client.zrem(self.prefix + key, handle)
+        except Exception as e:
+            logger.warning(f"Releasing a concurrency slot failed (expires on its own): {e}")
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "redis": lambda: RedisBackend(settings.ADMISSION_REDIS_URL, settings.ADMISSION_SLOT_TTL_SECONDS),
+}
+
+
+# -------- controller --------
+class Rejected(Exception):
+    def __init__(self, endpoint_class: str, reason: str, retry_after: float):
+        super().__init__(f"{endpoint_class}: {reason}")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        backend: AdmissionBackend,
+        rates: dict[tuple[str | None, str], Rate],
+        concurrency: dict[str, int],
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.rates = rates
+        self.concurrency = concurrency
+        self.enabled = enabled
+
+    def rate_for(self, endpoint_class: str, role: str | None) -> Rate | None:
+        rate = self.rates.get((role, endpoint_class)) or self.rates.get((None, endpoint_class))
+        return rate if rate is not None and rate.capacity > 0 else None
+
+    async def check_rate(self, endpoint_class: str, caller: str, role: str | None) -> None:
+        """Raise Rejected once `caller` (e.g. "t1:u42" or "ip:10.0.0.5") is out of tokens."""
+        rate = self.rate_for(endpoint_class, role) if self.enabled else None
+        if rate is None:
+            return
+        wait = await self.backend.take(f"rate:{endpoint_class}:{caller}", rate)
+        if wait > 0:
+            observe_admission_rejected(endpoint_class, "rate")
+            raise Rejected(endpoint_class, "rate", wait)
+
+    async def acquire(self, endpoint_class: str) -> str | None:
+        """Claim a concurrency slot (raise Rejected if none); pass the result to `release`."""
+        limit = self.concurrency.get(endpoint_class, 0) if self.enabled else 0
+        if limit <= 0:
+            return None
+        handle = await self.backend.acquire(f"slots:{endpoint_class}", limit)
+        if handle is None:
+            observe_admission_rejected(endpoint_class, "concurrency")
+            raise Rejected(endpoint_class, "concurrency", 1.0)
+        return handle
+
+    async def release(self, endpoint_class: str, handle: str | None) -> None:
+        if handle is not None:
+            await self.backend.release(f"slots:{endpoint_class}", handle)
+
+
+admission = AdmissionController(
+    BACKENDS[settings.ADMISSION_BACKEND](),
+    parse_rate_limits(settings.RATE_LIMITS),
+    parse_concurrency_limits(settings.CONCURRENCY_LIMITS),
+    enabled=settings.ADMISSION_ENABLED,
+)
@@ -2,15 +2,15 @@
 import os
 import json
 import logging
-import requests
-from groq import Groq
+import time
 from typing import Optional, Dict, Any
+from services.metrics import observe_ai_call
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Ollama config (LOCAL)
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 OLLAMA_CATEGORY_MODEL = "phi3:mini"
 
 
@@ -29,6 +29,8 @@ class AIService:
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         if self.groq_api_key:
             try:
+                from groq import Groq  # heavy import, only paid when insights are configured
+
                 self._groq_client = Groq(api_key=self.groq_api_key)
                 logger.info("Groq AI initialized successfully (Insights only).")
             except Exception as e:
@@ -61,7 +63,10 @@ Return format:
 {{"category": "Electrical", "priority": "high"}}
 """
 
+        started = time.perf_counter()
         try:
+            import requests
+
             response = requests.post(
                 OLLAMA_URL,
                 json={
@@ -73,9 +78,11 @@ Return format:
             )
 
             output = response.json().get("response", "").strip()
+            observe_ai_call("ollama", "categorize", time.perf_counter() - started, failed=False)
             return self._parse_response(output)
 
         except Exception as e:
+            observe_ai_call("ollama", "categorize", time.perf_counter() - started, failed=True)
             logger.error(f"Ollama categorization failed: {e}")
             return None
 
@@ -149,6 +156,7 @@ Data:
 The final output should feel like a **human-written executive report**, not an AI response.
 """
 
+        started = time.perf_counter()
         try:
             chat_completion = self._groq_client.chat.completions.create(
                 messages=[
@@ -159,9 +167,11 @@ The final output should feel like a **human-written executive report**, not an A
                 ],
                 model="meta-llama/llama-4-maverick-17b-128e-instruct",
             )
+            observe_ai_call("groq", "insights", time.perf_counter() - started, failed=False)
             return chat_completion.choices[0].message.content
 
         except Exception as e:
+            observe_ai_call("groq", "insights", time.perf_counter() - started, failed=True)
             logger.error(f"Groq Insights failed: {e}")
             return "AI Insights are currently unavailable."
 
@@ -0,0 +1,220 @@
+"""ResolveX Backend - Archival of long-closed complaints out of the hot tables."""
+import json
+import logging
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from config import settings
+from database import all_shards
+from services.metrics import observe_job
+from models import (
+    Assignment,
+    Complaint,
+    ComplaintArchive,
+    ComplaintLog,
+    EscalationLog,
+    EvidenceBlob,
+    EvidenceUpload,
+    Feedback,
+)
+
+logger = logging.getLogger(__name__)
+
+# Child tables removed together with the complaint (complaints last, FKs point at it)
+CHILD_MODELS = (ComplaintLog, Assignment, EvidenceUpload, Feedback, EscalationLog)
+
+
+def _row_to_dict(obj) -> dict:
+    return {col.name: getattr(obj, col.name) for col in obj.__table__.columns}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _snapshot(c: Complaint, escalations: list[EscalationLog]) -> dict:
+    """Complaint plus every child row, with display names denormalized for reads."""
+    complaint = _row_to_dict(c)
+    complaint["user_name"] = c.user.full_name if c.user else None
+    complaint["category_name"] = c.category.name if c.category else None
+    complaint["assigned_staff_name"] = (
+        c.assignment.staff.full_name if c.assignment and c.assignment.staff else None
+    )
+    logs = []
+    for l in c.logs:
+        row = _row_to_dict(l)
+        row["user_name"] = l.user.full_name if l.user else "System"
+        logs.append(row)
+    return {
+        "complaint": complaint,
+        "logs": logs,
+        "assignment": _row_to_dict(c.assignment) if c.assignment else None,
+        "evidence": [_row_to_dict(e) for e in c.evidence],
+        "feedback": _row_to_dict(c.feedback_rel) if c.feedback_rel else None,
+        "escalations": [_row_to_dict(e) for e in escalations],
+    }
+
+
+def archive_complaints(db: Session, complaint_ids: list[int]) -> int:
+    """Move the given complaints and their child rows into complaint_archive. Caller commits."""
+    if not complaint_ids:
+        return 0
+    complaints = (
+        db.query(Complaint)
+        .options(
+            joinedload(Complaint.user),
+            joinedload(Complaint.category),
+            joinedload(Complaint.assignment).joinedload(Assignment.staff),
+            joinedload(Complaint.feedback_rel),
+            selectinload(Complaint.logs).joinedload(ComplaintLog.user),
+            selectinload(Complaint.evidence),
+        )
+        .filter(Complaint.id.in_(complaint_ids))
+        .all()
+    )
+    escalations: dict[int, list[EscalationLog]] = {}
+    for e in db.query(EscalationLog).filter(EscalationLog.complaint_id.in_(complaint_ids)):
+        escalations.setdefault(e.complaint_id, []).append(e)
+
+    for c in complaints:
+        payload = json.dumps(_snapshot(c, escalations.get(c.id, [])), default=_json_default)
+        db.add(
+            ComplaintArchive(
+                tenant_id=c.tenant_id,
+                complaint_id=c.id,
+                user_id=c.user_id,
+                staff_id=c.assignment.staff_id if c.assignment else None,
+                category_id=c.category_id,
+                priority=c.priority,
+                is_escalated=bool(c.is_escalated),
+                created_at=c.created_at,
+                resolved_at=c.resolved_at,
+                closed_at=c.closed_at,
+                payload=zlib.compress(payload.encode("utf-8"), 6),
+            )
+        )
+    db.flush()
+
+    # The evidence rows go away below; their blobs stay referenced from the archive
+    archived_refs = Counter(e.sha256 for c in complaints for e in c.evidence if e.sha256)
+    for sha256, count in archived_refs.items():
+        db.execute(
+            update(EvidenceBlob)
+            .where(EvidenceBlob.sha256 == sha256)
+            .values(archived_refs=EvidenceBlob.archived_refs + count)
+            .execution_options(synchronize_session=False)
+        )
+
+    ids = [c.id for c in complaints]
+    for model in CHILD_MODELS:
+        db.query(model).filter(model.complaint_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Complaint).filter(Complaint.id.in_(ids)).delete(synchronize_session=False)
+    db.expunge_all()
+    return len(ids)
+
+
+def decode_snapshot(payload: bytes) -> dict:
+    """A complaint_archive payload as the dict `_snapshot` built."""
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def backfill_summaries(db: Session, limit: int) -> int:
+    """Fill the summary columns (category, priority, created_at...) of up to `limit` rows
+    archived before they existed, from their payload. Caller commits."""
+    rows = (
+        db.query(ComplaintArchive)
+        .filter(ComplaintArchive.created_at.is_(None))
+        .order_by(ComplaintArchive.complaint_id)
+        .limit(limit)
+        .all()
+    )
+    for row in rows:
+        c = decode_snapshot(row.payload)["complaint"]
+        row.category_id = c["category_id"]
+        row.priority = c["priority"]
+        row.is_escalated = bool(c["is_escalated"])
+        row.created_at = _parse_time(c["created_at"]) or row.closed_at or row.archived_at
+        row.resolved_at = _parse_time(c["resolved_at"])
+    return len(rows)
+
+
+def get_archived_complaint(db: Session, complaint_id: int) -> dict | None:
+    """Return the archived snapshot for a complaint, or None if it was never archived."""
+    row = db.get(ComplaintArchive, complaint_id)
+    if not row:
+        return None
+    return decode_snapshot(row.payload)
+
+
+def can_view_archived(archived: dict, user) -> bool:
+    """Same visibility rules as the live complaint endpoints, applied to an archived snapshot."""
+    owner_id = archived["complaint"]["user_id"]
+    staff_id = archived["assignment"]["staff_id"] if archived["assignment"] else None
+    if user.role == "user":
+        return owner_id == user.id
+    if user.role == "staff" and staff_id and staff_id != user.id:
+        return owner_id == user.id
+    return True
+
+
+def run_archival_job() -> int:
+    """Archive complaints closed more than ARCHIVE_AFTER_DAYS ago on every tenant shard,
+    one short transaction per batch."""
+    if not settings.ARCHIVE_ENABLED:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    started = time.perf_counter()
+    total = 0
+    for shard in all_shards():
+        backfilled = 0
+        while True:
+            db = shard.SessionLocal()
+            try:
+                batch = backfill_summaries(db, settings.ARCHIVE_BATCH_SIZE)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception(f"Archive summary backfill failed (shard={shard.name})")
+                break
+            finally:
+                db.close()
+            backfilled += batch
+            if batch < settings.ARCHIVE_BATCH_SIZE:
+                break
+        if backfilled:
+            logger.info(f"Backfilled summary columns of {backfilled} archived complaints (shard={shard.name})")
+        while True:
+            db = shard.SessionLocal()
+            try:
+                ids = [
+                    row[0]
+                    for row in db.query(Complaint.id)
+                    .filter(Complaint.status == "closed", Complaint.closed_at <= cutoff)
+                    .order_by(Complaint.id)
+                    .limit(settings.ARCHIVE_BATCH_SIZE)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                ]
+                if not ids:
+                    break
+                total += archive_complaints(db, ids)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception(f"Archival batch failed (shard={shard.name})")
+                break
+            finally:
+                db.close()
+    observe_job("archival", time.perf_counter() - started, total)
+    if total:
+        logger.info(f"Archived {total} closed complaints (closed before {cutoff:%Y-%m-%d})")
+    return total
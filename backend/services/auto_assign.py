@@ -0,0 +1,260 @@
+"""ResolveX Backend - Workload-aware automatic assignment of categorized complaints.
+
+Each department (per tenant and shard) has a min-heap of its active staff,
+ordered by workload: the sum of AUTO_ASSIGN_PRIORITY_WEIGHTS over the open
+complaints assigned to them (then their open count, then id). A newly
+categorized complaint goes to the top of the heap of its category's department,
+or of the whole tenant's staff when the category has no department. Picking and
+re-charging a staff member is O(log n); outdated heap entries are skipped when
+they reach the top, as in deadline_scheduler.py.
+
+The heaps live in each worker process and are rebuilt from the `assignments`
+table once they are AUTO_ASSIGN_RESYNC_SECONDS old. That is how they catch up
+with other workers, the escalation job's priority bumps and staff changes.
+Whatever the heap says, the database decides:
+
+- the complaint moves `categorized` -> `assigned` with a conditional UPDATE,
+  so a complaint that another worker or an admin got to first is left alone
+- the staff member is re-read in the same transaction and skipped if they are
+  no longer active staff of that department
+- `assignments.complaint_id` is unique
+"""
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from database import all_shards
+from models import Assignment, Category, Complaint, User
+from services.complaint_log import add_log
+from services.escalation import CLOSED_STATUSES
+from services.events import stage
+from services.metrics import observe_assignment_wait, observe_job
+
+logger = logging.getLogger(__name__)
+
+
+def parse_priority_weights(spec: str) -> dict[str, float]:
+    weights = {"low": 1.0, "medium": 1.0, "high": 1.0, "critical": 1.0}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        priority, _, weight = item.partition("=")
+        if priority.strip() not in weights:
+            raise ValueError(f"Bad AUTO_ASSIGN_PRIORITY_WEIGHTS entry {item!r}: expected priority=weight")
+        weights[priority.strip()] = float(weight)
+    return weights
+
+
+PRIORITY_WEIGHTS = parse_priority_weights(settings.AUTO_ASSIGN_PRIORITY_WEIGHTS)
+
+
+def claimable_categories(department_id: int | None):
+    """Filter on Category for what a staff member of `department_id` may be given: the
+    inverse of the queue choice in `AutoAssigner.assign`. Categories without a
+    department are open to every staff member."""
+    if department_id is None:
+        return Category.department_id.is_(None)
+    return or_(Category.department_id == department_id, Category.department_id.is_(None))
+
+
+def workload(complaint: Complaint) -> tuple[int, str] | None:
+    """(staff id, priority) an assigned, open complaint weighs on; None otherwise.
+
+    Read it before and after changing a complaint and pass both to `retrack`.
+    """
+    if complaint.status in CLOSED_STATUSES or complaint.assignment is None:
+        return None
+    return complaint.assignment.staff_id, complaint.priority
+
+
+class StaffQueue:
+    """Eligible staff of one department, least loaded first."""
+
+    def __init__(self, staff: dict[int, str], loads: dict[int, tuple[float, int]]):
+        self.names = staff
+        self.loads = {staff_id: loads.get(staff_id, (0.0, 0)) for staff_id in staff}
+        self._heap = [(load, count, staff_id) for staff_id, (load, count) in self.loads.items()]
+        heapq.heapify(self._heap)
+        self.loaded_at = time.monotonic()
+
+    def peek(self) -> int | None:
+        while self._heap:
+            load, count, staff_id = self._heap[0]
+            if self.loads.get(staff_id) == (load, count):
+                return staff_id
+            heapq.heappop(self._heap)  # charged or removed since it was pushed
+        return None
+
+    def shift(self, staff_id: int, priority: str, count: int) -> None:
+        """Add (count=1) or remove (count=-1) one open complaint of `priority` to a staff member's load."""
+        if staff_id not in self.loads:
+            return
+        load, open_count = self.loads[staff_id]
+        entry = (max(0.0, load + count * PRIORITY_WEIGHTS[priority]), max(0, open_count + count))
+        self.loads[staff_id] = entry
+        heapq.heappush(self._heap, (*entry, staff_id))
+        if len(self._heap) > 4 * len(self.loads) + 64:
+            self._heap = [(load, count, sid) for sid, (load, count) in self.loads.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, staff_id: int) -> None:
+        self.loads.pop(staff_id, None)
+        self.names.pop(staff_id, None)
+
+
+QueueKey = tuple[str, int, int | None]  # (shard, tenant id, department id or None for the whole tenant)
+
+
+class AutoAssigner:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._queues: dict[QueueKey, StaffQueue] = {}
+        # (shard, tenant id, staff id) -> every queue holding that staff member
+        self._queues_of: dict[tuple[str, int, int], set[QueueKey]] = {}
+        self._lock = threading.Lock()
+
+    # -------- queues --------
+    def _load_queue(self, db: Session, key: QueueKey) -> StaffQueue:
+        department_id = key[2]
+        eligible = select(User.id, User.full_name).where(User.role == "staff", User.is_active == True)
+        if department_id is not None:
+            eligible = eligible.where(User.department_id == department_id)
+        staff = dict(db.execute(eligible).all())
+        loads: dict[int, tuple[float, int]] = {}
+        if staff:
+            rows = db.execute(
+                select(Assignment.staff_id, Complaint.priority, func.count())
+                .join(Complaint, Complaint.id == Assignment.complaint_id)
+                .where(Assignment.staff_id.in_(staff), Complaint.status.notin_(CLOSED_STATUSES))
+                .group_by(Assignment.staff_id, Complaint.priority)
+            ).all()
+            for staff_id, priority, count in rows:
+                load, open_count = loads.get(staff_id, (0.0, 0))
+                loads[staff_id] = (load + count * PRIORITY_WEIGHTS[priority], open_count + count)
+        return StaffQueue(staff, loads)
+
+    def _queue(self, db: Session, key: QueueKey) -> StaffQueue:
+        queue = self._queues.get(key)
+        if queue is None or time.monotonic() - queue.loaded_at >= self.ttl_seconds:
+            queue = self._load_queue(db, key)  # outside the lock; the last reload wins
+            with self._lock:
+                self._queues[key] = queue
+                for staff_id in queue.loads:
+                    self._queues_of.setdefault((key[0], key[1], staff_id), set()).add(key)
+        return queue
+
+    def retrack(self, shard: str, tenant_id: int, before: tuple[int, str] | None, after: tuple[int, str] | None) -> None:
+        """Move load after a manual assignment, a claim or a status/priority change (see `workload`).
+
+        Load belongs to the staff member, whatever the complaint's category, so it
+        moves in every queue holding them: their department's and the tenant-wide one.
+        """
+        if before == after:
+            return
+        with self._lock:
+            for change, count in ((before, -1), (after, 1)):
+                if change is None:
+                    continue
+                staff_id, priority = change
+                for key in self._queues_of.get((shard, tenant_id, staff_id), ()):
+                    self._queues[key].shift(staff_id, priority, count)
+
+    # -------- assignment --------
+    def assign(self, db: Session, complaint: Complaint) -> int | None:
+        """Assign a `categorized` complaint to the least loaded eligible staff member and commit.
+
+        `db` is a tenant session (or `AsyncSession.run_sync`'s). Returns the staff id,
+        or None when nobody is eligible or the complaint was assigned elsewhere first.
+        """
+        if not settings.AUTO_ASSIGN_ENABLED or complaint.status != "categorized":
+            return None
+        complaint_id, priority, created_at = complaint.id, complaint.priority, complaint.created_at
+        department_id = db.execute(
+            select(Category.department_id).where(Category.id == complaint.category_id)
+        ).scalar()
+        key = (db.info["shard"], db.info["tenant_id"], department_id)
+        queue = self._queue(db, key)
+        while True:
+            with self._lock:
+                staff_id = queue.peek()
+                if staff_id is None:
+                    return None
+                queue.shift(staff_id, priority, 1)  # charge now so concurrent picks spread out
+            staff = db.execute(
+                select(User.full_name).where(
+                    User.id == staff_id,
+                    User.role == "staff",
+                    User.is_active == True,
+                    *([User.department_id == department_id] if department_id is not None else []),
+                )
+            ).scalar()
+            if staff is not None:
+                break
+            with self._lock:
+                queue.remove(staff_id)
+
+        try:
+            claimed = db.execute(
+                update(Complaint)
+                .where(Complaint.id == complaint_id, Complaint.status == "categorized")
+                .values(status="assigned")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed:
+                db.add(Assignment(complaint_id=complaint_id, staff_id=staff_id, notes="Auto-assigned by workload"))
+                add_log(db, complaint_id, None, "assigned", None, staff, "Auto-assigned by workload")
+                stage(db, complaint_id, "complaint", audience=[complaint.user_id, staff_id])
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # an admin assigned it in the meantime
+            claimed = 0
+        if not claimed:
+            with self._lock:
+                queue.shift(staff_id, priority, -1)
+            return None
+        wait = (datetime.utcnow() - created_at).total_seconds() if created_at else 0.0
+        observe_assignment_wait("auto", wait)
+        logger.info(f"Auto-assigned complaint {complaint_id} to staff {staff_id} after {wait:.0f}s")
+        return staff_id
+
+
+auto_assigner = AutoAssigner(settings.AUTO_ASSIGN_RESYNC_SECONDS)
+
+
+def assign_backlog() -> int:
+    """Auto-assign complaints still `categorized` (no eligible staff at the time, or
+    created before auto-assignment was on), oldest first, on every tenant shard."""
+    if not settings.AUTO_ASSIGN_ENABLED:
+        return 0
+    started = time.perf_counter()
+    total = 0
+    for shard in all_shards():
+        db = shard.SessionLocal()
+        try:
+            backlog = db.execute(
+                select(Complaint.tenant_id, Complaint.id)
+                .where(Complaint.status == "categorized")
+                .order_by(Complaint.created_at)
+                .limit(settings.AUTO_ASSIGN_BATCH_SIZE)
+            ).all()
+        except Exception:
+            logger.exception(f"Auto-assign backlog query failed (shard={shard.name})")
+            continue
+        finally:
+            db.close()
+        for tenant_id, complaint_id in backlog:
+            db = shard.SessionLocal(info={"tenant_id": tenant_id, "shard": shard.name})
+            try:
+                complaint = db.get(Complaint, complaint_id)
+                if complaint is not None and auto_assigner.assign(db, complaint) is not None:
+                    total += 1
+            except Exception:
+                db.rollback()
+                logger.exception(f"Auto-assigning complaint {complaint_id} failed (shard={shard.name})")
+            finally:
+                db.close()
+    observe_job("auto_assign", time.perf_counter() - started, total)
+    return total
@@ -0,0 +1,312 @@
+"""ResolveX Backend - Content-addressed, deduplicated evidence blob store.
+
+Blobs are keyed by SHA-256 and laid out with a directory fan-out
+(`ab/cd/abcd…`) so no directory grows unbounded. `evidence_blobs.ref_count`
+counts the evidence_uploads rows (live or archived) pointing at each blob.
+Uploads add to it; rows deleted by ON DELETE CASCADE (complaints, users) cannot
+subtract, so `collect_garbage()` first recounts it as live rows + `archived_refs`
+(bumped by archival), then removes blobs nobody references any more. Every tenant shard
+has its own evidence_blobs table over the one store, so a file is only deleted
+once no shard has a row for it.
+
+    python -m services.blob_store gc        # remove unreferenced / orphaned blobs
+    python -m services.blob_store migrate   # move legacy UUID-named uploads into the store
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterator
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from config import settings
+from database import Shard, all_shards
+from models import EvidenceBlob, EvidenceUpload
+from services.derivatives import derivative_generator
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore(ABC):
+    """Storage backend for evidence bytes, addressed by hex SHA-256."""
+
+    @abstractmethod
+    def put(self, sha256: str, staged_path: str) -> None:
+        """Take ownership of `staged_path`; a no-op (besides discarding it) if the blob exists."""
+
+    @abstractmethod
+    def exists(self, sha256: str) -> bool: ...
+
+    @abstractmethod
+    def open(self, sha256: str) -> BinaryIO: ...
+
+    @abstractmethod
+    def delete(self, sha256: str) -> None: ...
+
+    @abstractmethod
+    def iter_blobs(self) -> Iterator[tuple[str, float]]:
+        """Yield (sha256, modified_unix_time) for every stored blob."""
+
+    @abstractmethod
+    def modified_at(self, sha256: str) -> float | None:
+        """Last put() of the blob (unix time), None if it is not stored."""
+
+    def key(self, sha256: str) -> str:
+        """Backend-relative name recorded in evidence_uploads.file_path."""
+        return sha256
+
+    def local_path(self, sha256: str) -> str | None:
+        """Filesystem path if the backend has one (lets the web server send the file directly)."""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str, levels: int = 2):
+        self.root = root
+        self.levels = levels
+
+    def key(self, sha256: str) -> str:
+        shards = [sha256[i * 2:i * 2 + 2] for i in range(self.levels)]
+        return "/".join(shards + [sha256])
+
+    def local_path(self, sha256: str) -> str:
+        return os.path.join(self.root, *self.key(sha256).split("/"))
+
+    def put(self, sha256: str, staged_path: str) -> None:
+        path = self.local_path(sha256)
+        if os.path.exists(path):
+            os.remove(staged_path)
+            os.utime(path)  # keeps the GC grace period from expiring under a fresh upload
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged_path, path)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.local_path(sha256))
+
+    def open(self, sha256: str) -> BinaryIO:
+        return open(self.local_path(sha256), "rb")
+
+    def delete(self, sha256: str) -> None:
+        try:
+            os.remove(self.local_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def modified_at(self, sha256: str) -> float | None:
+        try:
+            return os.path.getmtime(self.local_path(sha256))
+        except FileNotFoundError:
+            return None
+
+    def iter_blobs(self) -> Iterator[tuple[str, float]]:
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if len(name) == 64:
+                    yield name, os.path.getmtime(os.path.join(dirpath, name))
+
+
+BACKENDS = {"local": lambda: LocalBlobStore(settings.BLOB_DIR, settings.BLOB_FANOUT_LEVELS)}
+
+blob_store: BlobStore = BACKENDS[settings.BLOB_BACKEND]()
+
+
+# -------- Reference counting --------
+def _lock_blob(db: Session, sha256: str) -> EvidenceBlob | None:
+    return db.query(EvidenceBlob).filter(EvidenceBlob.sha256 == sha256).with_for_update().first()
+
+
+def acquire_blob(db: Session, sha256: str, size: int, mime_type: str, staged_path: str) -> str:
+    """Add a reference to the blob (storing `staged_path` if it is new); returns its key.
+
+    One upsert inserts the evidence_blobs row or bumps its count, and leaves the row locked
+    before the bytes are written, so a concurrent garbage collection of the same hash
+    either finishes first or sees ref_count > 0. (Locking a missing row first and then
+    inserting deadlocks on MySQL when two uploads of a new file race on the gap lock.)
+    The caller commits together with its evidence_uploads row.
+    """
+    now = datetime.utcnow()
+    values = dict(sha256=sha256, size=size, mime_type=mime_type, ref_count=1, created_at=now, updated_at=now)
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql.insert(EvidenceBlob).values(**values)
+        stmt = stmt.on_duplicate_key_update(ref_count=stmt.table.c.ref_count + 1, updated_at=now)
+    else:
+        stmt = sqlite.insert(EvidenceBlob).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sha256"], set_={"ref_count": stmt.table.c.ref_count + 1, "updated_at": now}
+        )
+    db.execute(stmt)
+    blob_store.put(sha256, staged_path)
+    return blob_store.key(sha256)
+
+
+def recount_references(db: Session) -> int:
+    """Set ref_count to the shard's evidence_uploads rows + archived_refs where it drifted
+    (rows deleted by cascades); returns the blobs corrected. Their updated_at restarts
+    the GC grace period. Caller commits."""
+    live = (
+        select(func.count())
+        .select_from(EvidenceUpload)
+        .where(EvidenceUpload.sha256 == EvidenceBlob.sha256)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(EvidenceBlob)
+        .where(EvidenceBlob.ref_count != live + EvidenceBlob.archived_refs)
+        .values(ref_count=live + EvidenceBlob.archived_refs, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# -------- Garbage collection --------
+def collect_garbage() -> dict:
+    """Delete unreferenced blobs and orphaned files older than BLOB_GC_GRACE_HOURS."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.BLOB_GC_GRACE_HOURS)
+    cutoff_ts = time.time() - settings.BLOB_GC_GRACE_HOURS * 3600
+    released = orphans = recounted = 0
+    shards = all_shards()
+    for shard in shards:
+        others = [other for other in shards if other is not shard]
+        db = shard.SessionLocal()
+        try:
+            recounted += recount_references(db)
+            db.commit()
+            candidates = [
+                row[0]
+                for row in db.query(EvidenceBlob.sha256)
+                .filter(EvidenceBlob.ref_count <= 0, EvidenceBlob.updated_at < cutoff)
+                .all()
+            ]
+            for sha256 in candidates:
+                blob = _lock_blob(db, sha256)
+                if blob is not None and blob.ref_count <= 0:
+                    # Another shard may hold the same bytes; its uploads also refresh the file's mtime
+                    if not _known_to(others, [sha256]) and (blob_store.modified_at(sha256) or 0) < cutoff_ts:
+                        blob_store.delete(sha256)
+                        derivative_generator.purge(sha256)
+                    db.delete(blob)
+                    released += 1
+                db.commit()
+        finally:
+            db.close()
+
+    # Files with no row at all: uploads that crashed between storing and committing
+    batch: list[str] = []
+    for sha256, mtime in blob_store.iter_blobs():
+        if mtime < cutoff_ts:
+            batch.append(sha256)
+        if len(batch) >= 500:
+            orphans += _delete_orphans(shards, batch)
+            batch = []
+    orphans += _delete_orphans(shards, batch)
+
+    for name in os.listdir(settings.UPLOAD_DIR) if os.path.isdir(settings.UPLOAD_DIR) else []:
+        path = os.path.join(settings.UPLOAD_DIR, name)
+        if name.endswith(".part") and os.path.getmtime(path) < cutoff_ts:
+            os.remove(path)
+
+    if released or orphans or recounted:
+        logger.info(
+            f"Blob GC recounted {recounted} blobs, removed {released} unreferenced and {orphans} orphaned blobs"
+        )
+    return {"recounted": recounted, "released": released, "orphans": orphans}
+
+
+def _known_to(shards: list[Shard], shas: list[str]) -> set[str]:
+    """The hashes some shard has an evidence_blobs row for."""
+    known: set[str] = set()
+    for shard in shards:
+        db = shard.SessionLocal()
+        try:
+            known |= {row[0] for row in db.query(EvidenceBlob.sha256).filter(EvidenceBlob.sha256.in_(shas))}
+        finally:
+            db.close()
+    return known
+
+
+def _delete_orphans(shards: list[Shard], shas: list[str]) -> int:
+    if not shas:
+        return 0
+    known = _known_to(shards, shas)
+    missing = [s for s in shas if s not in known]
+    for sha256 in missing:
+        blob_store.delete(sha256)
+    return len(missing)
+
+
+# -------- Legacy uploads --------
+def migrate_legacy_uploads(batch_size: int = 200) -> int:
+    """Move uploads still at their pre-store path into the store and repoint their rows."""
+    return sum(_migrate_shard(shard, batch_size) for shard in all_shards())
+
+
+def _migrate_shard(shard: Shard, batch_size: int) -> int:
+    migrated = 0
+    last_id = 0
+    while True:
+        db = shard.SessionLocal()
+        try:
+            rows = (
+                db.query(EvidenceUpload)
+                .filter(EvidenceUpload.id > last_id)
+                .order_by(EvidenceUpload.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return migrated
+            last_id = rows[-1].id
+            legacy_paths = []
+            for rec in rows:
+                if rec.sha256 and rec.file_path == blob_store.key(rec.sha256):
+                    continue
+                if not os.path.isfile(rec.file_path):
+                    logger.warning(f"Evidence {rec.id}: {rec.file_path} missing, left as is")
+                    continue
+                digest = hashlib.sha256()
+                fd, staged = tempfile.mkstemp(suffix=".part", dir=settings.UPLOAD_DIR)
+                with open(rec.file_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                    while chunk := src.read(64 * 1024):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                sha256 = digest.hexdigest()
+                key = acquire_blob(db, sha256, os.path.getsize(staged), rec.file_type, staged)
+                legacy_paths.append(rec.file_path)
+                rec.sha256 = sha256
+                rec.file_path = key
+            db.commit()
+            for path in legacy_paths:
+                os.remove(path)
+            migrated += len(legacy_paths)
+        finally:
+            db.close()
+
+
+def resolve_local_path(rec: EvidenceUpload) -> str | None:
+    """Filesystem path of an evidence row's bytes, for stored blobs and legacy uploads alike."""
+    if rec.sha256 and rec.file_path == blob_store.key(rec.sha256):
+        return blob_store.local_path(rec.sha256)
+    return rec.file_path
+
+
+def open_evidence(rec) -> BinaryIO:
+    """Open an evidence row's bytes (ORM row, column row or archived record)."""
+    if rec.sha256 and rec.file_path == blob_store.key(rec.sha256):
+        return blob_store.open(rec.sha256)
+    return open(rec.file_path, "rb")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evidence blob store maintenance")
+    parser.add_argument("command", choices=["gc", "migrate"])
+    args = parser.parse_args()
+    if args.command == "gc":
+        print(collect_garbage())
+    else:
+        print(f"Migrated {migrate_legacy_uploads()} legacy uploads")
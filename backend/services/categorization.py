@@ -1,7 +1,9 @@
 """ResolveX Backend - Smart complaint categorization and priority."""
 import json
 import re
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from models import Category, Complaint
 
 # Fallback keyword -> priority (when no category match)
@@ -20,10 +22,10 @@ def _match_keyword(text: str, keyword: str) -> bool:
     return re.search(rf"\b{re.escape(keyword.lower())}\b", text) is not None
 
 
-def _get_category_from_db(db: Session, description: str) -> tuple[Category | None, str]:
+async def _get_category_from_db(db: AsyncSession, description: str) -> tuple[Category | None, str]:
     """Match description against category keywords; return (category, priority)."""
     text = _normalize(description)
-    categories = db.query(Category).all()
+    categories = (await db.execute(select(Category))).scalars().all()
     best_match = None
     best_priority = "low"
 
@@ -54,11 +56,13 @@ def _get_category_from_db(db: Session, description: str) -> tuple[Category | Non
 
 from services.ai_service import AIService
 
-def categorize_complaint(db: Session, complaint: Complaint) -> None:
+async def categorize_complaint(db: AsyncSession, complaint: Complaint) -> None:
     """Auto-assign category and priority from description; update complaint."""
-    # Try AI prediction first
+    # Try AI prediction first (a blocking HTTP call, so off the event loop)
     ai_service = AIService()
-    ai_result = ai_service.predict_category_and_urgency(complaint.title, complaint.description)
+    ai_result = await run_in_threadpool(
+        ai_service.predict_category_and_urgency, complaint.title, complaint.description
+    )
     
     category = None
     priority = "medium"
@@ -68,11 +72,13 @@ def categorize_complaint(db: Session, complaint: Complaint) -> None:
         category_name = ai_result.get("category")
         priority = ai_result.get("priority", "medium")
         if category_name:
-            category = db.query(Category).filter(Category.name.ilike(category_name)).first()
+            category = (
+                await db.execute(select(Category).where(Category.name.ilike(category_name)))
+            ).scalars().first()
     
     # Fallback to keyword matching if AI failed or category not found
     if not category:
-         cat_match, prio_match = _get_category_from_db(db, complaint.description)
+         cat_match, prio_match = await _get_category_from_db(db, complaint.description)
          category = cat_match
          # If AI gave a priority but no category, keep AI priority, else use keyword priority
          if not ai_result:
@@ -85,5 +91,4 @@ def categorize_complaint(db: Session, complaint: Complaint) -> None:
         complaint.status = "categorized"
     else:
         complaint.status = "submitted"
-    db.commit()
-    db.refresh(complaint)
+    await db.commit()
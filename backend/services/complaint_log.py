@@ -1,6 +1,7 @@
 """ResolveX Backend - Complaint timeline / audit log helper."""
 from sqlalchemy.orm import Session
 from models import ComplaintLog
+from services.events import stage
 
 
 def add_log(
@@ -21,4 +22,5 @@ def add_log(
         message=message,
     )
     db.add(log)
+    stage(db, complaint_id, "logs")
     return log
@@ -0,0 +1,165 @@
+"""ResolveX Backend - Deadline-driven escalation (min-heap of upcoming due dates)."""
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select
+from config import settings
+from database import DEFAULT_SHARD, all_shards
+from models import Complaint
+from services.escalation import CLOSED_STATUSES, legacy_sla, run_escalation_job
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Fires escalation for each complaint at its due_date instead of on a fixed interval.
+
+    Only deadlines inside the current horizon (now + 2 resync intervals) are kept in memory;
+    `resync()` reloads that window from the idx_complaints_due_date index of every tenant
+    shard. Cancelled or rescheduled entries are dropped lazily when they reach the top of
+    the heap. Complaints are keyed by (shard, complaint id): ids are only unique per shard.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, tuple[str, int]]] = []
+        self._deadlines: dict[tuple[str, int], datetime] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._horizon_end: datetime | None = None
+
+    # -------- lifecycle --------
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self.resync()
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # -------- incremental updates --------
+    def schedule(self, complaint_id: int, due_date: datetime | None, shard: str = DEFAULT_SHARD) -> None:
+        if not self._running:
+            return
+        key = (shard, complaint_id)
+        with self._cond:
+            self._deadlines.pop(key, None)
+            if due_date is None or (self._horizon_end and due_date > self._horizon_end):
+                return  # outside the window; the next resync picks it up
+            self._deadlines[key] = due_date
+            heapq.heappush(self._heap, (due_date, key))
+            if self._heap[0][1] == key:
+                self._cond.notify()
+
+    def cancel(self, complaint_id: int, shard: str = DEFAULT_SHARD) -> None:
+        with self._cond:
+            self._deadlines.pop((shard, complaint_id), None)
+
+    def track(self, complaint: Complaint, shard: str = DEFAULT_SHARD) -> None:
+        """Schedule or cancel a complaint's deadline after it was created or updated."""
+        if complaint.status in CLOSED_STATUSES or complaint.is_escalated:
+            self.cancel(complaint.id, shard)
+        else:
+            self.schedule(complaint.id, complaint.due_date, shard)
+
+    def resync(self) -> None:
+        """Reload every open, unescalated deadline up to the new horizon."""
+        now = datetime.utcnow()
+        horizon_end = now + timedelta(minutes=2 * settings.ESCALATION_RESYNC_MINUTES)
+        rows = []
+        for shard in all_shards():
+            db = shard.SessionLocal()
+            try:
+                rows += [
+                    (shard.name, *row)
+                    for row in db.execute(
+                        select(Complaint.id, Complaint.due_date, Complaint.created_at)
+                        .where(
+                            Complaint.status.notin_(CLOSED_STATUSES),
+                            Complaint.is_escalated == False,
+                            or_(
+                                Complaint.due_date <= horizon_end,
+                                and_(Complaint.due_date.is_(None), Complaint.created_at <= horizon_end - legacy_sla()),
+                            ),
+                        )
+                    )
+                ]
+            except Exception:
+                logger.exception(f"Deadline resync failed (shard={shard.name})")
+                return
+            finally:
+                db.close()
+
+        deadlines = {}
+        for shard_name, complaint_id, due_date, created_at in rows:
+            if due_date is None:
+                due_date = created_at + legacy_sla()  # the rule _escalate_chunk applies
+            deadlines[(shard_name, complaint_id)] = due_date
+        heap = [(due, key) for key, due in deadlines.items()]
+        heapq.heapify(heap)
+        with self._cond:
+            self._deadlines = deadlines
+            self._heap = heap
+            self._horizon_end = horizon_end
+            self._cond.notify()
+        logger.info(f"Deadline scheduler resynced: {len(heap)} deadlines until {horizon_end:%Y-%m-%d %H:%M}")
+
+    @property
+    def next_deadline(self) -> datetime | None:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    # -------- worker --------
+    def _drop_stale(self) -> None:
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self) -> list[tuple[str, int]] | None:
+        """Block until at least one deadline has passed; None once stopped."""
+        with self._cond:
+            while self._running:
+                self._drop_stale()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                now = datetime.utcnow()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due_date, key = heapq.heappop(self._heap)
+                    if self._deadlines.get(key) == due_date:
+                        del self._deadlines[key]
+                        due.append(key)
+                if due:
+                    return due
+            return None
+
+    def _run(self) -> None:
+        while True:
+            due = self._pop_due()
+            if due is None:
+                return
+            by_shard: dict[str, list[int]] = {}
+            for shard, complaint_id in due:
+                by_shard.setdefault(shard, []).append(complaint_id)
+            for shard, complaint_ids in by_shard.items():
+                try:
+                    run_escalation_job(complaint_ids=complaint_ids, shard=shard)
+                except Exception:
+                    logger.exception(f"Deadline escalation failed (shard={shard})")
+
+
+deadline_scheduler = DeadlineScheduler()
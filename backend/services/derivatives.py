@@ -0,0 +1,170 @@
+"""ResolveX Backend - Evidence thumbnails and previews.
+
+After an upload the evidence blob is rendered in a separate process pool into a
+small thumbnail and a web-sized preview (PDFs: their first page). Derivatives are
+keyed by the blob's SHA-256, so duplicates share them and they never change;
+the download endpoint serves them with `?size=thumb|preview` and immutable cache
+headers, or answers 202 while one is still rendering. Pillow (and pypdfium2 for PDFs) are only needed in the worker processes.
+"""
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SIZES = {
+    "thumb": settings.THUMBNAIL_SIZE_PX,
+    "preview": settings.PREVIEW_SIZE_PX,
+}
+MEDIA_TYPE = "image/webp"
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+PDF_TYPES = {"application/pdf"}
+
+
+def derivative_path(sha256: str, size: str) -> str:
+    return os.path.join(settings.DERIVATIVE_DIR, size, sha256[:2], f"{sha256}.webp")
+
+
+def _load_first_page(source: str, mime_type: str, max_px: int):
+    from PIL import Image
+
+    if mime_type in PDF_TYPES:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(source)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            return page.render(scale=max_px / max(width, height)).to_pil()
+        finally:
+            pdf.close()
+    img = Image.open(source)
+    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale, which is most of the work saved
+    img.draft("RGB", (max_px, max_px))
+    return img
+
+
+def render_derivatives(source: str, mime_type: str, targets: dict[str, tuple[int, str]]) -> list[str]:
+    """Worker-process entry point: write each (max_px, dest) target as WebP, largest first."""
+    from PIL import ImageOps
+
+    largest = max(px for px, _ in targets.values())
+    img = _load_first_page(source, mime_type, largest)
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+    written = []
+    for size, (max_px, dest) in sorted(targets.items(), key=lambda t: -t[1][0]):
+        img.thumbnail((max_px, max_px))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.part"
+        img.save(tmp, "WEBP", quality=80, method=4)
+        os.replace(tmp, dest)
+        written.append(size)
+    return written
+
+
+class DerivativeGenerator:
+    """Renders derivatives in a spawn-context process pool, one job per blob at a time."""
+
+    def __init__(self, workers: int, failure_ttl: float, max_failures: int = 4096):
+        self.workers = workers
+        self.failure_ttl = failure_ttl
+        self.max_failures = max_failures
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future] = {}
+        # sha256 -> when rendering failed; not retried for `failure_ttl` seconds, oldest evicted first
+        self._failed: "OrderedDict[str, float]" = OrderedDict()
+        self._pdf_supported = importlib.util.find_spec("pypdfium2") is not None
+        self.enabled = (
+            settings.DERIVATIVES_ENABLED and workers > 0 and importlib.util.find_spec("PIL") is not None
+        )
+        if settings.DERIVATIVES_ENABLED and not self.enabled:
+            logger.warning("Evidence previews disabled: Pillow is not installed or DERIVATIVE_WORKERS=0")
+
+    def supports(self, mime_type: str | None) -> bool:
+        if not self.enabled:
+            return False
+        return mime_type in IMAGE_TYPES or (mime_type in PDF_TYPES and self._pdf_supported)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def schedule(self, sha256: str, mime_type: str, source: str | None) -> Future | None:
+        """Queue rendering of every missing size; returns the in-flight job, if any."""
+        if source is None or not self.supports(mime_type):
+            return None
+        with self._lock:
+            failed_at = self._failed.get(sha256)
+            if failed_at is not None:
+                if time.monotonic() - failed_at < self.failure_ttl:
+                    return None
+                del self._failed[sha256]
+            future = self._pending.get(sha256)
+            if future is not None:
+                return future
+            targets = {
+                size: (px, derivative_path(sha256, size))
+                for size, px in SIZES.items()
+                if not os.path.exists(derivative_path(sha256, size))
+            }
+            if not targets:
+                return None
+            future = self._executor().submit(render_derivatives, source, mime_type, targets)
+            self._pending[sha256] = future
+        future.add_done_callback(lambda f: self._finished(sha256, f))
+        return future
+
+    def _finished(self, sha256: str, future: Future) -> None:
+        failed = not future.cancelled() and future.exception() is not None
+        with self._lock:
+            self._pending.pop(sha256, None)
+            if failed:
+                self._failed[sha256] = time.monotonic()
+                self._failed.move_to_end(sha256)
+                while len(self._failed) > self.max_failures:
+                    self._failed.popitem(last=False)
+        if failed:
+            logger.warning(f"Preview generation failed for blob {sha256[:12]}: {future.exception()}")
+
+    def get(self, sha256: str, mime_type: str, source: str | None, size: str) -> tuple[str | None, bool]:
+        """(path, pending): the derivative if rendered, else whether a render is now under way. Never waits."""
+        path = derivative_path(sha256, size)
+        if os.path.exists(path):
+            return path, False
+        future = self.schedule(sha256, mime_type, source)
+        if future is None:
+            return None, False
+        if future.done():
+            return (path, False) if os.path.exists(path) else (None, False)
+        return None, True
+
+    def purge(self, sha256: str) -> None:
+        for size in SIZES:
+            try:
+                os.remove(derivative_path(sha256, size))
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+derivative_generator = DerivativeGenerator(
+    workers=settings.DERIVATIVE_WORKERS,
+    failure_ttl=settings.DERIVATIVE_FAILURE_TTL_SECONDS,
+)
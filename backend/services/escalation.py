@@ -1,13 +1,18 @@
 """ResolveX Backend - Escalation detection and execution."""
+import logging
+import time
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, literal, or_, select, update
 from config import settings
-from models import Complaint, ComplaintLog, EscalationLog
-from database import SessionLocal
+from models import Assignment, Complaint, ComplaintLog, EscalationLog
+from database import all_shards, get_shard
+from services.events import stage
+from services.metrics import observe_job
 
+logger = logging.getLogger(__name__)
 
 PRIORITY_ORDER = ["low", "medium", "high", "critical"]
+CLOSED_STATUSES = ["resolved", "closed"]
 
 
 def _next_priority(current: str) -> str:
@@ -18,49 +23,117 @@ def _next_priority(current: str) -> str:
         return "high"
 
 
-def run_escalation_job() -> None:
-    """Find overdue complaints, escalate priority, log, and add complaint_log entry."""
-    if not settings.ESCALATION_ENABLED:
-        return
-    db = SessionLocal()
-    try:
-        cutoff = datetime.utcnow() - timedelta(days=settings.SLA_DAYS)
-        # Complaints not resolved/closed and past due (or created before cutoff)
-        overdue = (
-            db.query(Complaint)
-            .filter(
-                Complaint.status.notin_(["resolved", "closed"]),
-                Complaint.is_escalated == False,
-                Complaint.created_at <= cutoff,
-            )
-            .all()
+def legacy_sla() -> timedelta:
+    """Time after created_at at which a complaint without a due_date (filed before due
+    dates were stored) is overdue. The escalation query and the deadline scheduler must agree."""
+    return timedelta(days=settings.SLA_DAYS)
+
+
+def _escalate_chunk(
+    db, priority: str, now: datetime, reason: str, complaint_ids: list[int] | None = None
+) -> int:
+    """Escalate one bounded chunk of overdue complaints at `priority`; returns rows escalated."""
+    new_priority = _next_priority(priority)
+    # Past due_date; rows without one fall back to created_at + legacy_sla()
+    legacy_cutoff = now - legacy_sla()
+    q = (
+        select(Complaint.id)
+        .where(
+            Complaint.priority == priority,
+            Complaint.status.notin_(CLOSED_STATUSES),
+            Complaint.is_escalated == False,
+            or_(
+                Complaint.due_date <= now,
+                and_(Complaint.due_date.is_(None), Complaint.created_at <= legacy_cutoff),
+            ),
         )
-        for c in overdue:
-            old_priority = c.priority
-            new_priority = _next_priority(old_priority)
-            c.priority = new_priority
-            c.is_escalated = True
-            c.escalated_at = datetime.utcnow()
-            c.escalation_reason = f"Auto-escalated: SLA ({settings.SLA_DAYS} days) exceeded."
+        .order_by(Complaint.id)
+        .limit(settings.ESCALATION_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    if complaint_ids is not None:
+        q = q.where(Complaint.id.in_(complaint_ids))
+    ids = [row[0] for row in db.execute(q)]
+    if not ids:
+        return 0
 
-            db.add(
-                EscalationLog(
-                    complaint_id=c.id,
-                    previous_priority=old_priority,
-                    new_priority=new_priority,
-                    reason=c.escalation_reason,
-                )
-            )
-            db.add(
-                ComplaintLog(
-                    complaint_id=c.id,
-                    user_id=None,
-                    action="escalation",
-                    old_value=old_priority,
-                    new_value=new_priority,
-                    message=c.escalation_reason,
-                )
-            )
-        db.commit()
-    finally:
-        db.close()
+    db.execute(
+        insert(EscalationLog).from_select(
+            ["tenant_id", "complaint_id", "previous_priority", "new_priority", "reason", "triggered_at"],
+            select(
+                Complaint.tenant_id, Complaint.id, Complaint.priority, literal(new_priority), literal(reason), literal(now)
+            ).where(Complaint.id.in_(ids)),
+        )
+    )
+    db.execute(
+        insert(ComplaintLog).from_select(
+            ["tenant_id", "complaint_id", "user_id", "action", "old_value", "new_value", "message", "created_at"],
+            select(
+                Complaint.tenant_id,
+                Complaint.id,
+                literal(None),
+                literal("escalation"),
+                Complaint.priority,
+                literal(new_priority),
+                literal(reason),
+                literal(now),
+            ).where(Complaint.id.in_(ids)),
+        )
+    )
+    db.execute(
+        update(Complaint)
+        .where(Complaint.id.in_(ids))
+        .values(
+            priority=new_priority,
+            is_escalated=True,
+            escalated_at=now,
+            escalation_reason=reason,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    audiences = db.execute(
+        select(Complaint.tenant_id, Complaint.id, Complaint.user_id, Assignment.staff_id)
+        .outerjoin(Assignment, Assignment.complaint_id == Complaint.id)
+        .where(Complaint.id.in_(ids))
+    )
+    for tenant_id, complaint_id, user_id, staff_id in audiences:
+        stage(db, complaint_id, "complaint", "logs", audience=(user_id, staff_id), tenant_id=tenant_id)
+    return len(ids)
+
+
+def run_escalation_job(complaint_ids: list[int] | None = None, shard: str | None = None) -> dict:
+    """Escalate overdue complaints with set-based statements, one short transaction per chunk.
+
+    Runs on every tenant shard, or only on `shard`. With `complaint_ids`, only those
+    complaints are considered (used by the deadline scheduler, one shard at a time).
+    Returns {"escalated": <rows>, "duration_ms": <elapsed>}.
+    """
+    if not settings.ESCALATION_ENABLED:
+        return {"escalated": 0, "duration_ms": 0.0}
+    if complaint_ids is not None and not complaint_ids:
+        return {"escalated": 0, "duration_ms": 0.0}
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    reason = "Auto-escalated: SLA due date exceeded."
+    escalated = 0
+    shards = all_shards() if shard is None else [get_shard(shard)]
+    for target in shards:
+        for priority in PRIORITY_ORDER:
+            while True:
+                db = target.SessionLocal()
+                try:
+                    n = _escalate_chunk(db, priority, now, reason, complaint_ids)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    logger.exception(f"Escalation chunk failed (shard={target.name}, priority={priority})")
+                    n = 0
+                finally:
+                    db.close()
+                escalated += n
+                if n < settings.ESCALATION_BATCH_SIZE:
+                    break
+    duration_ms = (time.perf_counter() - started) * 1000
+    observe_job("escalation", duration_ms / 1000, escalated)
+    logger.info(f"Escalation job escalated {escalated} complaints in {duration_ms:.1f} ms")
+    return {"escalated": escalated, "duration_ms": duration_ms}
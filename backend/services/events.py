@@ -0,0 +1,314 @@
+"""ResolveX Backend - Complaint change events for server push.
+
+Writers record what changed on their DB session (`stage`); the events are
+published only once the transaction commits, so a client that re-fetches on an
+event sees the change, and a rolled-back write sends nothing. `add_log` stages
+automatically, so everything that writes the timeline is covered.
+
+Events travel through a backend to every worker's `EventBroker`, which fans them
+out to the open streams (routers/events.py) subscribed to that complaint or to
+the inbox of a user it concerns:
+
+- "local": in-process stand-in; only streams on the publishing worker see the
+  event. Fine for one worker and for development.
+- "redis": Redis pub/sub (needs the `redis` package), one channel shared by all
+  workers.
+
+Events only say which parts of a complaint changed ("complaint", "logs",
+"evidence", "feedback"); clients re-fetch those through the normal, access-checked
+endpoints. Everything is keyed by tenant, since complaint and user ids are only
+unique within a shard.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+ADMIN_ROLES = {"admin", "super_admin"}
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+_PENDING = "rx_events"
+
+
+# -------- staging on the session --------
+def stage(
+    db, complaint_id: int, *changes: str, audience: Iterable[int | None] = (), tenant_id: int | None = None
+) -> None:
+    """Publish `changes` to `complaint_id` after `db` commits.
+
+    `audience` are the user ids whose inbox the change belongs in (creator, assignee).
+    `tenant_id` defaults to the session's tenant; jobs, whose sessions span tenants,
+    pass the complaint's. Works with both Session and AsyncSession.
+    """
+    tenant_id = db.info["tenant_id"] if tenant_id is None else tenant_id
+    pending = db.info.setdefault(_PENDING, {})
+    entry = pending.setdefault((tenant_id, complaint_id), (set(), set()))
+    entry[0].update(changes)
+    entry[1].update(uid for uid in audience if uid is not None)
+
+
+def audience_of(complaint) -> tuple[int | None, ...]:
+    """Creator and (if already loaded) assignee of a Complaint, without triggering a lazy load."""
+    loaded = inspect(complaint).dict
+    assignment = loaded.get("assignment")
+    return complaint.user_id, assignment.staff_id if assignment is not None else None
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending or not settings.EVENTS_ENABLED:
+        return
+    now = time.time()
+    for (tenant_id, complaint_id), (changes, audience) in pending.items():
+        event_broker.publish(
+            {
+                "tenant_id": tenant_id,
+                "complaint_id": complaint_id,
+                "changes": sorted(changes),
+                "audience": sorted(audience),
+                "at": now,
+            }
+        )
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+# -------- backends --------
+class EventBackend(ABC):
+    """Carries published events to the broker of every worker."""
+
+    @abstractmethod
+    def publish(self, event: dict) -> None: ...
+
+    @abstractmethod
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        """Start calling `deliver` (from any thread) for each event published by any worker."""
+
+    @abstractmethod
+    def stop(self) -> None: ...
+
+
+class LocalBackend(EventBackend):
+    def __init__(self):
+        self._deliver: Callable[[dict], None] | None = None
+
+    def publish(self, event: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class RedisBackend(EventBackend):
+    """Redis pub/sub. Publishing is handed to a thread, so a slow Redis never blocks a request."""
+
+    def __init__(self, url: str, channel: str = "resolvex:events", max_pending: int = 10000):
+        import redis  # optional dependency, only needed with EVENTS_BACKEND=redis
+
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._outbox: queue.Queue = queue.Queue(max_pending)
+        self._publisher: threading.Thread | None = None
+        self._listener: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def publish(self, event: dict) -> None:
+        with self._lock:
+            if self._publisher is None:
+                self._publisher = threading.Thread(target=self._publish_loop, name="events-publish", daemon=True)
+                self._publisher.start()
+        try:
+            self._outbox.put_nowait(json.dumps(event))
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                logger.warning(f"Event outbox full, dropped {self._dropped} events so far")
+
+    def _publish_loop(self) -> None:
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            try:
+                self._client.publish(self.channel, message)
+            except Exception as e:
+                logger.warning(f"Publishing event to Redis failed: {e}")
+
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen, args=(deliver,), name="events-listen", daemon=True)
+        self._listener.start()
+
+    def _listen(self, deliver: Callable[[dict], None]) -> None:
+        connected_before = False
+        while not self._stopping.is_set():
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                if connected_before:
+                    # Events published while we were disconnected are gone; clients must re-fetch
+                    logger.info("Reconnected to Redis events channel")
+                    deliver({"resync": True})
+                connected_before = True
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        deliver(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning(f"Redis events subscription failed, retrying: {e}")
+                self._stopping.wait(2)
+            finally:
+                pubsub.close()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+        if self._publisher is not None:
+            self._outbox.put(None)
+            self._publisher.join(timeout=5)
+            self._publisher = None
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "redis": lambda: RedisBackend(settings.EVENTS_REDIS_URL),
+}
+
+
+# -------- broker --------
+class Subscription:
+    """One open stream: what it listens to and a bounded queue of SSE frames (None = close)."""
+
+    def __init__(self, tenant_id: int, user_id: int, role: str, complaint_ids: set[int], inbox: bool, queue_size: int):
+        self.tenant_id = tenant_id
+        self.user_id = user_id
+        self.role = role
+        self.complaint_ids = complaint_ids
+        self.inbox = inbox
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def offer(self, frame: str | None) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # A client this far behind gets one "resync" (re-fetch everything) instead of a backlog
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None if frame is None else RESYNC_FRAME)
+
+
+class EventBroker:
+    """Fans events out to this worker's streams. Subscriptions are only touched on the event loop."""
+
+    def __init__(self, backend: EventBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Keyed by (tenant id, complaint id), (tenant id, user id) and tenant id
+        self._by_complaint: dict[tuple[int, int], set[Subscription]] = {}
+        self._inbox: dict[tuple[int, int], set[Subscription]] = {}
+        self._admin_inbox: dict[int, set[Subscription]] = {}
+        self._subscriptions: set[Subscription] = set()
+
+    # -------- lifecycle --------
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self.backend.start(self._deliver)
+
+    def stop(self) -> None:
+        self.backend.stop()
+        for subscription in list(self._subscriptions):
+            subscription.offer(None)
+        self._loop = None
+
+    # -------- publishing --------
+    def publish(self, event: dict) -> None:
+        """Safe from any thread (threadpool endpoints, the escalation job)."""
+        self.backend.publish(event)
+
+    def _deliver(self, event: dict) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _fan_out(self, event: dict) -> None:
+        if event.get("resync"):
+            for subscription in self._subscriptions:
+                subscription.offer(RESYNC_FRAME)
+            return
+        tenant_id = event["tenant_id"]
+        targets = set(self._by_complaint.get((tenant_id, event["complaint_id"]), ()))
+        targets |= self._admin_inbox.get(tenant_id, set())
+        for user_id in event.get("audience", ()):
+            targets |= self._inbox.get((tenant_id, user_id), set())
+        if not targets:
+            return
+        public = {"complaint_id": event["complaint_id"], "changes": event["changes"], "at": event["at"]}
+        frame = f"event: complaint\ndata: {json.dumps(public)}\n\n"
+        for subscription in targets:
+            subscription.offer(frame)
+
+    # -------- subscriptions --------
+    def subscribe(
+        self, tenant_id: int, user_id: int, role: str, complaint_ids: set[int], inbox: bool
+    ) -> Subscription:
+        subscription = Subscription(tenant_id, user_id, role, complaint_ids, inbox, self.queue_size)
+        self._subscriptions.add(subscription)
+        for complaint_id in complaint_ids:
+            self._by_complaint.setdefault((tenant_id, complaint_id), set()).add(subscription)
+        if inbox and role in ADMIN_ROLES:
+            self._admin_inbox.setdefault(tenant_id, set()).add(subscription)
+        elif inbox:
+            self._inbox.setdefault((tenant_id, user_id), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        tenant_id = subscription.tenant_id
+        self._subscriptions.discard(subscription)
+        self._discard(self._admin_inbox, tenant_id, subscription)
+        for complaint_id in subscription.complaint_ids:
+            self._discard(self._by_complaint, (tenant_id, complaint_id), subscription)
+        self._discard(self._inbox, (tenant_id, subscription.user_id), subscription)
+
+    @staticmethod
+    def _discard(index: dict, key, subscription: Subscription) -> None:
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del index[key]
+
+    def stats(self) -> dict:
+        return {
+            "streams": len(self._subscriptions),
+            "complaints_watched": len(self._by_complaint),
+            "backend": type(self.backend).__name__,
+        }
+
+
+event_broker = EventBroker(BACKENDS[settings.EVENTS_BACKEND](), settings.EVENTS_QUEUE_SIZE)
@@ -0,0 +1,138 @@
+"""ResolveX Backend - Sending stored files: validators, byte ranges and proxy offload.
+
+Evidence content never changes once uploaded, so the content hash is a strong
+ETag and the upload time a stable Last-Modified. Conditional requests get 304,
+a single `Range` gets 206, and with SENDFILE_MODE set the reverse proxy sends
+the bytes (nginx `X-Accel-Redirect`, Apache/lighttpd `X-Sendfile`) after Python
+has only authorized the request.
+"""
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import BinaryIO, Callable, Iterator
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from config import settings
+from services.uploads import CHUNK_SIZE
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _requested_range(request: Request, etag: str, size: int) -> tuple[int, int] | None | bool:
+    """(start, end) inclusive for a satisfiable single range, None to send it all, False if unsatisfiable."""
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # multiple or malformed ranges: a full 200 is always a valid answer
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _read(opener: Callable[[], BinaryIO], start: int, length: int) -> Iterator[bytes]:
+    with opener() as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload_headers(path: str) -> dict | None:
+    if settings.SENDFILE_MODE == "x-sendfile":
+        return {"X-Sendfile": os.path.abspath(path)}
+    if settings.SENDFILE_MODE == "x-accel-redirect":
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(settings.UPLOAD_DIR))
+        if relative.startswith(".."):
+            return None  # outside the location the proxy exposes; send it ourselves
+        return {"X-Accel-Redirect": f"{settings.SENDFILE_ACCEL_PREFIX.rstrip('/')}/{quote(relative.replace(os.sep, '/'))}"}
+    return None
+
+
+def send_file(
+    request: Request,
+    *,
+    path: str | None,
+    opener: Callable[[], BinaryIO] | None = None,
+    size: int,
+    etag: str,
+    last_modified: datetime,
+    media_type: str,
+    cache_control: str,
+    filename: str | None = None,
+) -> Response:
+    """Answer a GET for an immutable file at `path` (or readable through `opener`)."""
+    headers = {
+        "ETag": etag,
+        "Last-Modified": _http_date(last_modified),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    offload = _offload_headers(path) if path else None
+    if offload:
+        # The proxy serves the body and handles Range itself
+        return Response(headers={**headers, **offload}, media_type=media_type)
+
+    if opener is None:
+        opener = lambda: open(path, "rb")  # noqa: E731
+    byte_range = _requested_range(request, etag, size)
+    if byte_range is False:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        _read(opener, start, length),
+        status_code=206 if byte_range else 200,
+        headers=headers,
+        media_type=media_type,
+    )
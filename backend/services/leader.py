@@ -0,0 +1,93 @@
+"""ResolveX Backend - Single-leader election for background jobs (MySQL GET_LOCK)."""
+import functools
+import logging
+import threading
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from config import settings
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Named MySQL advisory lock held on a dedicated connection.
+
+    Whoever holds the lock is the leader. The lock is tied to the connection, so if the
+    leader process dies its connection closes, MySQL releases the lock and the next
+    follower to poll `acquire()` takes over. On other dialects (SQLite in development)
+    or with LEADER_ELECTION_ENABLED=false every instance acts as leader, and jobs rely on
+    `FOR UPDATE SKIP LOCKED` to split the work instead.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._conn: Connection | None = None
+        self._mutex = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LEADER_ELECTION_ENABLED and engine.dialect.name == "mysql"
+
+    def acquire(self) -> bool:
+        """Return True if this instance is (still, or now) the leader."""
+        if not self.enabled:
+            return True
+        with self._mutex:
+            if self._conn is not None:
+                try:
+                    held = self._conn.execute(
+                        text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"), {"name": self.name}
+                    ).scalar()
+                    if held:
+                        return True
+                except Exception as e:
+                    logger.warning(f"Leader connection for {self.name} lost: {e}")
+                self._close()
+                logger.warning(f"Lost leadership of {self.name}")
+
+            conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                got = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": self.name}).scalar()
+            except Exception as e:
+                logger.error(f"GET_LOCK({self.name}) failed: {e}")
+                conn.close()
+                return False
+            if got != 1:
+                conn.close()
+                return False
+            self._conn = conn
+            logger.info(f"Acquired leadership of {self.name}")
+            return True
+
+    def release(self) -> None:
+        with self._mutex:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.name})
+            except Exception:
+                pass
+            self._close()
+
+    def _close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+job_leader = LeaderLock("resolvex:background-jobs")
+
+
+def leader_only(fn):
+    """Wrap a scheduled job so it only runs on the instance holding `job_leader`."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not job_leader.acquire():
+            return None
+        return fn(*args, **kwargs)
+
+    return wrapper
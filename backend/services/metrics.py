@@ -0,0 +1,180 @@
+"""ResolveX Backend - Prometheus metrics.
+
+`MetricsMiddleware` times every HTTP request by route template (so
+`/api/complaints/{complaint_id}` is one series, not one per id), method and
+status, and tracks requests in flight. Services record AI provider calls,
+background job runs, upload bytes, admission refusals and how long complaints
+waited for an assignee through the helpers below. Threadpool
+usage, connection pools, the principal cache and replica health are read
+when `/metrics` is scraped, so they cost nothing per request.
+
+With several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before start-up so every worker's counters are aggregated; the
+scrape-time gauges then describe the worker that answered the scrape.
+"""
+import os
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_LATENCY = Histogram(
+    "resolvex_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "resolvex_http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+AI_LATENCY = Histogram(
+    "resolvex_ai_request_duration_seconds",
+    "AI provider call latency",
+    ["provider", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+AI_ERRORS = Counter("resolvex_ai_request_errors_total", "Failed AI provider calls", ["provider", "operation"])
+JOB_DURATION = Histogram(
+    "resolvex_job_duration_seconds",
+    "Background job run time",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+JOB_ROWS = Counter("resolvex_job_rows_total", "Rows changed by background jobs", ["job"])
+UPLOAD_BYTES = Counter("resolvex_upload_bytes_total", "Evidence upload bytes received")
+ASSIGNMENT_WAIT = Histogram(
+    "resolvex_assignment_wait_seconds",
+    "Time from a complaint being filed to its first assignment",
+    ["mode"],
+    buckets=(1, 10, 60, 300, 900, 3600, 4 * 3600, 12 * 3600, 86400, 3 * 86400, 7 * 86400),
+)
+ADMISSION_REJECTED = Counter(
+    "resolvex_admission_rejected_total", "Requests refused with 429 by admission control", ["endpoint_class", "reason"]
+)
+
+
+def observe_ai_call(provider: str, operation: str, seconds: float, failed: bool) -> None:
+    AI_LATENCY.labels(provider, operation).observe(seconds)
+    if failed:
+        AI_ERRORS.labels(provider, operation).inc()
+
+
+def observe_job(job: str, seconds: float, rows: int) -> None:
+    JOB_DURATION.labels(job).observe(seconds)
+    JOB_ROWS.labels(job).inc(rows)
+
+
+def observe_assignment_wait(mode: str, seconds: float) -> None:
+    ASSIGNMENT_WAIT.labels(mode).observe(max(0.0, seconds))
+
+
+def observe_admission_rejected(endpoint_class: str, reason: str) -> None:
+    ADMISSION_REJECTED.labels(endpoint_class, reason).inc()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: one histogram observation and an in-flight gauge per request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: dict | None = None
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"  # 404s must not create a series per path
+        if self._templates is None:
+            self._templates = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._templates.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            HTTP_LATENCY.labels(scope["method"], self._route(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+class _ProcessCollector:
+    """State that lives in this worker process, sampled at scrape time."""
+
+    def __init__(self):
+        self.threadpool: dict = {}
+
+    def collect(self):
+        from database import pool_stats
+        from services.pool_metrics import WAIT_BUCKETS_MS
+        from services.events import event_broker
+        from services.principal_cache import principal_cache
+
+        if self.threadpool:
+            for name, help_text in (
+                ("busy", "Worker threads running sync endpoints/dependencies"),
+                ("size", "Threadpool capacity"),
+                ("waiting", "Calls queued for a worker thread"),
+            ):
+                yield GaugeMetricFamily(f"resolvex_threadpool_{name}", help_text, value=self.threadpool[name])
+
+        yield GaugeMetricFamily(
+            "resolvex_event_streams", "Open server-sent event streams", value=event_broker.stats()["streams"]
+        )
+
+        cache = principal_cache.stats()
+        yield GaugeMetricFamily("resolvex_principal_cache_entries", "Cached principals", value=cache["entries"])
+        yield CounterMetricFamily("resolvex_principal_cache_hits", "Principal cache hits", value=cache["hits"])
+        yield CounterMetricFamily("resolvex_principal_cache_misses", "Principal cache misses", value=cache["misses"])
+
+        checked_out = GaugeMetricFamily("resolvex_db_pool_checked_out", "Connections checked out", labels=["pool"])
+        timeouts = CounterMetricFamily("resolvex_db_pool_timeouts", "Checkout timeouts", labels=["pool"])
+        invalidations = CounterMetricFamily("resolvex_db_pool_invalidations", "Invalidated connections", labels=["pool"])
+        wait = HistogramMetricFamily(
+            "resolvex_db_pool_checkout_wait_seconds", "Connection checkout wait", labels=["pool"]
+        )
+        replica_lag = GaugeMetricFamily("resolvex_db_replica_lag_seconds", "Replica lag (-1 if unknown)", labels=["pool"])
+        for pool, stats in pool_stats().items():
+            checked_out.add_metric([pool], stats["checked_out"])
+            timeouts.add_metric([pool], stats["timeouts"])
+            invalidations.add_metric([pool], stats["invalidations"])
+            buckets = [
+                (str(bound / 1000) if bound != "+Inf" else "+Inf", count)
+                for bound, count in zip((*WAIT_BUCKETS_MS, "+Inf"), stats["wait_ms_buckets"].values())
+            ]
+            wait.add_metric([pool], buckets, stats["wait_ms_sum"] / 1000)
+            if "replica" in stats:
+                lag = stats["replica"]["lag_seconds"]
+                replica_lag.add_metric([pool], -1 if lag is None else lag)
+        yield from (checked_out, timeouts, invalidations, wait, replica_lag)
+
+
+process_collector = _ProcessCollector()
+REGISTRY.register(process_collector)
+
+
+def render(threadpool: dict) -> tuple[bytes, str]:
+    """Exposition body and content type; `threadpool` is sampled by the caller on the event loop."""
+    process_collector.threadpool = threadpool
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(process_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,140 @@
+"""ResolveX Backend - Connection pool metrics.
+
+Connections checked out, connects, invalidations and checkout timeouts are
+counted from SQLAlchemy pool events. Pool events fire only once a connection has
+been handed out, so the checkout wait is timed by a thin subclass of the pool
+class around `_do_get` (the queue wait, plus the connect when the pool grows).
+Waits longer than DB_POOL_SLOW_CHECKOUT_MS are logged, at most every
+SLOW_LOG_INTERVAL_SECONDS per pool.
+"""
+import bisect
+import logging
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is unbounded
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SLOW_LOG_INTERVAL_SECONDS = 10
+
+
+class PoolMetrics:
+    """Thread-safe counters and a checkout wait histogram for one engine's pool."""
+
+    def __init__(self, name: str, slow_checkout_ms: float):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_sum_ms = 0.0
+        self._slow_since_log = 0
+        self._last_slow_log = 0.0
+        self.pool: Pool | None = None
+
+    def attach(self, target) -> None:
+        """Listen to the pool events of an Engine (or Pool); survives engine.dispose()."""
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "detach", self._on_checkin)
+        event.listen(target, "invalidate", self._on_invalidate)
+        event.listen(target, "soft_invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def observe_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_sum_ms += wait_ms
+            if wait_ms < self.slow_checkout_ms:
+                return
+            self._slow_since_log += 1
+            now = time.monotonic()
+            if now - self._last_slow_log < SLOW_LOG_INTERVAL_SECONDS:
+                return
+            slow, self._slow_since_log, self._last_slow_log = self._slow_since_log, 0, now
+        logger.warning(
+            f"{self.name} pool: connection checkout waited {wait_ms:.0f} ms "
+            f"({slow} slow checkouts since last report; {self._status()})"
+        )
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.error(f"{self.name} pool: timed out waiting for a connection ({self._status()})")
+
+    def _status(self) -> str:
+        return self.pool.status() if self.pool is not None else "no pool"
+
+    def stats(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            observed = sum(self.wait_buckets)
+            cumulative, buckets = 0, {}
+            for bound, count in zip((*WAIT_BUCKETS_MS, "+Inf"), self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_ms_sum": self.wait_sum_ms,
+                "wait_ms_count": observed,
+                "wait_ms_avg": self.wait_sum_ms / observed if observed else 0.0,
+                "wait_ms_buckets": buckets,
+            }
+
+
+def instrumented_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """Subclass of `base` that times each checkout into `metrics`.
+
+    The metrics live on the class because Pool.recreate() (engine.dispose())
+    builds the replacement pool from `self.__class__`.
+    """
+
+    class InstrumentedPool(base):
+        _metrics = metrics
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._metrics.pool = self
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                self._metrics.record_timeout()
+                raise
+            self._metrics.observe_wait((time.perf_counter() - started) * 1000)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
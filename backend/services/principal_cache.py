@@ -0,0 +1,99 @@
+"""ResolveX Backend - TTL cache of authenticated principals (fields authorization needs)."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from config import settings
+from models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The subset of a User that auth dependencies and routers read."""
+    id: int
+    tenant_id: int
+    role: str
+    is_active: bool
+    department_id: int | None
+    full_name: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            tenant_id=user.tenant_id,
+            role=user.role,
+            is_active=bool(user.is_active),
+            department_id=user.department_id,
+            full_name=user.full_name,
+        )
+
+
+class PrincipalCache:
+    """Bounded, thread-safe TTL map of (tenant id, user id) -> Principal with hit/miss counters.
+
+    User ids are only unique within a shard, hence the tenant in the key.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, int], tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant_id: int, user_id: int) -> Principal | None:
+        key = (tenant_id, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        key = (principal.tenant_id, principal.id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: int, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop((tenant_id, user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    # Role changes and deactivation must not wait out the TTL on this worker
+    principal_cache.invalidate(target.tenant_id, target.id)
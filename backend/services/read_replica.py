@@ -0,0 +1,180 @@
+"""ResolveX Backend - Routing read-only queries to a replica.
+
+`get_read_db` / `get_async_read_db` (database.py) hand out replica sessions
+when READ_DATABASE_URL is set, unless:
+
+- the replica is unreachable, or more than READ_REPLICA_MAX_LAG_SECONDS behind
+  the primary (MySQL `Seconds_Behind_Source`, checked at most every
+  READ_REPLICA_CHECK_SECONDS; a lag of NULL means replication is stopped), or
+- the caller wrote something in the last READ_YOUR_WRITES_SECONDS, so they see
+  their own change. `ReadYourWritesMiddleware` marks successful non-GET API
+  requests in a cookie (other workers see it) and in a per-process map keyed
+  by the bearer token (clients that do not keep cookies), or
+- the request carries `X-Read-After: <epoch seconds>` from the last
+  READ_YOUR_WRITES_SECONDS: pages re-fetching because a pushed event
+  (services/events.py) said something changed must not get the old row back.
+
+A replica that is not replicating at all (e.g. a second local database used in
+development) reports no lag and is always used.
+"""
+import hashlib
+import logging
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "rx_read_primary_until"
+READ_AFTER_HEADER = "x-read-after"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def replication_lag(conn: Connection) -> float | None:
+    """Seconds the replica is behind, 0 if it does not replicate, None if replication is broken."""
+    if conn.dialect.name != "mysql":
+        conn.execute(text("SELECT 1"))
+        return 0.0
+    for statement, column in (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),  # MySQL < 8.0.22
+    ):
+        try:
+            row = conn.exec_driver_sql(statement).mappings().first()
+        except Exception:
+            continue
+        if row is None:
+            return 0.0
+        lag = row.get(column)
+        return float(lag) if lag is not None else None
+    return None
+
+
+class ReplicaMonitor:
+    """Cached replica health for one replica engine (sync or async)."""
+
+    def __init__(self, name: str, max_lag_seconds: float, check_seconds: float):
+        self.name = name
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.lag: float | None = None
+        self.healthy = False
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        """True for exactly one caller per check interval (the one that should run the check)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_seconds:
+                return False
+            self._checked_at = now
+            return True
+
+    def record(self, lag: float | None, error: Exception | None = None) -> None:
+        healthy = error is None and lag is not None and lag <= self.max_lag_seconds
+        if healthy != self.healthy:
+            if healthy:
+                logger.info(f"{self.name} replica in use (lag {lag:.0f}s)")
+            elif error is not None:
+                logger.warning(f"{self.name} replica unreachable, reading from primary: {error}")
+            elif lag is None:
+                logger.warning(f"{self.name} replica not replicating (or status not visible), reading from primary")
+            else:
+                logger.warning(f"{self.name} replica lag {lag:.0f}s over limit, reading from primary")
+        self.lag, self.healthy = lag, healthy
+
+    def check(self, engine) -> bool:
+        if self.due():
+            try:
+                with engine.connect() as conn:
+                    self.record(replication_lag(conn))
+            except Exception as e:
+                self.record(None, e)
+        return self.healthy
+
+    async def check_async(self, engine) -> bool:
+        if self.due():
+            try:
+                async with engine.connect() as conn:
+                    self.record(await conn.run_sync(replication_lag))
+            except Exception as e:
+                self.record(None, e)
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {"healthy": self.healthy, "lag_seconds": self.lag}
+
+
+class RecentWriters:
+    """Per-process map of bearer token hash -> time until which reads go to the primary."""
+
+    def __init__(self, window_seconds: float, max_entries: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(authorization: str | None) -> str | None:
+        if not authorization:
+            return None
+        return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+    def mark(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+            self._until[key] = now + self.window_seconds
+
+    def recent(self, key: str | None) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            return self._until.get(key, 0) > time.time()
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def wants_primary(request) -> bool:
+    """Whether this caller must read from the primary to see a recent write (theirs, or one pushed to them)."""
+    now = time.time()
+    try:
+        if float(request.cookies.get(PRIMARY_COOKIE, "0")) > now:
+            return True
+        if float(request.headers.get(READ_AFTER_HEADER, "0")) > now - settings.READ_YOUR_WRITES_SECONDS:
+            return True
+    except ValueError:
+        pass
+    return recent_writers.recent(RecentWriters.key(request.headers.get("authorization")))
+
+
+class ReadYourWritesMiddleware:
+    """Pins a caller's reads to the primary for a while after each successful API write."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+                authorization = next((v for k, v in scope["headers"] if k == b"authorization"), None)
+                if authorization:
+                    recent_writers.mark(RecentWriters.key(authorization.decode("latin-1")))
+                cookie = (
+                    f"{PRIMARY_COOKIE}={until:.0f}; Max-Age={int(settings.READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/api; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,198 @@
+"""ResolveX Backend - Per-request SQL profiling.
+
+Cursor events on every Engine (sync, async, replica) feed the profile of the
+request that issued the query, found through a context variable, so
+threadpool endpoints and async sessions are covered alike. Per request it
+records:
+
+- query count and total DB time, sent back as a `Server-Timing` header
+  (visible in the browser's network panel)
+- repeated statement shapes: a shape run SQL_N_PLUS_ONE_THRESHOLD or more
+  times is logged once per endpoint as a likely N+1
+- requests slower than SLOW_REQUEST_MS, logged with their worst queries
+
+In tests, `query_budget(n)` fails when any request completed inside it (or
+code run directly in it) issued more than n queries.
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace and expanded IN lists collapsed, so equal shapes compare equal."""
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement)).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    db_ms: float = 0.0
+    shapes: dict[str, QueryStats] = field(default_factory=dict)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        stats = self.shapes.setdefault(statement_shape(statement), QueryStats())
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def repeated(self, threshold: int) -> list[tuple[str, QueryStats]]:
+        return [(shape, s) for shape, s in self.shapes.items() if s.count >= threshold]
+
+    def worst(self, n: int = 3) -> list[tuple[str, QueryStats]]:
+        return sorted(self.shapes.items(), key=lambda item: -item[1].total_ms)[:n]
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("sql_profile", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the execution context, which is dropped with the statement even when it raises
+    if context is not None and _current.get() is not None:
+        context._rx_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current.get()
+    started = getattr(context, "_rx_query_started", None)
+    if profile is not None and started is not None:
+        profile.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def _short(shape: str, limit: int = 200) -> str:
+    return shape if len(shape) <= limit else shape[:limit] + "..."
+
+
+class _Observers:
+    """Finished request profiles are handed to every active `query_budget` (tests only)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: list = []
+
+    def add(self, callback) -> None:
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def remove(self, callback) -> None:
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def notify(self, label: str, profile: RequestProfile) -> None:
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(label, profile)
+
+
+_observers = _Observers()
+_reported_n_plus_one: set[tuple[str, str]] = set()
+
+
+class SqlProfilerMiddleware:
+    """Profiles each HTTP request's queries; adds Server-Timing and logs N+1s and slow requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                streaming = any(
+                    k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", [])
+                )
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={profile.db_ms:.1f};desc="{profile.queries} queries", '
+                    f"app;dur={max(0.0, total_ms - profile.db_ms):.1f}"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(scope, profile, (time.perf_counter() - started) * 1000, streaming)
+
+    @staticmethod
+    def _report(scope, profile: RequestProfile, total_ms: float, streaming: bool = False) -> None:
+        label = f"{scope['method']} {scope['path']}"
+        endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+        for shape, stats in profile.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            key = (endpoint, shape)
+            if key in _reported_n_plus_one or len(_reported_n_plus_one) > 1000:
+                continue
+            _reported_n_plus_one.add(key)
+            logger.warning(
+                f"Possible N+1 in {endpoint} ({label}): {stats.count}x {stats.total_ms:.1f} ms {_short(shape)}"
+            )
+        if total_ms >= settings.SLOW_REQUEST_MS and not streaming:  # event streams are long by design
+            worst = "; ".join(
+                f"{s.total_ms:.0f} ms/{s.count}x {_short(shape, 120)}" for shape, s in profile.worst()
+            )
+            logger.warning(
+                f"Slow request {label}: {total_ms:.0f} ms, {profile.queries} queries, "
+                f"{profile.db_ms:.0f} ms in DB. Worst: {worst or 'none'}"
+            )
+        _observers.notify(label, profile)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Test helper: assert no request (or direct code) in the block ran more than `max_queries` queries.
+
+        with query_budget(3):
+            client.get("/api/complaints", headers=auth)
+    """
+    direct = RequestProfile()
+    over: list[str] = []
+
+    def check(label: str, profile: RequestProfile) -> None:
+        if profile.queries > max_queries:
+            repeated = ", ".join(f"{s.count}x {_short(shape, 80)}" for shape, s in profile.repeated(2))
+            over.append(f"{label} ran {profile.queries} queries (budget {max_queries}); repeated: {repeated or 'none'}")
+
+    token = _current.set(direct)
+    _observers.add(check)
+    try:
+        yield direct
+    finally:
+        _observers.remove(check)
+        _current.reset(token)
+    check("block", direct)
+    if over:
+        raise AssertionError("Query budget exceeded:\n" + "\n".join(over))
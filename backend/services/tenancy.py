@@ -0,0 +1,149 @@
+"""ResolveX Backend - Tenants: request resolution, the tenant directory and query scoping.
+
+Every organisation hosted on a deployment is a tenant. A request's tenant comes
+from the TENANT_HEADER header, else the subdomain of TENANT_BASE_DOMAIN, else
+DEFAULT_TENANT. The `tenants` table in the default database (the directory)
+maps it to an id and to the shard holding its rows (database.py). Tokens carry
+the id of the tenant they were issued for and are refused on any other.
+
+Sessions opened for a tenant (`get_db` and friends) carry its id in
+`session.info`, and two session events enforce the boundary for every
+`TenantScoped` model:
+
+- ORM SELECT, UPDATE and DELETE statements get `tenant_id = :id` added
+  (`with_loader_criteria`), including joins and eager loads
+- new rows are stamped with the tenant id; a row for another tenant is refused
+
+Raw SQL (`text()`) and Core INSERT ... SELECT are not rewritten and must filter
+on tenant_id themselves. Background jobs use sessions without a tenant and work
+on every tenant of a shard.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from fastapi import HTTPException, Request
+from sqlalchemy import Column, Integer, event, text
+from sqlalchemy.orm import Session, with_loader_criteria
+from starlette.concurrency import run_in_threadpool
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT_ID = 1
+DEFAULT_SHARD = "default"
+
+
+class TenantScoped:
+    """Model mixin: the row belongs to one tenant."""
+    tenant_id = Column(Integer, nullable=False)
+
+
+class CrossTenantWrite(Exception):
+    """A session scoped to one tenant tried to insert a row of another."""
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_tenant(state) -> None:
+    tenant_id = state.session.info.get("tenant_id")
+    if tenant_id is None or state.is_column_load or state.is_relationship_load:
+        return  # lazy loads and refreshes start from rows that were already filtered
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            with_loader_criteria(TenantScoped, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_tenant(session: Session, flush_context, instances) -> None:
+    tenant_id = session.info.get("tenant_id")
+    if tenant_id is None:
+        return
+    for obj in session.new:
+        if not isinstance(obj, TenantScoped):
+            continue
+        if obj.tenant_id is None:
+            obj.tenant_id = tenant_id
+        elif obj.tenant_id != tenant_id:
+            raise CrossTenantWrite(f"{type(obj).__name__} of tenant {obj.tenant_id} in a tenant {tenant_id} session")
+
+
+@dataclass(frozen=True)
+class TenantInfo:
+    id: int
+    slug: str
+    name: str
+    shard: str
+    is_active: bool
+
+
+class TenantDirectory:
+    """Every tenant by slug, reloaded from the directory database at most every `ttl_seconds`.
+
+    Tenants are few (one row per organisation), so the whole table is cached; a
+    tenant added with `manage.py tenant add` is picked up within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._by_slug: dict[str, TenantInfo] = {}
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def fresh(self) -> bool:
+        return time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def reload(self) -> None:
+        from database import engine  # the directory lives in the default database
+
+        with self._lock:
+            if self.fresh():
+                return  # another thread reloaded while we waited
+            try:
+                with engine.connect() as conn:
+                    rows = conn.execute(text("SELECT id, slug, name, shard, is_active FROM tenants")).all()
+            except Exception:
+                if not self._by_slug:
+                    raise
+                logger.exception("Tenant directory reload failed, keeping the cached copy")
+            else:
+                self._by_slug = {
+                    row.slug: TenantInfo(row.id, row.slug, row.name, row.shard, bool(row.is_active)) for row in rows
+                }
+            self._loaded_at = time.monotonic()
+
+    def get(self, slug: str) -> TenantInfo | None:
+        """Cached lookup, never touches the database (see `find`)."""
+        return self._by_slug.get(slug)
+
+    def find(self, slug: str) -> TenantInfo | None:
+        """Lookup that reloads a stale directory first (blocking; for scripts and threads)."""
+        if not self.fresh():
+            self.reload()
+        return self.get(slug)
+
+    def all(self) -> list[TenantInfo]:
+        return list(self._by_slug.values())
+
+
+tenant_directory = TenantDirectory(settings.TENANT_CACHE_SECONDS)
+
+
+def tenant_slug(request: Request) -> str:
+    slug = request.headers.get(settings.TENANT_HEADER)
+    if not slug and settings.TENANT_BASE_DOMAIN:
+        host = request.headers.get("host", "").split(":")[0].lower()
+        suffix = "." + settings.TENANT_BASE_DOMAIN.lower()
+        if host.endswith(suffix):
+            slug = host[: -len(suffix)]
+    return (slug or settings.DEFAULT_TENANT).strip().lower()
+
+
+async def get_tenant(request: Request) -> TenantInfo:
+    """FastAPI dependency: the tenant this request is for (404 if unknown or disabled)."""
+    if not tenant_directory.fresh():
+        await run_in_threadpool(tenant_directory.reload)
+    tenant = tenant_directory.get(tenant_slug(request))
+    if tenant is None or not tenant.is_active:
+        raise HTTPException(404, "Unknown tenant")
+    return tenant
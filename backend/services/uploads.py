@@ -0,0 +1,137 @@
+"""ResolveX Backend - Streaming upload staging (multipart parsing, size cap, SHA-256, MIME sniffing)."""
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+import aiofiles
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+from services.metrics import UPLOAD_BYTES
+
+CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Leading bytes -> MIME type for every type we accept
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+}
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class BadUpload(Exception):
+    """The request body is not a multipart form carrying the expected file."""
+
+
+@dataclass
+class StagedUpload:
+    path: str
+    sha256: str
+    size: int
+    mime_type: str | None
+    filename: str | None = None
+
+
+def sniff_mime(head: bytes) -> str | None:
+    """Real content type from the first bytes of a file, or None if not a type we accept."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in _SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    return None
+
+
+async def stage_upload(request: Request, field: str, directory: str, max_bytes: int) -> StagedUpload:
+    """Stream the `field` file part of a multipart/form-data request into a temp file under `directory`.
+
+    The body is parsed as it arrives from the socket (Starlette's form parsing
+    would spool all of it first), hashed and sniffed on the way, and reading
+    stops as soon as the file crosses `max_bytes`. Other form fields are
+    skipped. The caller moves `path` into place with os.replace (atomic on the
+    same filesystem) or deletes it.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise BadUpload("Expected a multipart/form-data body")
+    events: list[tuple[str, bytes]] = []
+    parser = MultipartParser(
+        params[b"boundary"],
+        callbacks={
+            "on_part_begin": lambda: events.append(("begin", b"")),
+            "on_header_field": lambda data, start, end: events.append(("field", data[start:end])),
+            "on_header_value": lambda data, start, end: events.append(("value", data[start:end])),
+            "on_header_end": lambda: events.append(("header_end", b"")),
+            "on_headers_finished": lambda: events.append(("headers", b"")),
+            "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        },
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    filename = None
+    found = in_file = False
+    header_field = header_value = b""
+    headers: dict[bytes, bytes] = {}
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                for kind, data in events:
+                    if kind == "begin":
+                        in_file, headers, header_field, header_value = False, {}, b"", b""
+                    elif kind == "field":
+                        header_field += data
+                    elif kind == "value":
+                        header_value += data
+                    elif kind == "header_end":
+                        headers[header_field.lower()] = header_value
+                        header_field = header_value = b""
+                    elif kind == "headers":
+                        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+                        in_file = not found and disposition.get(b"name") == field.encode() and b"filename" in disposition
+                        if in_file:
+                            found = True
+                            filename = disposition[b"filename"].decode("utf-8", "replace")
+                    elif in_file:
+                        size += len(data)
+                        if size > max_bytes:
+                            raise UploadTooLarge()
+                        if len(head) < 16:
+                            head += data[: 16 - len(head)]
+                        digest.update(data)
+                        await out.write(data)
+                events.clear()
+            parser.finalize()
+        if not found:
+            raise BadUpload(f"No file in form field {field!r}")
+    except BaseException:
+        discard(path)
+        raise
+    finally:
+        UPLOAD_BYTES.inc(size)
+    return StagedUpload(path=path, sha256=digest.hexdigest(), size=size, mime_type=sniff_mime(head), filename=filename)
+
+
+def discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,78 @@
+"""ResolveX Backend - ZIP archives streamed while they are built.
+
+`stream_zip` writes through a sink with no seek/tell, so zipfile emits data
+descriptors and only ever holds the current chunk: neither the archive nor any
+member is buffered in memory or on disk. Images are stored as-is (they are
+already compressed); everything else is deflated.
+"""
+import logging
+import posixpath
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator
+from services.uploads import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+PRECOMPRESSED_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+
+@dataclass
+class ZipEntry:
+    name: str
+    mime_type: str
+    size: int
+    modified: datetime
+    open: Callable[[], BinaryIO]
+
+
+class _Sink:
+    """Write-only file object; the generator drains what zipfile wrote after each chunk."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def safe_name(name: str) -> str:
+    """Strip directories and separators from a user-supplied file name."""
+    name = posixpath.basename(name.replace("\\", "/")).strip()
+    return name or "file"
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+        for entry in entries:
+            try:
+                src = entry.open()
+            except OSError as e:
+                logger.warning(f"Skipping {entry.name} in ZIP export: {e}")
+                continue
+            info = zipfile.ZipInfo(entry.name, date_time=max(entry.modified, datetime(1980, 1, 1)).timetuple()[:6])
+            info.file_size = entry.size  # lets zipfile pick Zip64 headers up front for huge members
+            if entry.mime_type in PRECOMPRESSED_TYPES:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with src, zf.open(info, "w") as dest:
+                while chunk := src.read(CHUNK_SIZE):
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
@@ -0,0 +1,430 @@
+"""ResolveX Backend - Synthetic dataset generator for scale testing.
+
+Fills the database with users, staff, complaints and their full history
+(assignments, timeline logs, escalations, feedback and evidence rows) that is
+consistent with how the app itself writes them. Examples:
+
+- a complaint is escalated exactly when it was still open at its due date,
+  and its priority was bumped one level at that moment
+- logs follow created -> assigned -> in_progress -> resolved -> closed
+- evidence rows point at a few real placeholder blobs in the blob store, so
+  downloads work
+
+Output is deterministic for a given --seed and --end on an empty database.
+Rows go in through the bulk paths: multi-row INSERTs (executemany, which
+pymysql and SQLite batch), or with `--method load-data` on MySQL, tab-separated
+files and LOAD DATA LOCAL INFILE (the server needs local_infile=1).
+
+    python synthetic_data.py --users 1000 --complaints 20000            # quick
+    python synthetic_data.py --users 100000 --staff 2000 --complaints 10000000 \\
+        --days 1095 --method load-data                                  # ~50M log rows
+
+Run `python manage.py init && python manage.py seed` first (with --tenant for
+another tenant: `python manage.py seed --tenant acme`, then `--tenant acme` here);
+every generated account logs in with --password.
+"""
+import argparse
+import bisect
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from config import settings
+from database import get_shard
+from services.tenancy import tenant_directory
+
+PRIORITIES = ["low", "medium", "high", "critical"]
+# Resolution time multiplier on --resolution-median-hours per priority
+PRIORITY_SPEED = {"low": 2.0, "medium": 1.0, "high": 0.5, "critical": 0.25}
+PLACES = ["Block A", "Block B", "Block C", "Library", "Canteen", "Hostel 1", "Hostel 2", "Admin building", "Lab 3"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Kabir", "Ananya", "Rohan", "Sara", "Vikram", "Nisha", "Arjun", "Priya"]
+LAST_NAMES = ["Sharma", "Verma", "Iyer", "Khan", "Patel", "Reddy", "Das", "Gupta", "Singh", "Nair", "Joshi", "Mehta"]
+ESCALATION_REASON = "Auto-escalated: SLA due date exceeded."
+PLACEHOLDER_BLOBS = 16
+
+# Every table also gets tenant_id, prepended by BulkWriter
+COLUMNS = {
+    "users": ["id", "email", "hashed_password", "full_name", "role", "department_id", "is_active", "created_at", "updated_at"],
+    "complaints": [
+        "id", "user_id", "title", "description", "category_id", "priority", "status", "location", "is_escalated",
+        "escalated_at", "escalation_reason", "sla_days", "due_date", "resolved_at", "closed_at", "created_at",
+        "updated_at",
+    ],
+    "assignments": ["complaint_id", "staff_id", "assigned_by", "assigned_at", "notes"],
+    "complaint_logs": ["complaint_id", "user_id", "action", "old_value", "new_value", "message", "created_at"],
+    "escalation_log": ["complaint_id", "previous_priority", "new_priority", "reason", "triggered_at"],
+    "feedback": ["complaint_id", "user_id", "rating", "comment", "created_at"],
+    "evidence_uploads": ["complaint_id", "file_name", "file_path", "file_type", "file_size", "sha256", "uploaded_by", "created_at"],
+}
+# Parents before children, for LOAD DATA (which loads each table once at the end)
+TABLE_ORDER = list(COLUMNS)
+
+
+def _ts(value: datetime | None) -> str | None:
+    return value.isoformat(" ", "seconds") if value is not None else None
+
+
+class BulkWriter:
+    """Buffers one tenant's rows per table and writes them in batches over one connection."""
+
+    def __init__(self, conn, tenant_id: int, method: str, batch_rows: int, workdir: str):
+        self.conn = conn
+        self.tenant_id = tenant_id
+        self.method = method
+        self.batch_rows = batch_rows
+        self.workdir = workdir
+        self.rows: dict[str, list[tuple]] = {table: [] for table in COLUMNS}
+        self.counts: dict[str, int] = {table: 0 for table in COLUMNS}
+        self._files: dict[str, tuple] = {}
+        placeholder = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+        self._sql = {
+            table: f"INSERT INTO {table} (tenant_id, {', '.join(cols)}) VALUES ({', '.join([placeholder] * (len(cols) + 1))})"
+            for table, cols in COLUMNS.items()
+        }
+
+    def add(self, table: str, row: tuple) -> None:
+        rows = self.rows[table]
+        rows.append((self.tenant_id, *row))
+        if len(rows) >= self.batch_rows:
+            self.flush(table)
+
+    def flush(self, table: str) -> None:
+        rows = self.rows[table]
+        if not rows:
+            return
+        self.counts[table] += len(rows)
+        if self.method == "load-data":
+            if table not in self._files:
+                path = os.path.join(self.workdir, f"{table}.tsv")
+                f = open(path, "w", encoding="utf-8", newline="")
+                self._files[table] = (path, f, csv.writer(f, delimiter="\t", lineterminator="\n", quoting=csv.QUOTE_NONE, escapechar="\\"))
+            self._files[table][2].writerows(tuple("\\N" if v is None else v for v in row) for row in rows)
+        else:
+            self.conn.exec_driver_sql(self._sql[table], rows)
+            self.conn.commit()
+        rows.clear()
+
+    def close(self) -> None:
+        for table in TABLE_ORDER:
+            self.flush(table)
+        for table in TABLE_ORDER:
+            if table not in self._files:
+                continue
+            path, f, _ = self._files[table]
+            f.close()
+            self.conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' (tenant_id, {', '.join(COLUMNS[table])})"
+            )
+            self.conn.commit()
+            os.remove(path)
+
+
+class Generator:
+    def __init__(self, args, rng: random.Random, writer: BulkWriter, conn):
+        self.args = args
+        self.rng = rng
+        self.w = writer
+        self.conn = conn
+        self.end = args.end
+        self.start = args.end - timedelta(days=args.days)
+
+    # ---- reference data ----
+    def _next_id(self, table: str) -> int:
+        return (self.conn.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0) + 1
+
+    def load_reference_data(self) -> None:
+        tenant = {"tid": self.w.tenant_id}
+        self.departments = [
+            row[0] for row in self.conn.execute(text("SELECT id FROM departments WHERE tenant_id = :tid ORDER BY id"), tenant)
+        ]
+        categories = self.conn.execute(
+            text(
+                "SELECT id, name, keywords, default_priority, department_id FROM categories "
+                "WHERE tenant_id = :tid ORDER BY id"
+            ),
+            tenant,
+        ).all()
+        if not categories:
+            raise SystemExit(f"No categories: run `python manage.py seed --tenant {self.args.tenant}` first")
+        mix = dict(self.args.category_mix)
+        unknown = set(mix) - {c.name for c in categories}
+        if unknown:
+            raise SystemExit(f"Unknown categories in --category-mix: {', '.join(sorted(unknown))}")
+        self.categories = categories
+        weights = [mix.get(c.name, 1.0) for c in categories]
+        total = sum(weights)
+        self.category_cdf = [sum(weights[: i + 1]) / total for i in range(len(weights))]
+        self.category_words = {
+            c.id: [k for k in json.loads(c.keywords or "[]") if k] or [c.name.lower()] for c in categories
+        }
+
+    def _pick_category(self):
+        return self.categories[bisect.bisect_left(self.category_cdf, self.rng.random())]
+
+    # ---- users ----
+    def users(self) -> None:
+        hashed = _password_hash(self.args.password)
+        first_id = self._next_id("users")
+        self.user_ids, self.staff, self.admins = [], [], []
+        self.staff_by_department: dict[int | None, list] = {}
+        uid = first_id
+        for role, count in (("admin", self.args.admins), ("staff", self.args.staff), ("user", self.args.users)):
+            for _ in range(count):
+                name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+                department = self.rng.choice(self.departments) if role != "user" and self.departments else None
+                created = self.start - timedelta(days=self.rng.uniform(0, 365))
+                self.w.add("users", (
+                    uid, f"{role}{uid}@synthetic.resolvex.test", hashed, name, role, department, True,
+                    _ts(created), _ts(created),
+                ))
+                if role == "user":
+                    self.user_ids.append((uid, name))
+                elif role == "staff":
+                    self.staff.append((uid, name))
+                    self.staff_by_department.setdefault(department, []).append((uid, name))
+                else:
+                    self.admins.append((uid, name))
+                uid += 1
+        self.w.flush("users")
+
+    # ---- complaints ----
+    def _day_counts(self) -> list[int]:
+        """Complaints per day, growing linearly over the span, summing exactly to --complaints."""
+        days = self.args.days
+        weights = [1 + self.args.growth * d / max(1, days - 1) for d in range(days)]
+        total = sum(weights)
+        counts = [int(self.args.complaints * w / total) for w in weights]
+        for d in range(self.args.complaints - sum(counts)):
+            counts[-1 - d % days] += 1
+        return counts
+
+    def _resolution_hours(self, priority: str, escalate: bool, sla_hours: float) -> float:
+        median = self.args.resolution_median_hours * PRIORITY_SPEED[priority]
+        hours = self.rng.lognormvariate(math.log(median), self.args.resolution_sigma)
+        if escalate:
+            return max(hours, sla_hours * self.rng.uniform(1.05, 3.0))
+        return min(hours, sla_hours * self.rng.uniform(0.3, 0.98))
+
+    def complaints(self) -> None:
+        args, rng, w = self.args, self.rng, self.w
+        cid = self._next_id("complaints")
+        sla_hours = settings.SLA_DAYS * 24
+        placeholders = _placeholder_blobs(rng) if args.evidence_rate > 0 else []
+        blob_refs: dict[str, int] = {}
+        started = time.perf_counter()
+        done = 0
+        for day, count in enumerate(self._day_counts()):
+            day_start = self.start + timedelta(days=day)
+            # Business hours are busier: two thirds between 09:00 and 18:00
+            offsets = sorted(
+                rng.uniform(9 * 3600, 18 * 3600) if rng.random() < 0.66 else rng.uniform(0, 86400) for _ in range(count)
+            )
+            for offset in offsets:
+                created = day_start + timedelta(seconds=offset)
+                if created >= self.end:
+                    continue
+                uid, _ = self.user_ids[int(len(self.user_ids) * rng.random() ** 2)]  # some users file far more
+                category = self._pick_category()
+                word = rng.choice(self.category_words[category.id])
+                place = rng.choice(PLACES)
+                title = f"{word.capitalize()} problem in {place}"
+                description = f"Reporting a {word} issue at {place}. Please look into it at the earliest."
+                priority = category.default_priority if rng.random() < 0.6 else rng.choice(PRIORITIES)
+                due = created + timedelta(hours=sla_hours)
+                escalate = rng.random() < args.escalation_rate
+                resolved = created + timedelta(hours=self._resolution_hours(priority, escalate, sla_hours))
+                final_priority = priority
+                escalated_at = None
+                if resolved > due and due <= self.end:
+                    escalated_at = due + timedelta(seconds=rng.uniform(1, 60))
+                    final_priority = PRIORITIES[min(PRIORITIES.index(priority) + 1, len(PRIORITIES) - 1)]
+
+                # Assignment within a few hours (sooner for urgent ones), unless still waiting
+                assigned_at = created + timedelta(hours=rng.expovariate(1 / (4 * PRIORITY_SPEED[priority])))
+                if assigned_at >= resolved:
+                    assigned_at = created + (resolved - created) / 4
+                staff_pool = self.staff_by_department.get(category.department_id) or self.staff
+                staff_id, staff_name = rng.choice(staff_pool) if staff_pool and assigned_at < self.end else (None, None)
+                started_at = assigned_at + (resolved - assigned_at) * rng.uniform(0.05, 0.4)
+                closed = resolved + timedelta(hours=rng.expovariate(1 / 24)) if rng.random() < args.close_rate else None
+
+                if resolved > self.end:
+                    resolved = closed = None
+                    status = "categorized" if staff_id is None else ("in_progress" if started_at < self.end else "assigned")
+                elif closed is not None and closed <= self.end:
+                    status = "closed"
+                else:
+                    status, closed = "resolved", None
+                updated = max(t for t in (created, assigned_at if staff_id else None, escalated_at, resolved, closed) if t)
+
+                w.add("complaints", (
+                    cid, uid, title, description, category.id, final_priority, status, place, escalated_at is not None,
+                    _ts(escalated_at), ESCALATION_REASON if escalated_at else None, settings.SLA_DAYS, _ts(due),
+                    _ts(resolved), _ts(closed), _ts(created), _ts(updated),
+                ))
+                w.add("complaint_logs", (cid, uid, "created", None, "submitted", "Complaint submitted", _ts(created)))
+                if staff_id is not None:
+                    admin_id = rng.choice(self.admins)[0] if self.admins else None
+                    w.add("assignments", (cid, staff_id, admin_id, _ts(assigned_at), None))
+                    w.add("complaint_logs", (cid, admin_id, "assigned", None, staff_name, None, _ts(assigned_at)))
+                    timeline = [(started_at, "assigned", "in_progress"), (resolved, "in_progress", "resolved"),
+                                (closed, "resolved", "closed")]
+                    for at, old, new in timeline:
+                        if at is None or at > self.end:
+                            break
+                        w.add("complaint_logs", (cid, staff_id, "status_change", old, new, None, _ts(at)))
+                if escalated_at is not None:
+                    w.add("escalation_log", (cid, priority, final_priority, ESCALATION_REASON, _ts(escalated_at)))
+                    w.add("complaint_logs", (
+                        cid, None, "escalation", priority, final_priority, ESCALATION_REASON, _ts(escalated_at),
+                    ))
+                if resolved is not None and rng.random() < args.feedback_rate:
+                    hours = (resolved - created).total_seconds() / 3600
+                    rating = max(1, min(5, round(5.5 - hours / sla_hours * 2.5 + rng.gauss(0, 0.8))))
+                    w.add("feedback", (cid, uid, rating, None, _ts(resolved + timedelta(hours=rng.uniform(0.5, 72)))))
+                if placeholders and rng.random() < args.evidence_rate:
+                    sha, size = rng.choice(placeholders)
+                    blob_refs[sha] = (blob_refs.get(sha, (0, size))[0] + 1, size)
+                    w.add("evidence_uploads", (
+                        cid, "photo.jpg", _blob_key(sha), "image/jpeg", size, sha, uid,
+                        _ts(created + timedelta(seconds=rng.uniform(5, 120))),
+                    ))
+                cid += 1
+                done += 1
+                if done % 100_000 == 0:
+                    rate = done / (time.perf_counter() - started)
+                    print(f"  {done:,} complaints generated ({rate:,.0f}/s)")
+        self.blob_refs = blob_refs
+
+
+def _password_hash(password: str) -> str:
+    from auth import get_password_hash
+
+    return get_password_hash(password)
+
+
+def _blob_key(sha256: str) -> str:
+    from services.blob_store import blob_store
+
+    return blob_store.key(sha256)
+
+
+def _placeholder_blobs(rng: random.Random) -> list[tuple[str, int]]:
+    """Write a few distinct JPEGs to the blob store; evidence rows share them (as duplicates would)."""
+    from PIL import Image
+    from services.blob_store import blob_store
+
+    blobs = []
+    for i in range(PLACEHOLDER_BLOBS):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buf = io.BytesIO()
+        Image.new("RGB", (640, 480), color).save(buf, "JPEG", quality=80)
+        data = buf.getvalue()
+        sha = hashlib.sha256(data).hexdigest()
+        if not blob_store.exists(sha):
+            fd, staged = tempfile.mkstemp(dir=settings.UPLOAD_DIR if os.path.isdir(settings.UPLOAD_DIR) else None)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            blob_store.put(sha, staged)
+        blobs.append((sha, len(data)))
+    return blobs
+
+
+def _record_blob_refs(conn, refs: dict[str, tuple[int, int]]) -> None:
+    now = datetime.utcnow()
+    for sha, (count, size) in refs.items():
+        updated = conn.execute(
+            text("UPDATE evidence_blobs SET ref_count = ref_count + :n, updated_at = :now WHERE sha256 = :sha"),
+            {"n": count, "now": now, "sha": sha},
+        ).rowcount
+        if not updated:
+            conn.execute(
+                text(
+                    "INSERT INTO evidence_blobs (sha256, size, mime_type, ref_count, created_at, updated_at) "
+                    "VALUES (:sha, :size, 'image/jpeg', :n, :now, :now)"
+                ),
+                {"sha": sha, "size": size, "n": count, "now": now},
+            )
+    conn.commit()
+
+
+def _prepare_connection(conn) -> None:
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous = OFF")
+
+
+def _category_mix(value: str) -> list[tuple[str, float]]:
+    mix = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        name, _, weight = part.rpartition("=")
+        if not name:
+            raise argparse.ArgumentTypeError(f"expected name=weight, got {part!r}")
+        mix.append((name.strip(), float(weight)))
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic ResolveX dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--admins", type=int, default=10)
+    parser.add_argument("--complaints", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365, help="time span ending at --end")
+    parser.add_argument(
+        "--end", type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0),
+        help="last day (UTC, YYYY-MM-DD); defaults to today, so pass it for reproducible data",
+    )
+    parser.add_argument("--growth", type=float, default=1.0, help="how much busier the last day is than the first (1 = 2x)")
+    parser.add_argument("--category-mix", type=_category_mix, default=[], help='e.g. "Electricity=3,Food & Mess=0.5" (others 1)')
+    parser.add_argument("--resolution-median-hours", type=float, default=30.0, help="for medium priority; low x2, high x0.5, critical x0.25")
+    parser.add_argument("--resolution-sigma", type=float, default=0.9, help="log-normal spread of resolution times")
+    parser.add_argument("--escalation-rate", type=float, default=0.08, help="share of complaints still open at their due date")
+    parser.add_argument("--close-rate", type=float, default=0.7, help="share of resolved complaints later closed")
+    parser.add_argument("--feedback-rate", type=float, default=0.4, help="share of resolved complaints rated")
+    parser.add_argument("--evidence-rate", type=float, default=0.15, help="share of complaints with a photo")
+    parser.add_argument("--password", default="password123", help="password of every generated account")
+    parser.add_argument("--method", choices=["insert", "load-data"], default="insert")
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    parser.add_argument("--tenant", default=settings.DEFAULT_TENANT, help="tenant slug to fill (default: DEFAULT_TENANT)")
+    args = parser.parse_args()
+    if args.staff < 1 or args.users < 1:
+        parser.error("--users and --staff must be at least 1")
+    tenant = tenant_directory.find(args.tenant)
+    if tenant is None:
+        parser.error(f"unknown tenant {args.tenant!r}")
+    engine = get_shard(tenant.shard).engine
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    load_engine = engine
+    if args.method == "load-data":
+        if engine.dialect.name != "mysql":
+            parser.error("--method load-data needs MySQL")
+        load_engine = create_engine(engine.url, connect_args={"local_infile": True})
+    with load_engine.connect() as conn, tempfile.TemporaryDirectory(prefix="resolvex-synth-") as workdir:
+        _prepare_connection(conn)
+        writer = BulkWriter(conn, tenant.id, args.method, args.batch_rows, workdir)
+        gen = Generator(args, rng, writer, conn)
+        gen.load_reference_data()
+        gen.users()
+        gen.complaints()
+        writer.close()
+        _record_blob_refs(conn, gen.blob_refs)
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.0f}s: " + ", ".join(f"{n:,} {table}" for table, n in writer.counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""ResolveX Backend - Test setup: a throwaway SQLite database and upload dir per run.
+
+Settings are read at import, so the environment is set before any app module loads.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_tmp = tempfile.mkdtemp(prefix="resolvex-test-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    UPLOAD_DIR=os.path.join(_tmp, "uploads"),
+    ESCALATION_ENABLED="false",
+    ARCHIVE_ENABLED="false",
+    ADMISSION_ENABLED="false",
+    SQL_PROFILER_ENABLED="true",
+)
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import manage
+    from config import settings
+    from main import app
+
+    manage.init_db()
+    manage.seed(settings.DEFAULT_TENANT)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """`login(email)` registers the user if new, logs in and returns the Authorization header."""
+
+    def _login(email: str, password: str = "test-password") -> dict:
+        client.post("/api/auth/register", json={"email": email, "password": password, "full_name": "Test User"})
+        r = client.post("/api/auth/login", data={"username": email, "password": password})
+        assert r.status_code == 200, r.text
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return _login
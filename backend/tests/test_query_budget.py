@@ -0,0 +1,44 @@
+"""Complaint endpoints stay within a fixed number of queries however many rows they return."""
+import pytest
+from services.sql_profiler import query_budget
+
+COMPLAINTS = 5
+BUDGET = 2  # principal lookup (usually cached) and one query for the complaints with everything they show
+
+
+@pytest.fixture(scope="module")
+def user_with_complaints(client, login):
+    headers = login("budget@example.com")
+    ids = []
+    for i in range(COMPLAINTS):
+        r = client.post(
+            "/api/complaints",
+            json={"title": f"Streetlight {i} out", "description": "The streetlight on the corner is broken."},
+            headers=headers,
+        )
+        assert r.status_code == 200, r.text
+        ids.append(r.json()["id"])
+    return headers, ids
+
+
+def test_list_complaints_within_budget(client, user_with_complaints):
+    headers, ids = user_with_complaints
+    with query_budget(BUDGET):
+        r = client.get("/api/complaints", headers=headers)
+    assert r.status_code == 200
+    assert {c["id"] for c in r.json()} == set(ids)
+
+
+def test_complaint_detail_within_budget(client, user_with_complaints):
+    headers, ids = user_with_complaints
+    with query_budget(BUDGET):
+        r = client.get(f"/api/complaints/{ids[0]}", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["id"] == ids[0]
+
+
+def test_query_budget_fails_when_exceeded(client, user_with_complaints):
+    headers, _ = user_with_complaints
+    with pytest.raises(AssertionError, match="Query budget exceeded"):
+        with query_budget(0):
+            client.get("/api/complaints", headers=headers)
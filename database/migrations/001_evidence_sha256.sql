@@ -0,0 +1,3 @@
+-- Evidence uploads record the SHA-256 of the stored bytes (computed while streaming)
+ALTER TABLE evidence_uploads
+    ADD COLUMN sha256 CHAR(64) NULL COMMENT 'hex SHA-256 of the stored bytes' AFTER file_size;
@@ -0,0 +1,14 @@
+-- Content-addressed evidence store: one row per distinct file, shared by duplicate uploads.
+-- After applying, run `python -m services.blob_store migrate` from backend/ to move
+-- existing uploads into the sharded store and fill in the reference counts.
+CREATE TABLE IF NOT EXISTS evidence_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size INT NOT NULL,
+    mime_type VARCHAR(50) NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_evidence_blobs_gc (ref_count, updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+ALTER TABLE evidence_uploads ADD INDEX idx_evidence_sha256 (sha256);
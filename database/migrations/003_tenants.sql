@@ -0,0 +1,34 @@
+-- Multi-tenancy: a tenant directory, and tenant_id on every tenant-owned table.
+-- Existing rows become tenant 1 ("default"). Emails are unique per tenant.
+-- Run on every database listed in TENANT_SHARDS too (`manage.py migrate` does);
+-- only the default database's tenants table is read.
+CREATE TABLE IF NOT EXISTS tenants (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    slug VARCHAR(63) NOT NULL UNIQUE,
+    name VARCHAR(150) NOT NULL,
+    shard VARCHAR(63) NOT NULL DEFAULT 'default',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO tenants (id, slug, name) VALUES (1, 'default', 'Default');
+
+ALTER TABLE departments ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+ALTER TABLE categories ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+
+ALTER TABLE users
+    ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id,
+    DROP INDEX email,
+    ADD UNIQUE KEY unique_tenant_email (tenant_id, email),
+    ADD INDEX idx_users_tenant_role (tenant_id, role);
+
+ALTER TABLE complaints
+    ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id,
+    ADD INDEX idx_complaints_tenant_created (tenant_id, created_at),
+    ADD INDEX idx_complaints_tenant_status (tenant_id, status, created_at);
+
+ALTER TABLE complaint_logs ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+ALTER TABLE assignments ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+ALTER TABLE evidence_uploads ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+ALTER TABLE feedback ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
+ALTER TABLE escalation_log ADD COLUMN tenant_id INT NOT NULL DEFAULT 1 AFTER id;
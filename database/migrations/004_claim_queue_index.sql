@@ -0,0 +1,6 @@
+-- Staff "claim next" queue (POST /api/complaints/claim-next): unassigned complaints of a
+-- tenant by status and priority, oldest first. category_id is carried in the index so the
+-- category filter is checked on index entries; only the matching row is read from the
+-- table (for user_id) and locked by SELECT ... FOR UPDATE SKIP LOCKED.
+ALTER TABLE complaints
+    ADD INDEX idx_complaints_claim (tenant_id, status, priority, created_at, category_id);
@@ -0,0 +1,16 @@
+-- Archive of long-closed complaints (services/archival.py), created here in its current
+-- shape (tenant_id included), so 003_tenants.sql no longer touches it.
+CREATE TABLE IF NOT EXISTS complaint_archive (
+    complaint_id INT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
+    user_id INT NOT NULL,
+    staff_id INT NULL,
+    closed_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    payload MEDIUMBLOB NOT NULL COMMENT 'zlib-compressed JSON: complaint, logs, assignment, evidence, feedback, escalations',
+    INDEX idx_complaint_archive_user (user_id),
+    INDEX idx_complaint_archive_closed (closed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED;
+
+-- The archival job's scan: closed complaints by closed_at
+ALTER TABLE complaints ADD INDEX idx_complaints_status_closed (status, closed_at);
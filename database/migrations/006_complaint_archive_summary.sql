@@ -0,0 +1,10 @@
+-- Columns of archived complaints that analytics aggregates and the evidence export filters
+-- on, so neither has to decompress payloads. Rows archived before this migration are filled
+-- in from their payload by the archival job (services/archival.py, backfill_summaries).
+ALTER TABLE complaint_archive
+    ADD COLUMN category_id INT NULL AFTER staff_id,
+    ADD COLUMN priority ENUM('low', 'medium', 'high', 'critical') NULL AFTER category_id,
+    ADD COLUMN is_escalated BOOLEAN NOT NULL DEFAULT FALSE AFTER priority,
+    ADD COLUMN created_at TIMESTAMP NULL AFTER is_escalated,
+    ADD COLUMN resolved_at TIMESTAMP NULL AFTER created_at,
+    ADD INDEX idx_complaint_archive_tenant_created (tenant_id, created_at);
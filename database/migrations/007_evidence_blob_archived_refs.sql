@@ -0,0 +1,8 @@
+-- Blob garbage collection recounts ref_count from evidence_uploads, since rows removed by
+-- ON DELETE CASCADE never decrement it. Archived evidence has no row to count, so each blob
+-- keeps how many archived uploads use it. Existing blobs start with every reference that
+-- is not a live row (an overestimate if cascades already removed some: blobs are kept).
+ALTER TABLE evidence_blobs ADD COLUMN archived_refs INT NOT NULL DEFAULT 0 AFTER ref_count;
+
+UPDATE evidence_blobs b
+SET archived_refs = GREATEST(0, b.ref_count - (SELECT COUNT(*) FROM evidence_uploads e WHERE e.sha256 = b.sha256));
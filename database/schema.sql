@@ -1,11 +1,26 @@
 SET NAMES utf8mb4;
 SET FOREIGN_KEY_CHECKS = 0;
 
+-- --------------------------------------------------------
+-- Tenants (directory of hosted organisations; lives on the default database only)
+-- Every other table carries tenant_id. No foreign key to this table: a tenant's
+-- rows may live on another database (TENANT_SHARDS).
+-- --------------------------------------------------------
+CREATE TABLE IF NOT EXISTS tenants (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    slug VARCHAR(63) NOT NULL UNIQUE COMMENT 'tenant header value / subdomain',
+    name VARCHAR(150) NOT NULL,
+    shard VARCHAR(63) NOT NULL DEFAULT 'default' COMMENT 'database holding its rows (see TENANT_SHARDS)',
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- --------------------------------------------------------
 -- Departments (for categorization and assignment)
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS departments (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     name VARCHAR(100) NOT NULL,
     description TEXT,
     is_active BOOLEAN DEFAULT TRUE,
@@ -19,7 +34,8 @@ CREATE TABLE IF NOT EXISTS departments (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    email VARCHAR(255) NOT NULL UNIQUE,
+    tenant_id INT NOT NULL DEFAULT 1,
+    email VARCHAR(255) NOT NULL,
     hashed_password VARCHAR(255) NOT NULL,
     full_name VARCHAR(150) NOT NULL,
     role ENUM('user', 'staff', 'admin', 'super_admin') NOT NULL DEFAULT 'user',
@@ -28,8 +44,10 @@ CREATE TABLE IF NOT EXISTS users (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (department_id) REFERENCES departments(id) ON DELETE SET NULL,
+    UNIQUE KEY unique_tenant_email (tenant_id, email),
     INDEX idx_users_email (email),
     INDEX idx_users_role (role),
+    INDEX idx_users_tenant_role (tenant_id, role),
     INDEX idx_users_department (department_id),
     INDEX idx_users_active (is_active)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -39,6 +57,7 @@ CREATE TABLE IF NOT EXISTS users (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS categories (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     name VARCHAR(100) NOT NULL,
     keywords TEXT COMMENT 'JSON array of keywords for auto-categorization',
     default_priority ENUM('low', 'medium', 'high', 'critical') DEFAULT 'medium',
@@ -53,6 +72,7 @@ CREATE TABLE IF NOT EXISTS categories (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS complaints (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     user_id INT NOT NULL,
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
@@ -77,7 +97,11 @@ CREATE TABLE IF NOT EXISTS complaints (
     INDEX idx_complaints_category (category_id),
     INDEX idx_complaints_created (created_at),
     INDEX idx_complaints_due_date (due_date),
-    INDEX idx_complaints_escalated (is_escalated)
+    INDEX idx_complaints_escalated (is_escalated),
+    INDEX idx_complaints_status_closed (status, closed_at),
+    INDEX idx_complaints_tenant_created (tenant_id, created_at),
+    INDEX idx_complaints_tenant_status (tenant_id, status, created_at),
+    INDEX idx_complaints_claim (tenant_id, status, priority, created_at, category_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- --------------------------------------------------------
@@ -85,6 +109,7 @@ CREATE TABLE IF NOT EXISTS complaints (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS complaint_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     complaint_id INT NOT NULL,
     user_id INT NULL,
     action VARCHAR(50) NOT NULL COMMENT 'status_change, assignment, note, escalation, etc.',
@@ -103,6 +128,7 @@ CREATE TABLE IF NOT EXISTS complaint_logs (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS assignments (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     complaint_id INT NOT NULL,
     staff_id INT NOT NULL,
     assigned_by INT NULL,
@@ -121,16 +147,33 @@ CREATE TABLE IF NOT EXISTS assignments (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS evidence_uploads (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     complaint_id INT NOT NULL,
     file_name VARCHAR(255) NOT NULL,
-    file_path VARCHAR(512) NOT NULL,
+    file_path VARCHAR(512) NOT NULL COMMENT 'blob store key (legacy rows: filesystem path)',
     file_type VARCHAR(50) NOT NULL COMMENT 'image/jpeg, application/pdf, etc.',
     file_size INT NULL,
+    sha256 CHAR(64) NULL COMMENT 'hex SHA-256 of the stored bytes',
     uploaded_by INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (complaint_id) REFERENCES complaints(id) ON DELETE CASCADE,
     FOREIGN KEY (uploaded_by) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_evidence_complaint (complaint_id)
+    INDEX idx_evidence_complaint (complaint_id),
+    INDEX idx_evidence_sha256 (sha256)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+-- Evidence Blobs (content-addressed store, one row per distinct file)
+-- --------------------------------------------------------
+CREATE TABLE IF NOT EXISTS evidence_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size INT NOT NULL,
+    mime_type VARCHAR(50) NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0 COMMENT 'evidence_uploads rows (live or archived) using this blob',
+    archived_refs INT NOT NULL DEFAULT 0 COMMENT 'the archived ones: evidence in complaint_archive payloads',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_evidence_blobs_gc (ref_count, updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- --------------------------------------------------------
@@ -138,6 +181,7 @@ CREATE TABLE IF NOT EXISTS evidence_uploads (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS feedback (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     complaint_id INT NOT NULL,
     user_id INT NOT NULL,
     rating INT NOT NULL CHECK (rating >= 1 AND rating <= 5),
@@ -154,6 +198,7 @@ CREATE TABLE IF NOT EXISTS feedback (
 -- --------------------------------------------------------
 CREATE TABLE IF NOT EXISTS escalation_log (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
     complaint_id INT NOT NULL,
     previous_priority VARCHAR(20) NULL,
     new_priority VARCHAR(20) NOT NULL,
@@ -163,6 +208,27 @@ CREATE TABLE IF NOT EXISTS escalation_log (
     INDEX idx_escalation_complaint (complaint_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- --------------------------------------------------------
+-- Complaint Archive (closed complaints moved out of the hot tables)
+-- --------------------------------------------------------
+CREATE TABLE IF NOT EXISTS complaint_archive (
+    complaint_id INT PRIMARY KEY,
+    tenant_id INT NOT NULL DEFAULT 1,
+    user_id INT NOT NULL,
+    staff_id INT NULL,
+    category_id INT NULL,
+    priority ENUM('low', 'medium', 'high', 'critical') NULL,
+    is_escalated BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP NULL,
+    resolved_at TIMESTAMP NULL,
+    closed_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    payload MEDIUMBLOB NOT NULL COMMENT 'zlib-compressed JSON: complaint, logs, assignment, evidence, feedback, escalations',
+    INDEX idx_complaint_archive_user (user_id),
+    INDEX idx_complaint_archive_closed (closed_at),
+    INDEX idx_complaint_archive_tenant_created (tenant_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED;
+
 -- --------------------------------------------------------
 -- System Configuration (for Super Admin)
 -- --------------------------------------------------------
@@ -174,9 +240,26 @@ CREATE TABLE IF NOT EXISTS system_config (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Migrations already contained in this schema (see backend/manage.py migrate)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migrations (version) VALUES
+('001_evidence_sha256.sql'),
+('002_evidence_blobs.sql'),
+('003_tenants.sql'),
+('004_claim_queue_index.sql'),
+('005_complaint_archive.sql'),
+('006_complaint_archive_summary.sql'),
+('007_evidence_blob_archived_refs.sql');
+
 SET FOREIGN_KEY_CHECKS = 1;
 
--- Seed default data
+-- Seed default data (tenant 1)
+INSERT INTO tenants (id, slug, name) VALUES (1, 'default', 'Default');
+
 INSERT INTO departments (name, description) VALUES
 ('General', 'General complaints and issues'),
 ('Maintenance', 'Building and facility maintenance'),
@@ -0,0 +1,97 @@
+// Server-sent complaint change events (GET /api/events). Read with fetch rather than
+// EventSource, which cannot send the Authorization header.
+
+export type ComplaintEvent = {
+  complaint_id: number
+  changes: Array<'complaint' | 'logs' | 'evidence' | 'feedback'>
+  at: number
+}
+
+type Handlers = {
+  onEvent: (event: ComplaintEvent) => void
+  // Events may have been missed (reconnect, or the server dropped a backlog): re-fetch everything
+  onResync: () => void
+  // Push is off, refused, or keeps failing: give up on the stream and fall back to polling
+  onUnavailable: () => void
+}
+
+export function subscribeToEvents(
+  query: { complaintIds?: number[]; inbox?: boolean },
+  { onEvent, onResync, onUnavailable }: Handlers
+): () => void {
+  const params = new URLSearchParams()
+  query.complaintIds?.forEach((id) => params.append('complaint_id', String(id)))
+  if (query.inbox) params.set('inbox', 'true')
+  // Consecutive failed connections before giving up on push
+  const maxFailures = 5
+  const controller = new AbortController()
+  let retryMs = 3000
+  let connectedBefore = false
+  let timer: ReturnType<typeof setTimeout> | undefined
+
+  const dispatch = (frame: string) => {
+    let name = 'message'
+    let data = ''
+    for (const line of frame.split('\n')) {
+      if (line.startsWith('event:')) name = line.slice(6).trim()
+      else if (line.startsWith('data:')) data += line.slice(5).trim()
+      else if (line.startsWith('retry:')) retryMs = parseInt(line.slice(6), 10) || retryMs
+    }
+    if (name === 'complaint') onEvent(JSON.parse(data))
+    else if (name === 'resync') onResync()
+  }
+
+  const connect = async () => {
+    let failures = 0
+    while (!controller.signal.aborted) {
+      try {
+        const token = localStorage.getItem('token')
+        const res = await fetch(`/api/events?${params}`, {
+          headers: { Accept: 'text/event-stream', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+          signal: controller.signal,
+        })
+        // 4xx (other than rate limiting) will not change on retry: push is off or refused
+        if ((res.status >= 400 && res.status < 500 && res.status !== 429) || (res.ok && !res.body)) {
+          onUnavailable()
+          return
+        }
+        if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`)
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+        let buffer = ''
+        let opened = false
+        for (;;) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += value
+          let end: number
+          while ((end = buffer.indexOf('\n\n')) >= 0) {
+            dispatch(buffer.slice(0, end))
+            buffer = buffer.slice(end + 2)
+          }
+          if (!opened) {
+            // Subscribed from here on; anything since the last stream closed must be re-fetched
+            opened = true
+            failures = 0
+            if (connectedBefore) onResync()
+            connectedBefore = true
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return
+        failures += 1
+        if (failures >= maxFailures) {
+          onUnavailable()
+          return
+        }
+      }
+      const delay = Math.min(retryMs * 2 ** failures, 30000)
+      await new Promise((resolve) => (timer = setTimeout(resolve, delay)))
+    }
+  }
+
+  connect()
+  return () => {
+    controller.abort()
+    clearTimeout(timer)
+  }
+}
@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { API } from '../context/AuthContext'
 import { useAuth } from '../context/AuthContext'
+import { subscribeToEvents, type ComplaintEvent } from '../events'
 
 type Complaint = {
   id: number
@@ -30,7 +31,61 @@ type Log = {
   user_name: string | null
 }
 
-type Evidence = { id: number; file_name: string; file_type: string; created_at: string }
+type Evidence = {
+  id: number
+  file_name: string
+  file_type: string
+  created_at: string
+  thumbnail_url: string | null
+  preview_url: string | null
+}
+
+// Fetched through the API client for the auth header; responses are immutable and
+// browser-cached, so re-fetching the evidence list does not download them again.
+// A 202 means the rendition is still being rendered; retry after the hinted delay.
+async function fetchObjectUrl(url: string, attempts = 10) {
+  for (let attempt = 1; ; attempt++) {
+    const res = await API.get(url.replace(/^\/api/, ''), { responseType: 'blob' })
+    if (res.status !== 202) return URL.createObjectURL(res.data)
+    if (attempt >= attempts) throw new Error('Preview not ready')
+    const delay = Number(res.headers['retry-after']) || 1
+    await new Promise((resolve) => setTimeout(resolve, delay * 1000))
+  }
+}
+
+function EvidenceThumb({ evidence }: { evidence: Evidence }) {
+  const [src, setSrc] = useState<string | null>(null)
+
+  useEffect(() => {
+    if (!evidence.thumbnail_url) return
+    let objectUrl: string | null = null
+    let cancelled = false
+    fetchObjectUrl(evidence.thumbnail_url)
+      .then((url) => {
+        objectUrl = url
+        if (!cancelled) setSrc(url)
+      })
+      .catch(() => setSrc(null))
+    return () => {
+      cancelled = true
+      if (objectUrl) URL.revokeObjectURL(objectUrl)
+    }
+  }, [evidence.thumbnail_url])
+
+  if (!src) return null
+  return (
+    <button
+      type="button"
+      onClick={async () => {
+        if (!evidence.preview_url) return
+        window.open(await fetchObjectUrl(evidence.preview_url), '_blank')
+      }}
+      className="shrink-0"
+    >
+      <img src={src} alt={evidence.file_name} className="w-12 h-12 object-cover rounded border border-slate-700" />
+    </button>
+  )
+}
 
 export default function ComplaintDetail() {
   const { id } = useParams<{ id: string }>()
@@ -49,20 +104,26 @@ export default function ComplaintDetail() {
   const [feedbackComment, setFeedbackComment] = useState('')
   const [uploading, setUploading] = useState(false)
 
-  const load = () => {
+  // `readAfter`: time of the pushed change, so the API skips a replica that may not have it yet
+  const load = (parts: ComplaintEvent['changes'] = ['complaint', 'logs', 'evidence', 'feedback'], readAfter?: number) => {
     if (!id) return
-    API.get(`/complaints/${id}`)
-      .then(({ data }) => setComplaint(data))
-      .catch(() => setComplaint(null))
-    API.get(`/complaints/${id}/logs`)
-      .then(({ data }) => setLogs(data))
-      .catch(() => setLogs([]))
-    API.get(`/evidence/${id}`)
-      .then(({ data }) => setEvidence(data))
-      .catch(() => setEvidence([]))
-    API.get(`/feedback/${id}`)
-      .then(({ data }) => setFeedback(data))
-      .catch(() => setFeedback(null))
+    const config = readAfter ? { headers: { 'X-Read-After': String(readAfter) } } : undefined
+    if (parts.includes('complaint'))
+      API.get(`/complaints/${id}`, config)
+        .then(({ data }) => setComplaint(data))
+        .catch(() => setComplaint(null))
+    if (parts.includes('logs'))
+      API.get(`/complaints/${id}/logs`, config)
+        .then(({ data }) => setLogs(data))
+        .catch(() => setLogs([]))
+    if (parts.includes('evidence'))
+      API.get(`/evidence/${id}`, config)
+        .then(({ data }) => setEvidence(data))
+        .catch(() => setEvidence([]))
+    if (parts.includes('feedback'))
+      API.get(`/feedback/${id}`, config)
+        .then(({ data }) => setFeedback(data))
+        .catch(() => setFeedback(null))
   }
 
   useEffect(() => {
@@ -73,10 +134,24 @@ export default function ComplaintDetail() {
     setLoading(false)
   }, [id, user?.role])
 
+  // Re-fetch only what the server says changed; poll only if push is unavailable
   useEffect(() => {
     if (!id) return
-    const t = setInterval(load, 15000)
-    return () => clearInterval(t)
+    let poll: ReturnType<typeof setInterval> | undefined
+    const unsubscribe = subscribeToEvents(
+      { complaintIds: [parseInt(id, 10)] },
+      {
+        onEvent: (e) => load(e.changes, e.at),
+        onResync: () => load(),
+        onUnavailable: () => {
+          poll = setInterval(load, 15000)
+        },
+      }
+    )
+    return () => {
+      unsubscribe()
+      clearInterval(poll)
+    }
   }, [id])
 
   const handleAssign = async () => {
@@ -239,15 +314,39 @@ export default function ComplaintDetail() {
           )}
 
           <div className="bg-slate-900 border border-slate-700 rounded-xl p-4">
-            <h3 className="text-sm font-medium text-slate-300 mb-2">Evidence</h3>
+            <div className="flex items-center justify-between mb-2">
+              <h3 className="text-sm font-medium text-slate-300">Evidence</h3>
+              {evidence.length > 1 && (
+                <button
+                  type="button"
+                  onClick={async () => {
+                    const { data } = await API.get(`/evidence/${id}/archive`, { responseType: 'blob' })
+                    const url = URL.createObjectURL(data)
+                    const a = document.createElement('a')
+                    a.href = url
+                    a.download = `complaint-${id}-evidence.zip`
+                    a.click()
+                    URL.revokeObjectURL(url)
+                  }}
+                  className="text-xs text-primary-400 hover:underline"
+                >
+                  Download all
+                </button>
+              )}
+            </div>
             {evidence.length === 0 && !uploading && <p className="text-slate-500 text-sm">No files</p>}
             <ul className="space-y-1 mb-2">
               {evidence.map((e) => (
                 <li key={e.id} className="text-sm flex items-center gap-2">
+                  <EvidenceThumb evidence={e} />
                   <button
                     type="button"
                     onClick={async () => {
-                      const { data } = await API.get(`/evidence/file/${e.id}`, { responseType: 'blob' })
+                      // complaint_id lets the server find the file once the complaint is archived
+                      const { data } = await API.get(`/evidence/file/${e.id}`, {
+                        params: { complaint_id: id },
+                        responseType: 'blob',
+                      })
                       const url = URL.createObjectURL(data)
                       const a = document.createElement('a')
                       a.href = url
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import { Link } from 'react-router-dom'
+import { Link, useNavigate } from 'react-router-dom'
 import { API } from '../context/AuthContext'
 import { useAuth } from '../context/AuthContext'
 
@@ -19,6 +19,8 @@ export default function ComplaintsList() {
   const [list, setList] = useState<Complaint[]>([])
   const [loading, setLoading] = useState(true)
   const [statusFilter, setStatusFilter] = useState('')
+  const [claimMessage, setClaimMessage] = useState('')
+  const navigate = useNavigate()
 
   const url = user?.role === 'admin' || user?.role === 'super_admin' ? '/complaints/all' : '/complaints'
 
@@ -31,6 +33,15 @@ export default function ComplaintsList() {
       .finally(() => setLoading(false))
   }, [url, statusFilter])
 
+  const claimNext = () => {
+    setClaimMessage('')
+    API.post('/complaints/claim-next')
+      .then(({ data }) => navigate(`/complaints/${data.id}`))
+      .catch((err) =>
+        setClaimMessage(err.response?.status === 404 ? 'Nothing left to claim.' : 'Could not claim a complaint.')
+      )
+  }
+
   if (loading) {
     return (
       <div className="p-8 flex items-center justify-center">
@@ -57,6 +68,14 @@ export default function ComplaintsList() {
             <option value="resolved">Resolved</option>
             <option value="closed">Closed</option>
           </select>
+          {user?.role === 'staff' && (
+            <button
+              onClick={claimNext}
+              className="px-4 py-2 rounded-lg bg-slate-700 hover:bg-slate-600 text-slate-100 text-sm font-medium"
+            >
+              Claim next
+            </button>
+          )}
           <Link
             to="/complaints/new"
             className="px-4 py-2 rounded-lg bg-primary-600 hover:bg-primary-500 text-white text-sm font-medium"
@@ -66,6 +85,8 @@ export default function ComplaintsList() {
         </div>
       </div>
 
+      {claimMessage && <p className="mb-4 text-sm text-slate-400">{claimMessage}</p>}
+
       <div className="bg-slate-900 border border-slate-700 rounded-xl overflow-hidden">
         {list.length === 0 ? (
           <div className="p-12 text-center text-slate-500">